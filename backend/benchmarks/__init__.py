@@ -0,0 +1,6 @@
+"""
+Benchmarks y pruebas de carga del backend
+
+Se ejecutan desde el directorio backend/, por ejemplo:
+    python -m benchmarks.event_loop_latency
+"""
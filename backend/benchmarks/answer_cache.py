@@ -0,0 +1,148 @@
+"""
+Coste de servir una pregunta repetida de /ask
+
+Llama a la aplicación ASGI directamente (sin servidor ni red) con
+preguntas ya respondidas y compara:
+
+- edge: acierto en AnswerBytesCache, servido por el middleware antes del
+  enrutado
+- route: la caché de bytes desactivada; la petición pasa por el enrutado,
+  las dependencias y la validación de QuestionRequest y acierta en la caché
+  de QueryService
+
+Uso (desde backend/):
+    python -m benchmarks.answer_cache
+    python -m benchmarks.answer_cache --repeat 5000 --gzip
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from typing import Any, Dict, List
+
+from .fixtures import build_app
+
+QUESTIONS = [
+    "¿Quién es Max Verstappen?",
+    "¿En qué equipo corre Hamilton?",
+    "¿Qué motor usa McLaren?",
+    "¿Dónde está el circuito de Monza?",
+]
+
+
+def _scope(body: bytes, accept_gzip: bool) -> Dict[str, Any]:
+    """Scope ASGI de un POST /api/v1/ask"""
+    headers = [
+        (b'host', b'bench'),
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode()),
+    ]
+    if accept_gzip:
+        headers.append((b'accept-encoding', b'gzip'))
+    return {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'POST', 'scheme': 'http', 'path': '/api/v1/ask', 'raw_path': b'/api/v1/ask',
+        'query_string': b'', 'root_path': '', 'headers': headers,
+        'client': ('127.0.0.1', 1), 'server': ('bench', 80),
+    }
+
+
+async def _request(app, body: bytes, accept_gzip: bool) -> int:
+    """Ejecuta una petición y devuelve el tamaño del cuerpo de la respuesta"""
+    sent = False
+    size = 0
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal sent
+        if sent:
+            return {'type': 'http.disconnect'}
+        sent = True
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal size
+        if message['type'] == 'http.response.start' and message['status'] != 200:
+            raise RuntimeError(f"Respuesta {message['status']}")
+        if message['type'] == 'http.response.body':
+            size += len(message.get('body', b''))
+
+    await app(_scope(body, accept_gzip), receive, send)
+    return size
+
+
+async def _per_request_us(app, bodies: List[bytes], repeat: int, accept_gzip: bool) -> float:
+    """Microsegundos por petición (mejor de tres tandas)"""
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        for index in range(repeat):
+            await _request(app, bodies[index % len(bodies)], accept_gzip)
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return round(best * 1e6, 1)
+
+
+async def run(repeat: int, accept_gzip: bool) -> Dict[str, Any]:
+    """
+    Mide los dos caminos sobre las mismas preguntas
+
+    Args:
+        repeat: Peticiones por tanda
+        accept_gzip: Enviar Accept-Encoding: gzip (y guardar las respuestas comprimidas)
+
+    Returns:
+        Microsegundos por petición de cada camino
+    """
+    app = await build_app()
+    cache = app.state.answer_cache
+    cache.gzip_enabled = accept_gzip
+    bodies = [json.dumps({'question': question}).encode() for question in QUESTIONS]
+    try:
+        # Primera pasada: respuestas en la caché de QueryService y en la de bytes
+        sizes = [await _request(app, body, accept_gzip) for body in bodies]
+        edge_us = await _per_request_us(app, bodies, repeat, accept_gzip)
+
+        max_entries, cache.max_entries = cache.max_entries, 0
+        route_us = await _per_request_us(app, bodies, repeat, accept_gzip)
+        cache.max_entries = max_entries
+    finally:
+        app.state.executor.shutdown()
+        await app.state.openf1_client.close()
+
+    return {
+        'questions': len(QUESTIONS),
+        'gzip': accept_gzip,
+        'response_bytes': sizes,
+        'edge_us': edge_us,
+        'route_us': route_us,
+        'speedup': round(route_us / edge_us, 1) if edge_us else None,
+    }
+
+
+def main() -> int:
+    """Punto de entrada"""
+    parser = argparse.ArgumentParser(description="Coste de servir una pregunta repetida de /ask")
+    parser.add_argument('--repeat', type=int, default=2000, help="Peticiones por tanda")
+    parser.add_argument('--gzip', action='store_true', help="Pedir y guardar respuestas en gzip")
+    parser.add_argument('--json', dest='json_output', help="Guarda el resultado en este fichero")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    # Las peticiones se registran a INFO: sin silenciarlas se mediría el logging
+    logging.disable(logging.INFO)
+
+    result = asyncio.run(run(args.repeat, args.gzip))
+    print(f"Bytes por respuesta: {result['response_bytes']} (gzip={result['gzip']})")
+    print(f"edge  (caché de bytes):        {result['edge_us']:>8} µs/petición")
+    print(f"route (caché de QueryService): {result['route_us']:>8} µs/petición")
+    print(f"x{result['speedup']}")
+
+    if args.json_output:
+        with open(args.json_output, 'w') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
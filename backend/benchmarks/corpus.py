@@ -0,0 +1,204 @@
+"""
+Corpus sintético de preguntas en español para los benchmarks
+
+Las preguntas se generan con plantillas por tipo de consulta y entidades
+del fixture de temporada. Una parte lleva erratas en la entidad (letras
+omitidas, intercambiadas, duplicadas o sin tildes) para ejercitar el fuzzy
+matching, y otra parte repite preguntas anteriores para medir la caché.
+La generación es determinista para una semilla dada.
+"""
+import random
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+from .fixtures import DEFAULT_FIXTURE, load_fixture
+
+# Nombre del GP en español por país del fixture
+GP_NAMES = {
+    'Bahrain': 'Bahréin', 'Saudi Arabia': 'Arabia Saudita', 'Australia': 'Australia',
+    'Japan': 'Japón', 'China': 'China', 'United States': 'Miami', 'Italy': 'Italia',
+    'Monaco': 'Mónaco', 'Canada': 'Canadá', 'Spain': 'España', 'Austria': 'Austria',
+    'United Kingdom': 'Gran Bretaña', 'Hungary': 'Hungría', 'Belgium': 'Bélgica',
+    'Netherlands': 'Países Bajos', 'Azerbaijan': 'Azerbaiyán', 'Singapore': 'Singapur',
+    'Mexico': 'México', 'Brazil': 'Brasil', 'Qatar': 'Qatar', 'United Arab Emirates': 'Abu Dabi',
+}
+
+CIRCUITS = [
+    'Bahrain', 'Jeddah', 'Melbourne', 'Suzuka', 'Shanghai', 'Miami', 'Imola', 'Mónaco',
+    'Barcelona', 'Montreal', 'Silverstone', 'Spielberg', 'Hungaroring', 'Spa', 'Zandvoort',
+    'Monza', 'Singapore', 'Austin', 'México', 'Interlagos', 'Las Vegas', 'Abu Dhabi',
+]
+
+TEAMS = ['Red Bull', 'Mercedes', 'Ferrari', 'McLaren', 'Aston Martin', 'Alpine', 'Williams', 'Haas', 'Sauber']
+
+# Plantillas por tipo de consulta esperado
+TEMPLATES: Dict[str, List[str]] = {
+    'pilot_info': [
+        "¿Quién es {driver}?",
+        "Dime quién es {driver}",
+        "Háblame de {driver}",
+        "Información sobre {driver}",
+        "¿Qué piloto lleva el número {number}?",
+        "Datos del piloto {driver}",
+    ],
+    'team_info': [
+        "¿En qué equipo corre {driver}?",
+        "¿Para qué equipo conduce {driver}?",
+        "¿Qué equipo tiene a {driver}?",
+        "Equipo de {driver}",
+    ],
+    'motor_info': [
+        "¿Qué motor usa {team}?",
+        "Motor de {team}",
+        "¿Qué fabricante de motor tiene {team}?",
+    ],
+    'circuit_info': [
+        "¿Dónde está el circuito de {circuit}?",
+        "¿En qué país está el circuito de {circuit}?",
+        "Circuito de {circuit}",
+        "Ubicación del circuito {circuit}",
+    ],
+    'session_info': [
+        "¿Cuándo es el GP de {gp}?",
+        "Fecha del Gran Premio de {gp}",
+        "¿Qué sesión hay en {circuit}?",
+    ],
+    'winner_info': [
+        "¿Quién ganó el GP de {gp} {year}?",
+        "Ganador del Gran Premio de {gp}",
+        "Resultado del GP de {gp}",
+    ],
+    'fastest_lap_info': [
+        "¿Quién hizo la vuelta más rápida en {circuit}?",
+        "Mejor vuelta de {driver} en {circuit}",
+    ],
+    'laps_led_info': [
+        "¿Cuántas vueltas lideró {driver} en {circuit}?",
+        "Vueltas lideradas por {driver} en {circuit}",
+    ],
+    'pace_info': [
+        "¿Cuál fue el ritmo medio de {driver} en {circuit}?",
+        "Tiempo medio por vuelta de {driver} en {circuit}",
+    ],
+    'general': [
+        "{driver} y {team}",
+        "Cuéntame algo de {circuit}",
+        "{team} en {circuit}",
+    ],
+}
+
+# Frases añadidas para generar variantes no cacheadas de la misma pregunta
+PREFIXES = ["", "", "", "Oye, ", "Por favor, ", "Una pregunta: ", "Hola, "]
+
+
+def strip_accents(text: str) -> str:
+    """Elimina tildes y diéresis"""
+    return ''.join(
+        c for c in unicodedata.normalize('NFD', text)
+        if unicodedata.category(c) != 'Mn'
+    )
+
+
+def apply_typo(text: str, rng: random.Random) -> str:
+    """
+    Introduce una errata realista en un texto
+
+    Args:
+        text: Texto original (una entidad)
+        rng: Generador aleatorio
+
+    Returns:
+        Texto con una errata
+    """
+    if len(text) < 4:
+        return strip_accents(text).lower()
+
+    operation = rng.choice(('drop', 'swap', 'double', 'accents', 'lower'))
+    # Se evita tocar la primera letra: los patrones esperan mayúscula inicial
+    index = rng.randrange(1, len(text) - 1)
+    if operation == 'drop':
+        return text[:index] + text[index + 1:]
+    if operation == 'swap':
+        return text[:index] + text[index + 1] + text[index] + text[index + 2:]
+    if operation == 'double':
+        return text[:index] + text[index] + text[index:]
+    if operation == 'accents' and strip_accents(text) != text:
+        return strip_accents(text)
+    return text[0] + text[1:].lower()
+
+
+def build_corpus(
+    size: int = 5000,
+    seed: int = 2024,
+    typo_rate: float = 0.2,
+    repeat_rate: float = 0.1,
+    fixture: str = DEFAULT_FIXTURE
+) -> List[Dict[str, Any]]:
+    """
+    Genera el corpus de preguntas
+
+    Args:
+        size: Número de preguntas
+        seed: Semilla del generador
+        typo_rate: Proporción de preguntas con errata en la entidad
+        repeat_rate: Proporción de preguntas que repiten una anterior (aciertos de caché)
+        fixture: Fixture del que se toman los pilotos y el año
+
+    Returns:
+        Lista de diccionarios con question, expected_type, typo y repeat
+    """
+    rng = random.Random(seed)
+    data = load_fixture(fixture)
+    drivers = [d['full_name'].title() for d in data['drivers']]
+    last_names = [d['last_name'] for d in data['drivers']]
+    numbers = [d['driver_number'] for d in data['drivers']]
+    gps = sorted({GP_NAMES.get(m['country_name'], m['country_name']) for m in data['meetings']})
+    year = data['year']
+
+    types = list(TEMPLATES)
+    corpus: List[Dict[str, Any]] = []
+
+    while len(corpus) < size:
+        if corpus and rng.random() < repeat_rate:
+            previous = rng.choice(corpus)
+            corpus.append(dict(previous, repeat=True))
+            continue
+
+        query_type = types[len(corpus) % len(types)]
+        template = rng.choice(TEMPLATES[query_type])
+        values = {
+            'driver': rng.choice(drivers if rng.random() < 0.6 else last_names),
+            'number': rng.choice(numbers),
+            'team': rng.choice(TEAMS),
+            'circuit': rng.choice(CIRCUITS),
+            'gp': rng.choice(gps),
+            'year': year,
+        }
+
+        typo = rng.random() < typo_rate
+        if typo:
+            field = next((f for f in ('driver', 'circuit', 'team', 'gp') if '{' + f + '}' in template), None)
+            if field is not None:
+                values[field] = apply_typo(values[field], rng)
+            else:
+                typo = False
+
+        question = rng.choice(PREFIXES) + template.format(**values)
+        corpus.append({'question': question, 'expected_type': query_type, 'typo': typo, 'repeat': False})
+
+    return corpus
+
+
+def corpus_stats(corpus: List[Dict[str, Any]], sample: Optional[int] = None) -> Dict[str, Any]:
+    """Resumen de la composición del corpus"""
+    items = corpus[:sample] if sample else corpus
+    by_type: Dict[str, int] = {}
+    for item in items:
+        by_type[item['expected_type']] = by_type.get(item['expected_type'], 0) + 1
+    return {
+        'questions': len(items),
+        'unique': len({item['question'] for item in items}),
+        'typos': sum(1 for item in items if item['typo']),
+        'repeats': sum(1 for item in items if item['repeat']),
+        'by_expected_type': by_type,
+    }
@@ -0,0 +1,159 @@
+"""
+Coste del índice de entidades del NLP
+
+Sobre la red del fixture de temporada (sin red) mide:
+
+- build: construir el índice completo desde la red
+- refresh: actualizarlo tras cambiar el nombre de un piloto (solo se
+  reindexa ese nodo)
+- extract: EntityIndex.resolve por pregunta del corpus sintético, por
+  separado para las preguntas sin erratas (mapas exacto y de alias) y con
+  erratas (fuzzy sobre el índice de n-gramas)
+
+Con ``--scale`` se añaden pilotos sintéticos a la red para comprobar que
+la resolución exacta no crece con el número de entidades.
+
+Uso (desde backend/):
+    python -m benchmarks.entity_index
+    python -m benchmarks.entity_index --scale 1 10 100 --size 2000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import string
+import sys
+import time
+from typing import Any, Dict, List
+
+from .corpus import build_corpus
+from .fixtures import build_services
+
+
+def _per_call_us(func, items: List[Any], rounds: int = 3) -> float:
+    """Microsegundos por elemento (mejor de varias pasadas)"""
+    if not items:
+        return 0.0
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, (time.perf_counter() - start) / len(items))
+    return round(best * 1e6, 1)
+
+
+def add_synthetic_drivers(network, count: int, seed: int = 7) -> None:
+    """
+    Añade pilotos con nombres aleatorios a la red
+
+    Args:
+        network: SemanticNetwork
+        count: Pilotos a añadir
+        seed: Semilla del generador
+    """
+    rng = random.Random(seed)
+    for index in range(count):
+        given = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 8))).title()
+        surname = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 10))).upper()
+        network.add_node(f"driver_synthetic_{index}", 'piloto', {
+            'nombre': f"{given} {surname}",
+            'numero_piloto': 1000 + index,
+            'name_acronym': surname[:3],
+        })
+
+
+async def run(scales: List[int], size: int) -> List[Dict[str, Any]]:
+    """
+    Mide el índice con la red del fixture y con pilotos sintéticos añadidos
+
+    Args:
+        scales: Multiplicadores del número de pilotos (1 = solo el fixture)
+        size: Preguntas del corpus
+
+    Returns:
+        Una fila por escala
+    """
+    from src.services.entity_index import EntityIndex
+
+    corpus = [item for item in build_corpus(size, typo_rate=0.3) if not item['repeat']]
+    exact_questions = [item['question'] for item in corpus if not item['typo']]
+    typo_questions = [item['question'] for item in corpus if item['typo']]
+
+    rows = []
+    for scale in scales:
+        knowledge_base, _, query_service = await build_services()
+        try:
+            network = knowledge_base.get_semantic_network()
+            drivers = len(network.nodes_by_type['piloto'])
+            add_synthetic_drivers(network, drivers * (scale - 1))
+
+            index = EntityIndex()
+            start = time.perf_counter()
+            index.refresh(network)
+            build_ms = (time.perf_counter() - start) * 1000
+
+            network.update_node('driver_1', {'nombre': 'Max VERSTAPPEN JR'})
+            start = time.perf_counter()
+            reindexed = index.refresh(network)
+            refresh_us = (time.perf_counter() - start) * 1e6
+
+            stats = index.stats()
+            rows.append({
+                'scale': scale,
+                'entities': sum(stats['entities'].values()),
+                'keys': stats['exact_keys'] + stats['alias_keys'],
+                'build_ms': round(build_ms, 2),
+                'refresh_us': round(refresh_us, 1),
+                'refresh_nodes': reindexed,
+                'exact_us': _per_call_us(index.resolve, exact_questions),
+                'typo_us': _per_call_us(index.resolve, typo_questions),
+                'resolved_pct': round(
+                    100 * sum(1 for q in exact_questions + typo_questions if index.resolve(q))
+                    / max(1, len(exact_questions) + len(typo_questions)), 1
+                ),
+            })
+        finally:
+            query_service.executor.shutdown()
+            await knowledge_base.client.close()
+    return rows
+
+
+def print_rows(rows: List[Dict[str, Any]]) -> None:
+    """Imprime la tabla de resultados"""
+    header = (
+        f"{'escala':>6} {'entidades':>9} {'claves':>7} {'build ms':>9} {'refresh µs':>11} "
+        f"{'exact µs':>9} {'typo µs':>8} {'% con ent.':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['scale']:>6} {row['entities']:>9} {row['keys']:>7} {row['build_ms']:>9} "
+            f"{row['refresh_us']:>11} {row['exact_us']:>9} {row['typo_us']:>8} {row['resolved_pct']:>10}"
+        )
+
+
+def main() -> int:
+    """Punto de entrada"""
+    parser = argparse.ArgumentParser(description="Coste del índice de entidades del NLP")
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 10, 100],
+                        help="Multiplicadores del número de pilotos de la red")
+    parser.add_argument('--size', type=int, default=1000, help="Preguntas del corpus")
+    parser.add_argument('--json', dest='json_output', help="Guarda los resultados en este fichero")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    rows = asyncio.run(run(args.scale, args.size))
+    print_rows(rows)
+
+    if args.json_output:
+        with open(args.json_output, 'w') as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
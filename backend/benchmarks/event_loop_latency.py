@@ -0,0 +1,230 @@
+"""
+Latencia del event loop bajo carga de preguntas costosas
+
+Mientras varios clientes lanzan preguntas que no están en caché (con
+erratas, que obligan al fuzzy matching), una sonda mide la latencia de
+/api/v1/health y de una pregunta cacheada. Con la estrategia inline esas
+peticiones baratas esperan a que terminen las etapas CPU-bound; con thread
+o process deberían mantenerse planas.
+
+Una tercera fase añade recargas continuas de la base de conocimiento
+(POST /api/v1/reload) a la misma carga: la escritura en la red no debe
+bloquear el event loop mientras espera a las lecturas de los hilos. Con
+--ballast la red recibe nodos 'vuelta' sintéticos, de modo que las lecturas
+largas (reconstruir el índice de adyacencia tras cada recarga) se noten.
+
+Uso (desde backend/):
+    python -m benchmarks.event_loop_latency --strategies inline thread process
+    python -m benchmarks.event_loop_latency --strategies thread --ballast 200000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+import httpx
+
+from .fixtures import build_app
+from .stats import summarize
+
+CACHED_QUESTION = "¿Quién es Max Verstappen?"
+
+# Preguntas con erratas: no coinciden literalmente y pasan por el fuzzy matching
+EXPENSIVE_TEMPLATES = [
+    "¿Quién es Verstapen? ({n})",
+    "¿En qué equipo corre Hamiltn? ({n})",
+    "¿Dónde está el circuito de Monzza? ({n})",
+    "¿Qué motor usa Mclaren? ({n})",
+    "Información sobre Leclrec y Sainz ({n})",
+]
+
+
+def _add_ballast(network, count: int) -> None:
+    """Añade nodos 'vuelta' sintéticos enlazados a las sesiones de la red"""
+    session_ids = sorted(network.nodes_by_type.get('sesion', []))
+    if not session_ids or count <= 0:
+        return
+    nodes = []
+    edges = []
+    for i in range(count):
+        lap_id = f"ballast_lap_{i}"
+        nodes.append((lap_id, 'vuelta', {'lap_number': i}))
+        edges.append((lap_id, session_ids[i % len(session_ids)], 'pertenece_a', None))
+    with network.batch():
+        network.add_nodes_bulk(nodes)
+        network.add_edges_bulk(edges)
+
+
+async def _load_worker(client: httpx.AsyncClient, worker_id: int, stop: asyncio.Event, done: List[float]) -> None:
+    n = 0
+    while not stop.is_set():
+        template = EXPENSIVE_TEMPLATES[(worker_id + n) % len(EXPENSIVE_TEMPLATES)]
+        question = template.format(n=f"{worker_id}-{n}")
+        start = time.perf_counter()
+        await client.post("/api/v1/ask", json={'question': question})
+        done.append(time.perf_counter() - start)
+        n += 1
+
+
+async def _reloader(client: httpx.AsyncClient, stop: asyncio.Event, done: List[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.post("/api/v1/reload")
+        done.append(time.perf_counter() - start)
+
+
+async def _probe(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> Dict[str, List[float]]:
+    samples: Dict[str, List[float]] = {'health': [], 'cached': []}
+
+    # Cada sonda en su propio bucle: una pregunta cacheada lenta no debe
+    # dejar sin muestras de /health el intervalo en que el loop se bloquea.
+    # La latencia se cuenta desde el momento en que tocaba lanzar la
+    # petición: si el loop estaba bloqueado, el retraso en despertar también
+    # lo habría sufrido un cliente que llegara entonces
+    async def sample(name: str, request: Callable[[], Awaitable[Any]]) -> None:
+        while not stop.is_set():
+            start = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            await request()
+            samples[name].append(time.perf_counter() - start)
+
+    await asyncio.gather(
+        sample('health', lambda: client.get("/api/v1/health")),
+        sample('cached', lambda: client.post("/api/v1/ask", json={'question': CACHED_QUESTION})),
+    )
+    return samples
+
+
+async def run_strategy(
+    strategy: str,
+    concurrency: int,
+    duration: float,
+    interval: float,
+    ballast: int = 0
+) -> Dict[str, object]:
+    """
+    Mide la latencia de la sonda con y sin carga para una estrategia
+
+    Args:
+        strategy: Estrategia de ejecución (inline, thread, process)
+        concurrency: Clientes concurrentes lanzando preguntas costosas
+        duration: Segundos de cada fase
+        interval: Pausa entre muestras de la sonda
+        ballast: Nodos sintéticos añadidos a la red
+
+    Returns:
+        Diccionario con los resúmenes de cada fase
+    """
+    app = await build_app(strategy=strategy)
+    _add_ballast(app.state.knowledge_base.get_semantic_network(), ballast)
+    transport = httpx.ASGITransport(app=app)
+    report: Dict[str, object] = {'strategy': strategy}
+
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # Calentar la caché y los pools
+            await client.post("/api/v1/ask", json={'question': CACHED_QUESTION})
+            await client.post("/api/v1/ask", json={'question': EXPENSIVE_TEMPLATES[0].format(n="warmup")})
+
+            stop = asyncio.Event()
+            probe = asyncio.create_task(_probe(client, stop, interval))
+            await asyncio.sleep(duration)
+            stop.set()
+            idle = await probe
+
+            stop = asyncio.Event()
+            completed: List[float] = []
+            workers = [
+                asyncio.create_task(_load_worker(client, i, stop, completed))
+                for i in range(concurrency)
+            ]
+            probe = asyncio.create_task(_probe(client, stop, interval))
+            await asyncio.sleep(duration)
+            stop.set()
+            loaded = await probe
+            await asyncio.gather(*workers)
+
+            stop = asyncio.Event()
+            reloads: List[float] = []
+            workers = [
+                asyncio.create_task(_load_worker(client, i, stop, []))
+                for i in range(concurrency)
+            ]
+            workers.append(asyncio.create_task(_reloader(client, stop, reloads)))
+            probe = asyncio.create_task(_probe(client, stop, interval))
+            await asyncio.sleep(duration)
+            stop.set()
+            reloading = await probe
+            await asyncio.gather(*workers)
+
+        report['idle'] = {name: summarize(values) for name, values in idle.items()}
+        report['loaded'] = {name: summarize(values) for name, values in loaded.items()}
+        report['reloading'] = {name: summarize(values) for name, values in reloading.items()}
+        report['reload'] = summarize(reloads)
+        report['expensive'] = summarize(completed)
+        report['expensive']['throughput_rps'] = round(len(completed) / duration, 1)
+    finally:
+        app.state.executor.shutdown()
+        await app.state.openf1_client.close()
+
+    return report
+
+
+def print_report(reports: List[Dict[str, object]]) -> None:
+    """Imprime una tabla comparativa"""
+    header = (
+        f"{'estrategia':<10} {'sonda':<8} {'p50 idle':>10} {'p99 idle':>10} {'p50 carga':>10} "
+        f"{'p99 carga':>10} {'p50 reload':>11} {'p99 reload':>11}"
+    )
+    print(header)
+    print("-" * len(header))
+    for report in reports:
+        for probe in ('health', 'cached'):
+            idle = report['idle'][probe]
+            loaded = report['loaded'][probe]
+            reloading = report['reloading'][probe]
+            print(
+                f"{report['strategy']:<10} {probe:<8} {idle['p50_ms']:>10} {idle['p99_ms']:>10} "
+                f"{loaded['p50_ms']:>10} {loaded['p99_ms']:>10} "
+                f"{reloading['p50_ms']:>11} {reloading['p99_ms']:>11}"
+            )
+    print()
+    for report in reports:
+        expensive = report['expensive']
+        print(
+            f"{report['strategy']:<10} preguntas costosas: {expensive['throughput_rps']} req/s, "
+            f"p99 {expensive['p99_ms']} ms; recargas: {report['reload']['count']}, "
+            f"p99 {report['reload']['p99_ms']} ms"
+        )
+
+
+def main() -> int:
+    """Punto de entrada"""
+    parser = argparse.ArgumentParser(description="Latencia del event loop por estrategia de ejecución")
+    parser.add_argument('--strategies', nargs='+', default=['inline', 'thread', 'process'])
+    parser.add_argument('--concurrency', type=int, default=8, help="Clientes lanzando preguntas costosas")
+    parser.add_argument('--duration', type=float, default=5.0, help="Segundos por fase")
+    parser.add_argument('--interval', type=float, default=0.01, help="Pausa entre muestras de la sonda")
+    parser.add_argument('--ballast', type=int, default=0, help="Nodos sintéticos añadidos a la red")
+    parser.add_argument('--json', dest='json_output', help="Guarda el informe en este fichero")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    reports = []
+    for strategy in args.strategies:
+        reports.append(asyncio.run(run_strategy(strategy, args.concurrency, args.duration, args.interval, args.ballast)))
+
+    print_report(reports)
+
+    if args.json_output:
+        with open(args.json_output, 'w') as f:
+            json.dump(reports, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""
+Datos grabados de OpenF1 para ejecutar el backend sin red
+
+El fichero fixtures/season_2024.json contiene meetings, sesiones y pilotos
+de la temporada 2024. La telemetría (position, laps, stints, race_control)
+se genera de forma determinista por sesión a partir de una semilla, con el
+volumen de una carrera real.
+"""
+import json
+import os
+import random
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+DEFAULT_FIXTURE = "season_2024"
+
+# Parámetros de consulta que se aplican como filtros de igualdad
+FILTER_PARAMS = (
+    'year', 'meeting_key', 'session_key', 'session_name',
+    'country_name', 'driver_number', 'circuit_key'
+)
+
+
+@lru_cache(maxsize=None)
+def load_fixture(name: str = DEFAULT_FIXTURE) -> Dict[str, Any]:
+    """
+    Carga un fixture grabado
+
+    Args:
+        name: Nombre del fichero (sin extensión) en benchmarks/fixtures
+
+    Returns:
+        Diccionario con meetings, sessions y drivers
+    """
+    with open(os.path.join(FIXTURES_DIR, f"{name}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _iso(base_ms: int) -> str:
+    """Convierte milisegundos desde epoch a fecha ISO de OpenF1"""
+    seconds, millis = divmod(base_ms, 1000)
+    from datetime import datetime, timezone
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S') + f".{millis:03d}000+00:00"
+
+
+class FixtureUpstream:
+    """Responde peticiones de OpenF1 a partir del fixture"""
+
+    def __init__(
+        self,
+        fixture: str = DEFAULT_FIXTURE,
+        race_laps: int = 57,
+        payload_scale: int = 1
+    ):
+        """
+        Inicializa el upstream simulado
+
+        Args:
+            fixture: Nombre del fixture grabado
+            race_laps: Vueltas de las carreras generadas
+            payload_scale: Multiplicador del volumen de position (muestras por vuelta)
+        """
+        data = load_fixture(fixture)
+        self.meetings: List[Dict[str, Any]] = data['meetings']
+        self.sessions: List[Dict[str, Any]] = data['sessions']
+        self.drivers: List[Dict[str, Any]] = data['drivers']
+        self.sessions_by_key = {s['session_key']: s for s in self.sessions}
+        self.race_laps = race_laps
+        self.payload_scale = max(1, payload_scale)
+        self._telemetry_cache: Dict[int, Dict[str, List[Dict[str, Any]]]] = {}
+
+    def rows(self, endpoint: str, params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Filas de un endpoint para unos parámetros
+
+        Args:
+            endpoint: Endpoint de OpenF1
+            params: Parámetros de consulta
+
+        Returns:
+            Lista de filas o None si el endpoint no existe
+        """
+        if endpoint == 'meetings':
+            rows = self.meetings
+        elif endpoint == 'sessions':
+            rows = self.sessions
+        elif endpoint == 'drivers':
+            rows = self._drivers(params.get('session_key'))
+        elif endpoint in ('position', 'laps', 'stints', 'race_control'):
+            session_key = params.get('session_key')
+            if session_key is None:
+                return []
+            rows = self.telemetry(int(session_key)).get(endpoint, [])
+        else:
+            return None
+
+        return self._filter(rows, params)
+
+    def _filter(self, rows: List[Dict[str, Any]], params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        filters = {k: str(v) for k, v in params.items() if k in FILTER_PARAMS}
+        if not filters:
+            return rows
+        return [
+            row for row in rows
+            if all(str(row.get(k)) == v for k, v in filters.items() if k in row)
+        ]
+
+    def _drivers(self, session_key: Optional[Any]) -> List[Dict[str, Any]]:
+        session = self.sessions_by_key.get(int(session_key)) if session_key else None
+        if session is None:
+            return self.drivers
+        return [
+            dict(driver, session_key=session['session_key'], meeting_key=session['meeting_key'])
+            for driver in self.drivers
+        ]
+
+    def telemetry(self, session_key: int) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Telemetría generada (determinista) de una sesión
+
+        Args:
+            session_key: Clave de la sesión
+
+        Returns:
+            Diccionario endpoint -> filas
+        """
+        cached = self._telemetry_cache.get(session_key)
+        if cached is not None:
+            return cached
+
+        session = self.sessions_by_key.get(session_key)
+        if session is None:
+            return {}
+
+        rng = random.Random(session_key)
+        from datetime import datetime
+        start_ms = int(datetime.fromisoformat(session['date_start']).timestamp() * 1000)
+        numbers = [d['driver_number'] for d in self.drivers]
+        pace = {n: 80.0 + i * 0.12 + rng.random() for i, n in enumerate(numbers)}
+        laps_total = self.race_laps if session['session_type'] == 'Race' else 20
+
+        laps: List[Dict[str, Any]] = []
+        position: List[Dict[str, Any]] = []
+        elapsed = {n: 0.0 for n in numbers}
+
+        order = numbers[:]
+        rng.shuffle(order)
+        for index, n in enumerate(order):
+            position.append({
+                'session_key': session_key, 'meeting_key': session['meeting_key'],
+                'driver_number': n, 'position': index + 1, 'date': _iso(start_ms - 60000)
+            })
+
+        for lap in range(1, laps_total + 1):
+            for n in numbers:
+                pit_out = lap in (laps_total // 3, 2 * laps_total // 3) and n % 2 == lap % 2
+                duration = None if lap == 1 else round(pace[n] + rng.gauss(0, 0.4) + (20.0 if pit_out else 0.0), 3)
+                lap_start = start_ms + int(elapsed[n] * 1000)
+                laps.append({
+                    'session_key': session_key, 'meeting_key': session['meeting_key'],
+                    'driver_number': n, 'lap_number': lap, 'lap_duration': duration,
+                    'date_start': _iso(lap_start), 'is_pit_out_lap': pit_out,
+                    'duration_sector_1': None if duration is None else round(duration * 0.31, 3),
+                    'duration_sector_2': None if duration is None else round(duration * 0.42, 3),
+                    'duration_sector_3': None if duration is None else round(duration * 0.27, 3),
+                })
+                elapsed[n] += duration or pace[n] + 5.0
+
+            new_order = sorted(numbers, key=lambda n: elapsed[n])
+            lap_end_ms = start_ms + int(min(elapsed.values()) * 1000)
+            for sample in range(self.payload_scale):
+                for index, n in enumerate(new_order):
+                    if sample == 0 and order.index(n) == index:
+                        continue
+                    position.append({
+                        'session_key': session_key, 'meeting_key': session['meeting_key'],
+                        'driver_number': n, 'position': index + 1, 'date': _iso(lap_end_ms + sample * 250)
+                    })
+            order = new_order
+
+        stints = []
+        for n in numbers:
+            cuts = [1, laps_total // 3 + 1, 2 * laps_total // 3 + 1, laps_total + 1]
+            for number, (lap_start, lap_end) in enumerate(zip(cuts, cuts[1:]), start=1):
+                stints.append({
+                    'session_key': session_key, 'meeting_key': session['meeting_key'],
+                    'driver_number': n, 'stint_number': number, 'lap_start': lap_start,
+                    'lap_end': lap_end - 1, 'compound': ('MEDIUM', 'HARD', 'SOFT')[number - 1],
+                    'tyre_age_at_start': 0,
+                })
+
+        race_control = [
+            {'session_key': session_key, 'date': _iso(start_ms), 'category': 'Flag',
+             'flag': 'GREEN', 'message': 'GREEN LIGHT - PIT EXIT OPEN', 'lap_number': 1},
+            {'session_key': session_key, 'date': _iso(start_ms + int(min(elapsed.values()) * 1000)),
+             'category': 'Flag', 'flag': 'CHEQUERED', 'message': 'CHEQUERED FLAG', 'lap_number': laps_total},
+        ]
+
+        telemetry = {'position': position, 'laps': laps, 'stints': stints, 'race_control': race_control}
+        self._telemetry_cache[session_key] = telemetry
+        return telemetry
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """Responde una petición httpx (para httpx.MockTransport)"""
+        endpoint = request.url.path.rstrip('/').rsplit('/', 1)[-1]
+        rows = self.rows(endpoint, dict(request.url.params))
+        if rows is None or not rows:
+            return httpx.Response(404, json={'detail': 'No results found.'})
+        return httpx.Response(200, content=json.dumps(rows).encode(), headers={'content-type': 'application/json'})
+
+    def transport(self) -> httpx.MockTransport:
+        """Transporte httpx que sirve el fixture sin red"""
+        return httpx.MockTransport(self.handle)
+
+
+async def build_services(
+    upstream: Optional[FixtureUpstream] = None,
+    strategy: str = "inline",
+    year: int = 2024,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+    client: Any = None
+) -> Tuple[Any, Any, Any]:
+    """
+    Construye KnowledgeBase, NLPProcessor y QueryService sobre el fixture
+
+    Args:
+        upstream: Upstream simulado (por defecto, el fixture de 2024)
+        strategy: Estrategia de ejecución de etapas
+        year: Temporada a cargar
+        transport: Transporte httpx alternativo (servidor simulado, replay...)
+        client: OpenF1Client ya configurado (tiene prioridad sobre upstream y transport)
+
+    Returns:
+        Tupla (knowledge_base, nlp_processor, query_service)
+    """
+    from src.services.executor import StageExecutor
+    from src.services.knowledge_base import KnowledgeBase
+    from src.services.nlp_processor import NLPProcessor
+    from src.services.openf1_client import OpenF1Client
+    from src.services.query_service import QueryService
+
+    if client is None:
+        if transport is None:
+            transport = (upstream or FixtureUpstream()).transport()
+        client = OpenF1Client("http://openf1.fixture/v1", rate_limit=0, transport=transport)
+
+    knowledge_base = KnowledgeBase(client)
+    await knowledge_base.load_data(year=year)
+    nlp_processor = NLPProcessor(knowledge_base.get_semantic_network())
+    query_service = QueryService(knowledge_base, nlp_processor, StageExecutor(strategy))
+    return knowledge_base, nlp_processor, query_service
+
+
+async def build_app(strategy: str = "inline", **kwargs: Any):
+    """
+    Prepara la aplicación FastAPI con servicios sobre el fixture
+
+    httpx.ASGITransport no ejecuta el lifespan, así que el estado se
+    inicializa aquí.
+
+    Args:
+        strategy: Estrategia de ejecución de etapas
+        **kwargs: Argumentos adicionales para build_services
+
+    Returns:
+        Aplicación FastAPI lista para recibir peticiones
+    """
+    from src.api.main import app
+    from src.services.startup import StartupState
+
+    knowledge_base, nlp_processor, query_service = await build_services(strategy=strategy, **kwargs)
+    app.state.startup = StartupState()
+    app.state.openf1_client = knowledge_base.client
+    app.state.knowledge_base = knowledge_base
+    app.state.nlp_processor = nlp_processor
+    app.state.executor = query_service.executor
+    app.state.query_service = query_service
+    app.state.startup.mark_ready()
+    return app
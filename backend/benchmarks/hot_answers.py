@@ -0,0 +1,173 @@
+"""
+Preguntas calientes durante una ráfaga de cola larga
+
+Sobre QueryService (fixture de temporada, sin red) compara dos cachés de
+respuestas con la misma capacidad total:
+
+- lru: solo el LRU (nivel caliente desactivado)
+- tiered: HotAnswerCache con el nivel caliente delante del LRU
+
+Primero se calientan las cachés con un conjunto pequeño de formulaciones
+frecuentes ("¿Quién es X?", "¿Qué motor usa Y?"). Después llega una ráfaga
+de preguntas únicas del corpus sintético (solo las que se responden con la
+red, para no depender de la telemetría) mezcladas con las frecuentes en la
+proporción --hot-share, elegidas con una distribución de Zipf. Se mide el
+porcentaje de preguntas frecuentes que aciertan en caché durante la ráfaga
+y su latencia media.
+
+Uso (desde backend/):
+    python -m benchmarks.hot_answers
+    python -m benchmarks.hot_answers --lru 256 --hot 64 --storm 4000 --hot-share 0.1
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+from .corpus import build_corpus
+from .fixtures import build_services
+
+DRIVERS = ['Max Verstappen', 'Lando Norris', 'Charles Leclerc', 'Lewis Hamilton']
+TEAMS = ['McLaren', 'Ferrari', 'Red Bull', 'Mercedes']
+DRIVER_TEMPLATES = ['¿Quién es {}?', 'quien es {}', 'Información sobre {}']
+TEAM_TEMPLATES = ['¿Qué motor usa {}?', 'que motor usa {}', 'Motor de {}']
+NETWORK_TYPES = ('pilot_info', 'team_info', 'motor_info', 'circuit_info', 'session_info', 'general')
+
+
+def hot_questions() -> List[str]:
+    """Formulaciones frecuentes (varias por intención)"""
+    return (
+        [template.format(name) for name in DRIVERS for template in DRIVER_TEMPLATES]
+        + [template.format(name) for name in TEAMS for template in TEAM_TEMPLATES]
+    )
+
+
+def tail_questions(count: int, exclude: List[str]) -> List[str]:
+    """Hasta count preguntas únicas del corpus sintético que se responden con la red"""
+    seen = set(exclude)
+    questions = []
+    for item in build_corpus(count * 8, typo_rate=0.5, repeat_rate=0.0):
+        if item['expected_type'] in NETWORK_TYPES and item['question'] not in seen:
+            seen.add(item['question'])
+            questions.append(item['question'])
+            if len(questions) == count:
+                break
+    return questions
+
+
+async def measure(mode: str, lru: int, hot: int, storm: List[str], hot_set: List[str],
+                  hot_share: float, seed: int) -> Dict[str, Any]:
+    """
+    Ejecuta el calentamiento y la ráfaga con una configuración de caché
+
+    Args:
+        mode: 'lru' (capacidad total en el LRU) o 'tiered'
+        lru: Entradas del LRU en modo tiered
+        hot: Entradas del nivel caliente en modo tiered
+        storm: Preguntas únicas de la ráfaga
+        hot_set: Preguntas frecuentes
+        hot_share: Proporción de preguntas frecuentes durante la ráfaga
+        seed: Semilla de la mezcla
+
+    Returns:
+        Fila de resultados
+    """
+    from src.services.hot_answers import HotAnswerCache
+
+    knowledge_base, _, query_service = await build_services()
+    try:
+        if mode == 'lru':
+            query_service.response_cache = HotAnswerCache(max_entries=lru + hot, hot_entries=0)
+        else:
+            query_service.response_cache = HotAnswerCache(max_entries=lru, hot_entries=hot)
+
+        # Calentamiento: cada formulación frecuente varias veces
+        for _ in range(5):
+            for question in hot_set:
+                await query_service.process_question(question)
+
+        rng = random.Random(seed)
+        weights = [1 / rank for rank in range(1, len(hot_set) + 1)]
+        hot_hits = 0
+        hot_count = 0
+        hot_seconds = 0.0
+        start = time.perf_counter()
+        for question in storm:
+            if rng.random() < hot_share:
+                hot_question = rng.choices(hot_set, weights)[0]
+                hot_hits += query_service.cached_answer(hot_question) is not None
+                started = time.perf_counter()
+                await query_service.process_question(hot_question)
+                hot_seconds += time.perf_counter() - started
+                hot_count += 1
+            await query_service.process_question(question)
+        elapsed = time.perf_counter() - start
+
+        stats = query_service.response_cache.stats()
+        return {
+            'mode': mode,
+            'capacity': lru + hot,
+            'storm': len(storm),
+            'hot_requests': hot_count,
+            'hot_hit_pct': round(100 * hot_hits / max(1, hot_count), 1),
+            'hot_avg_us': round(hot_seconds / max(1, hot_count) * 1e6, 1),
+            'storm_s': round(elapsed, 2),
+            'hot_entries': stats['hot_entries'],
+            'top_intent': stats['top_intents'][0]['fingerprint'] if stats['top_intents'] else '',
+        }
+    finally:
+        query_service.executor.shutdown()
+        await knowledge_base.client.close()
+
+
+def print_rows(rows: List[Dict[str, Any]]) -> None:
+    """Imprime la tabla de resultados"""
+    header = (
+        f"{'modo':>7} {'capacidad':>9} {'ráfaga':>7} {'frecuentes':>10} {'% acierto':>9} "
+        f"{'µs medio':>9} {'ráfaga s':>9} {'fijadas':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['mode']:>7} {row['capacity']:>9} {row['storm']:>7} {row['hot_requests']:>10} "
+            f"{row['hot_hit_pct']:>9} {row['hot_avg_us']:>9} {row['storm_s']:>9} {row['hot_entries']:>7}"
+        )
+    if rows and rows[-1]['top_intent']:
+        print(f"\nIntención más frecuente: {rows[-1]['top_intent']}")
+
+
+def main() -> int:
+    """Punto de entrada"""
+    parser = argparse.ArgumentParser(description="Preguntas calientes durante una ráfaga de cola larga")
+    parser.add_argument('--lru', type=int, default=128, help="Entradas del LRU (modo tiered)")
+    parser.add_argument('--hot', type=int, default=32, help="Entradas del nivel caliente (modo tiered)")
+    parser.add_argument('--storm', type=int, default=2000, help="Preguntas únicas de la ráfaga")
+    parser.add_argument('--hot-share', type=float, default=0.1,
+                        help="Proporción de preguntas frecuentes durante la ráfaga")
+    parser.add_argument('--seed', type=int, default=7, help="Semilla de la mezcla")
+    parser.add_argument('--json', dest='json_output', help="Guarda los resultados en este fichero")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    hot_set = hot_questions()
+    storm = tail_questions(args.storm, hot_set)
+    rows = [
+        asyncio.run(measure(mode, args.lru, args.hot, storm, hot_set, args.hot_share, args.seed))
+        for mode in ('lru', 'tiered')
+    ]
+    print_rows(rows)
+
+    if args.json_output:
+        with open(args.json_output, 'w') as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
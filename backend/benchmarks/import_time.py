@@ -0,0 +1,256 @@
+"""
+Coste de arranque del proceso de la API
+
+Importa el módulo de la aplicación en procesos nuevos con
+``python -X importtime`` y desglosa el tiempo:
+
+- por paquete raíz (fastapi, pydantic, httpx, src...), sumando el tiempo
+  propio de cada módulo, de modo que los totales son aditivos
+- por módulo de src (tiempo propio y acumulado)
+- los módulos más caros por tiempo acumulado
+
+Comprueba además que los módulos que deben cargarse de forma diferida
+(``--forbid``, por defecto numpy y networkx) no se importan al arrancar.
+Con ``--serve`` arranca uvicorn contra el OpenF1 simulado y mide cuánto
+tarda en responder /api/v1/live y /api/v1/ready.
+
+Uso (desde backend/):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 10 --top 25
+    python -m benchmarks.import_time --serve --runs 3
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+DEFAULT_MODULE = "src.api.main"
+DEFAULT_FORBID = ("numpy", "networkx")
+
+_LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Interpreta la salida de ``-X importtime``
+
+    Args:
+        output: stderr del proceso
+
+    Returns:
+        Lista de (módulo, propio µs, acumulado µs, profundidad)
+    """
+    rows = []
+    for line in output.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def profile_import(module: str) -> Dict[str, Any]:
+    """
+    Importa un módulo en un proceso nuevo
+
+    Args:
+        module: Módulo a importar
+
+    Returns:
+        Tiempo total (ms), filas de importtime y módulos cargados
+    """
+    code = (
+        "import sys, time, json\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(json.dumps({'ms': (time.perf_counter() - start) * 1000, 'modules': sorted(sys.modules)}))\n"
+    )
+    env = {**os.environ, 'PYTHONPATH': os.getcwd()}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, env=env, check=True
+    )
+    summary = json.loads(result.stdout.strip().splitlines()[-1])
+    return {'ms': summary['ms'], 'modules': summary['modules'], 'rows': parse_importtime(result.stderr)}
+
+
+def summarize(runs: List[Dict[str, Any]], top: int) -> Dict[str, Any]:
+    """
+    Medianas de varias ejecuciones
+
+    Args:
+        runs: Resultados de profile_import
+        top: Número de módulos a listar
+
+    Returns:
+        Total, desglose por paquete, módulos de src y módulos más caros (ms)
+    """
+    self_us: Dict[str, List[int]] = defaultdict(list)
+    cumulative_us: Dict[str, List[int]] = defaultdict(list)
+    for run in runs:
+        for module, own, cumulative, _ in run['rows']:
+            self_us[module].append(own)
+            cumulative_us[module].append(cumulative)
+
+    def median_ms(values: List[int]) -> float:
+        return round(statistics.median(values) / 1000, 2)
+
+    by_package: Dict[str, float] = defaultdict(float)
+    for module, values in self_us.items():
+        by_package[module.split('.')[0]] += statistics.median(values) / 1000
+
+    return {
+        'total_ms': round(statistics.median(run['ms'] for run in runs), 1),
+        'by_package': sorted(
+            ((name, round(ms, 2)) for name, ms in by_package.items()), key=lambda item: -item[1]
+        )[:top],
+        'src_modules': sorted(
+            ((module, median_ms(self_us[module]), median_ms(cumulative_us[module]))
+             for module in self_us if module == 'src' or module.startswith('src.')),
+            key=lambda item: -item[2]
+        ),
+        'heaviest': sorted(
+            ((module, median_ms(values)) for module, values in cumulative_us.items()),
+            key=lambda item: -item[1]
+        )[:top],
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(client: httpx.Client, url: str, deadline: float, status_code: int = 200) -> Optional[float]:
+    """Espera a que una URL responda con el código indicado; devuelve el instante"""
+    while time.perf_counter() < deadline:
+        try:
+            if client.get(url).status_code == status_code:
+                return time.perf_counter()
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def measure_serve(module: str, timeout: float = 60.0) -> Dict[str, Optional[float]]:
+    """
+    Arranca uvicorn contra el OpenF1 simulado y mide el tiempo hasta /live y /ready
+
+    Args:
+        module: Módulo de la aplicación (se sirve ``<module>:app``)
+        timeout: Segundos máximos de espera
+
+    Returns:
+        Segundos desde el lanzamiento hasta que /live y /ready responden 200
+    """
+    mock_port, api_port = _free_port(), _free_port()
+    env = {**os.environ, 'PYTHONPATH': os.getcwd()}
+    mock = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.mock_openf1', '--port', str(mock_port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    api = None
+    # Un solo cliente: crear uno por intento cuesta más que el propio sondeo
+    client = httpx.Client(timeout=1.0)
+    try:
+        if _wait_for(client, f"http://127.0.0.1:{mock_port}/_mock/stats", time.perf_counter() + timeout) is None:
+            raise RuntimeError("El OpenF1 simulado no arrancó")
+        api_env = {
+            **env,
+            'OPENF1_BASE_URL': f"http://127.0.0.1:{mock_port}/v1",
+            'OPENF1_RATE_LIMIT': '0',
+            'KB_SNAPSHOT_PATH': '',
+        }
+        started_at = time.perf_counter()
+        api = subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', f"{module}:app", '--port', str(api_port), '--log-level', 'warning'],
+            env=api_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = started_at + timeout
+        live_at = _wait_for(client, f"http://127.0.0.1:{api_port}/api/v1/live", deadline)
+        ready_at = _wait_for(client, f"http://127.0.0.1:{api_port}/api/v1/ready", deadline)
+        return {
+            'live_s': round(live_at - started_at, 3) if live_at else None,
+            'ready_s': round(ready_at - started_at, 3) if ready_at else None,
+        }
+    finally:
+        client.close()
+        for process in (api, mock):
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=10)
+
+
+def print_report(summary: Dict[str, Any], runs: int, module: str) -> None:
+    """Imprime el desglose"""
+    print(f"import {module}: {summary['total_ms']} ms (mediana de {runs})\n")
+    print(f"{'paquete':<28} {'ms propios':>10}")
+    print("-" * 39)
+    for name, ms in summary['by_package']:
+        print(f"{name:<28} {ms:>10}")
+
+    print(f"\n{'módulo de src':<40} {'propio':>8} {'acumulado':>10}")
+    print("-" * 60)
+    for name, own, cumulative in summary['src_modules']:
+        print(f"{name:<40} {own:>8} {cumulative:>10}")
+
+    print(f"\n{'módulo':<48} {'acumulado ms':>12}")
+    print("-" * 61)
+    for name, ms in summary['heaviest']:
+        print(f"{name:<48} {ms:>12}")
+
+
+def main() -> int:
+    """Punto de entrada"""
+    parser = argparse.ArgumentParser(description="Coste de arranque del proceso de la API")
+    parser.add_argument('--module', default=DEFAULT_MODULE, help="Módulo a importar")
+    parser.add_argument('--runs', type=int, default=5, help="Procesos por medición")
+    parser.add_argument('--top', type=int, default=15, help="Paquetes y módulos a listar")
+    parser.add_argument(
+        '--forbid', nargs='*', default=list(DEFAULT_FORBID),
+        help="Módulos que no deben importarse al arrancar (falla si aparecen)"
+    )
+    parser.add_argument('--serve', action='store_true', help="Mide también el tiempo hasta /live y /ready")
+    parser.add_argument('--json', dest='json_output', help="Guarda los resultados en este fichero")
+    args = parser.parse_args()
+
+    runs = [profile_import(args.module) for _ in range(args.runs)]
+    summary = summarize(runs, args.top)
+    print_report(summary, args.runs, args.module)
+
+    loaded = set(runs[0]['modules'])
+    unexpected = [name for name in args.forbid if name in loaded]
+    summary['unexpected_imports'] = unexpected
+
+    if args.serve:
+        serve_runs = [measure_serve(args.module) for _ in range(args.runs)]
+        summary['serve'] = serve_runs
+        live = [run['live_s'] for run in serve_runs if run['live_s'] is not None]
+        ready = [run['ready_s'] for run in serve_runs if run['ready_s'] is not None]
+        print(f"\nArranque de uvicorn (mediana de {args.runs}):")
+        print(f"  /api/v1/live:  {statistics.median(live) if live else 'sin respuesta'} s")
+        print(f"  /api/v1/ready: {statistics.median(ready) if ready else 'sin respuesta'} s")
+
+    if args.json_output:
+        with open(args.json_output, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+    if unexpected:
+        print(f"\nMódulos que deberían cargarse de forma diferida: {', '.join(unexpected)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,398 @@
+"""
+Prueba de carga de la API con una mezcla de endpoints
+
+Genera llegadas en bucle abierto (proceso de Poisson a una tasa fija, sin
+esperar a que terminen las peticiones anteriores) con una mezcla
+configurable de /ask, /entities/{type}, /network/explore/{node_id} y
+/stats, y mide para cada tasa el throughput conseguido y la latencia
+p50/p95/p99. La latencia se cuenta desde el instante programado de cada
+llegada, así que el retraso acumulado cuando el servidor (o el generador)
+se satura también se mide.
+
+Las preguntas de /ask salen del corpus sintético. Una parte (--hot-ratio)
+se toma de un conjunto pequeño precalentado en la caché de respuestas; el
+resto son preguntas nuevas que recorren el pipeline completo.
+
+Por defecto la aplicación se ejecuta en este proceso (httpx.ASGITransport)
+con el cliente de OpenF1 real apuntando al servidor simulado. Con --url se
+ataca un backend ya arrancado (por ejemplo el contenedor apuntando a
+benchmarks.mock_openf1), que es lo que da la capacidad de un contenedor.
+
+Uso (desde backend/):
+    python -m benchmarks.load --rates 10 25 50 100 --duration 20
+    python -m benchmarks.load --mix ask=1 --hot-ratio 0 --rates 5 10 20
+    python -m benchmarks.load --url http://localhost:8000 --rates 50 100 200
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from .corpus import build_corpus
+from .mock_openf1 import MockConfig
+from .pipeline import RESULTS_DIR, git_revision
+from .stats import summarize
+
+PERCENTILES = (50, 95, 99)
+
+ENDPOINTS = ('ask', 'entities', 'explore', 'stats')
+DEFAULT_MIX = "ask=0.7,entities=0.15,explore=0.1,stats=0.05"
+
+ENTITY_TYPES = ('drivers', 'teams', 'circuits', 'sessions')
+
+# Preguntas precalentadas en la caché de respuestas
+HOT_POOL_SIZE = 50
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """
+    Interpreta una mezcla de endpoints ("ask=0.7,stats=0.3")
+
+    Args:
+        text: Pares endpoint=peso separados por comas
+
+    Returns:
+        Pesos normalizados por endpoint
+    """
+    weights: Dict[str, float] = {}
+    for part in text.split(','):
+        if not part.strip():
+            continue
+        name, _, value = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Endpoint desconocido en la mezcla: {name} (válidos: {', '.join(ENDPOINTS)})")
+        weights[name] = float(value) if value else 1.0
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("La mezcla debe tener algún peso positivo")
+    return {name: weight / total for name, weight in weights.items() if weight > 0}
+
+
+class Workload:
+    """Genera las peticiones según la mezcla y la proporción de caché caliente"""
+
+    def __init__(
+        self,
+        mix: Dict[str, float],
+        hot_ratio: float,
+        node_ids: List[str],
+        seed: int = 2024,
+        corpus_size: int = 2000
+    ):
+        """
+        Inicializa la carga
+
+        Args:
+            mix: Pesos normalizados por endpoint
+            hot_ratio: Proporción de preguntas tomadas del conjunto precalentado
+            node_ids: Nodos para /network/explore
+            seed: Semilla del generador
+            corpus_size: Preguntas base del corpus
+        """
+        self.rng = random.Random(seed)
+        self.kinds = list(mix)
+        self.weights = [mix[kind] for kind in self.kinds]
+        self.hot_ratio = hot_ratio
+        self.node_ids = node_ids
+
+        corpus = build_corpus(corpus_size + HOT_POOL_SIZE, seed, repeat_rate=0.0)
+        questions = list(dict.fromkeys(item['question'] for item in corpus))
+        self.hot = questions[:HOT_POOL_SIZE]
+        self.cold = questions[HOT_POOL_SIZE:]
+        self._sequence = 0
+
+    def next_request(self) -> Tuple[str, str, str, Optional[Dict[str, Any]]]:
+        """
+        Siguiente petición de la carga
+
+        Returns:
+            Tupla (etiqueta, método, ruta, cuerpo JSON o None)
+        """
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+
+        if kind == 'ask':
+            if self.hot and self.rng.random() < self.hot_ratio:
+                return 'ask_hot', 'POST', '/api/v1/ask', {'question': self.rng.choice(self.hot)}
+            # Sufijo único: la pregunta nunca está en la caché
+            self._sequence += 1
+            question = f"{self.rng.choice(self.cold)} ({self._sequence})"
+            return 'ask_cold', 'POST', '/api/v1/ask', {'question': question}
+
+        if kind == 'entities':
+            entity_type = self.rng.choice(ENTITY_TYPES)
+            return 'entities', 'GET', f'/api/v1/entities/{entity_type}?limit=50', None
+
+        if kind == 'explore' and self.node_ids:
+            node_id = self.rng.choice(self.node_ids)
+            return 'explore', 'GET', f'/api/v1/network/explore/{node_id}?depth=2', None
+
+        return 'stats', 'GET', '/api/v1/stats', None
+
+
+async def discover_nodes(client: httpx.AsyncClient, per_type: int = 100) -> List[str]:
+    """Identificadores de nodos para /network/explore, obtenidos de la propia API"""
+    node_ids: List[str] = []
+    for entity_type in ('drivers', 'teams', 'circuits'):
+        response = await client.get(f'/api/v1/entities/{entity_type}', params={'limit': per_type})
+        if response.status_code == 200:
+            node_ids.extend(entity['id'] for entity in response.json()['entities'])
+    return node_ids
+
+
+async def warm_up(client: httpx.AsyncClient, workload: Workload) -> None:
+    """Carga en la caché de respuestas las preguntas calientes"""
+    for question in workload.hot:
+        await client.post('/api/v1/ask', json={'question': question})
+
+
+async def _send(
+    client: httpx.AsyncClient,
+    request: Tuple[str, str, str, Optional[Dict[str, Any]]],
+    scheduled: float,
+    timeout: float
+) -> Tuple[str, str, float, float]:
+    kind, method, path, body = request
+    sent = time.perf_counter()
+    try:
+        response = await asyncio.wait_for(client.request(method, path, json=body), timeout)
+        outcome = str(response.status_code)
+    except asyncio.TimeoutError:
+        outcome = 'timeout'
+    except httpx.HTTPError as e:
+        outcome = type(e).__name__
+    return kind, outcome, time.perf_counter() - scheduled, sent - scheduled
+
+
+async def run_rate(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    rate: float,
+    duration: float,
+    timeout: float
+) -> Dict[str, Any]:
+    """
+    Lanza llegadas de Poisson a una tasa durante un intervalo
+
+    Args:
+        client: Cliente HTTP contra la aplicación
+        workload: Generador de peticiones
+        rate: Llegadas por segundo
+        duration: Segundos de generación
+        timeout: Tiempo máximo por petición
+
+    Returns:
+        Throughput, errores y latencias (global y por tipo de petición)
+    """
+    start = time.perf_counter()
+    offset = 0.0
+    tasks = []
+    while True:
+        offset += workload.rng.expovariate(rate)
+        if offset >= duration:
+            break
+        delay = start + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(
+            _send(client, workload.next_request(), start + offset, timeout)
+        ))
+
+    results = await asyncio.gather(*tasks)
+    wall = time.perf_counter() - start
+
+    latencies: List[float] = []
+    by_kind: Dict[str, List[float]] = {}
+    outcomes: Dict[str, int] = {}
+    send_lag: List[float] = []
+    for kind, outcome, latency, lag in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        send_lag.append(lag)
+        if outcome.startswith('2') or outcome == '404':
+            latencies.append(latency)
+            by_kind.setdefault(kind, []).append(latency)
+
+    failed = len(results) - len(latencies)
+    return {
+        'offered_rps': rate,
+        'sent': len(results),
+        # Tasa realmente emitida (las llegadas de Poisson fluctúan en torno a la ofrecida)
+        'sent_rps': round(len(results) / duration, 1),
+        'achieved_rps': round(len(latencies) / wall, 1) if wall else 0.0,
+        'wall_s': round(wall, 3),
+        'error_rate': round(failed / len(results), 4) if results else 0.0,
+        'outcomes': outcomes,
+        'latency': summarize(latencies, PERCENTILES),
+        'by_kind': {kind: summarize(values, PERCENTILES) for kind, values in sorted(by_kind.items())},
+        # Retraso del generador al emitir: si crece, el cuello de botella es el propio proceso
+        'send_lag': summarize(send_lag, PERCENTILES),
+    }
+
+
+def max_sustainable(steps: List[Dict[str, Any]], slo_ms: float, max_error_rate: float) -> Optional[float]:
+    """Mayor tasa ofrecida que se atendió dentro del SLO de p99 y de errores"""
+    sustained = [
+        step['offered_rps'] for step in steps
+        if step['latency']['p99_ms'] <= slo_ms
+        and step['error_rate'] <= max_error_rate
+        and step['achieved_rps'] >= 0.9 * step['sent_rps'] * (1 - step['error_rate'])
+    ]
+    return max(sustained) if sustained else None
+
+
+async def _in_process_target(args: argparse.Namespace):
+    """Aplicación en este proceso con OpenF1 simulado; devuelve (transporte, base, cierre)"""
+    from .fixtures import build_app
+    from .upstream import build_client, start_mock
+
+    config = MockConfig(**{name: getattr(args, name) for name in MockConfig.model_fields})
+    server, task, mock_url = await start_mock(config, args.payload_scale, args.seed)
+    client = build_client(mock_url)
+    app = await build_app(strategy=args.strategy, client=client, year=args.year)
+
+    async def close() -> None:
+        app.state.executor.shutdown()
+        await client.close()
+        server.should_exit = True
+        await task
+
+    return httpx.ASGITransport(app=app), "http://load", close
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Ejecuta la prueba para todas las tasas"""
+    mix = parse_mix(args.mix)
+
+    if args.url:
+        transport, base_url, close = None, args.url, None
+    else:
+        transport, base_url, close = await _in_process_target(args)
+
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    steps: List[Dict[str, Any]] = []
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url=base_url, limits=limits, timeout=args.timeout
+        ) as client:
+            workload = Workload(mix, args.hot_ratio, await discover_nodes(client), args.seed)
+            await warm_up(client, workload)
+
+            for rate in args.rates:
+                step = await run_rate(client, workload, rate, args.duration, args.timeout)
+                steps.append(step)
+                print(_format_step(step), flush=True)
+                if args.pause:
+                    await asyncio.sleep(args.pause)
+    finally:
+        if close is not None:
+            await close()
+
+    return {
+        'steps': steps,
+        'max_sustainable_rps': max_sustainable(steps, args.slo_ms, args.max_error_rate),
+        'meta': {
+            'label': args.label,
+            'git_revision': git_revision(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'target': args.url or f"in-process ({args.strategy})",
+            'mix': mix,
+            'hot_ratio': args.hot_ratio,
+            'duration_s': args.duration,
+            'slo_p99_ms': args.slo_ms,
+            'max_error_rate': args.max_error_rate,
+            'mock_config': None if args.url else MockConfig(
+                **{name: getattr(args, name) for name in MockConfig.model_fields}
+            ).model_dump(),
+        },
+    }
+
+
+def _format_step(step: Dict[str, Any]) -> str:
+    latency = step['latency']
+    return (
+        f"{step['offered_rps']:>8} {step['achieved_rps']:>9} {latency['p50_ms']:>9} "
+        f"{latency['p95_ms']:>9} {latency['p99_ms']:>9} {step['error_rate'] * 100:>7.2f}% "
+        f"{step['send_lag']['p99_ms']:>9}"
+    )
+
+
+def print_header() -> None:
+    """Cabecera de la tabla de latencia frente a throughput"""
+    header = (
+        f"{'ofrecido':>8} {'atendido':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'errores':>8} {'lag p99':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+
+
+def print_summary(results: Dict[str, Any]) -> None:
+    """Latencias por tipo de petición y capacidad estimada"""
+    print()
+    for step in results['steps']:
+        kinds = ', '.join(
+            f"{kind} p99 {summary['p99_ms']} ms" for kind, summary in step['by_kind'].items()
+        )
+        print(f"{step['offered_rps']:>8} req/s: {kinds}")
+    meta = results['meta']
+    sustainable = results['max_sustainable_rps']
+    print(
+        f"\nMáxima tasa sostenida (p99 <= {meta['slo_p99_ms']} ms, errores <= "
+        f"{meta['max_error_rate'] * 100:.1f}%): {sustainable if sustainable is not None else 'ninguna'} req/s"
+    )
+
+
+def main() -> int:
+    """Punto de entrada"""
+    parser = argparse.ArgumentParser(description="Prueba de carga en bucle abierto de la API")
+    parser.add_argument('--url', help="Backend ya arrancado (por defecto, la aplicación en este proceso)")
+    parser.add_argument('--rates', nargs='+', type=float, default=[5.0, 10.0, 25.0, 50.0], help="Llegadas por segundo")
+    parser.add_argument('--duration', type=float, default=15.0, help="Segundos por tasa")
+    parser.add_argument('--pause', type=float, default=1.0, help="Pausa entre tasas")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="Pesos por endpoint (ask, entities, explore, stats)")
+    parser.add_argument('--hot-ratio', type=float, default=0.5, help="Proporción de /ask con respuesta en caché")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Tiempo máximo por petición")
+    parser.add_argument('--max-connections', type=int, default=500)
+    parser.add_argument('--slo-ms', type=float, default=1000.0, help="p99 máximo para considerar una tasa sostenida")
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=2024)
+    parser.add_argument('--label', help="Etiqueta del resultado (por defecto, el commit)")
+    parser.add_argument('--output', help="Fichero JSON de resultados")
+    # Solo para la aplicación en este proceso
+    parser.add_argument('--strategy', default='thread', help="Estrategia del StageExecutor")
+    parser.add_argument('--year', type=int, default=2024)
+    parser.add_argument('--payload-scale', type=int, default=1)
+    for name, field in MockConfig.model_fields.items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=type(field.default), default=field.default,
+            help=f"OpenF1 simulado: {field.description}"
+        )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    print_header()
+    results = asyncio.run(run(args))
+    print_summary(results)
+
+    name = args.label or git_revision() or 'local'
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"load-{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
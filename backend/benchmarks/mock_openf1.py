@@ -0,0 +1,234 @@
+"""
+Servidor OpenF1 simulado para pruebas de carga e integración
+
+Sirve meetings, sessions, drivers, position, laps, stints y race_control
+a partir del fixture grabado (ver benchmarks/fixtures.py) con la misma
+forma que api.openf1.org/v1, incluidos los 404 de consultas sin
+resultados. Permite inyectar latencia, errores 5xx, ráfagas de 429 con
+Retry-After, límite de peticiones por segundo, cortes a mitad de respuesta
+y cargas más voluminosas.
+
+Uso (desde backend/):
+    python -m benchmarks.mock_openf1 --port 8765 --latency-ms 80 --error-rate 0.05
+    OPENF1_BASE_URL=http://localhost:8765/v1 uvicorn src.api.main:app
+
+Los parámetros se pueden cambiar en caliente con POST /_mock/config y las
+peticiones recibidas se consultan en GET /_mock/stats.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import sys
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+
+from .fixtures import DEFAULT_FIXTURE, FixtureUpstream
+
+logger = logging.getLogger(__name__)
+
+
+class SimulatedTruncation(ConnectionResetError):
+    """Corte intencionado de una respuesta a mitad del cuerpo"""
+
+
+class _TruncationLogFilter(logging.Filter):
+    """Evita que uvicorn registre como error los cortes simulados"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not (record.exc_info and isinstance(record.exc_info[1], SimulatedTruncation))
+
+
+class MockConfig(BaseModel):
+    """Parámetros del servidor simulado"""
+    latency_ms: float = Field(0.0, ge=0, description="Latencia base hasta las cabeceras")
+    jitter_ms: float = Field(0.0, ge=0, description="Latencia adicional aleatoria (uniforme)")
+    error_rate: float = Field(0.0, ge=0, le=1, description="Proporción de respuestas 5xx")
+    rate_limit: float = Field(0.0, ge=0, description="Peticiones por segundo antes de responder 429 (0 = sin límite)")
+    burst_every: float = Field(0.0, ge=0, description="Periodo (s) de las ráfagas de 429 (0 = sin ráfagas)")
+    burst_duration: float = Field(0.0, ge=0, description="Duración (s) de cada ráfaga de 429")
+    truncate_rate: float = Field(0.0, ge=0, le=1, description="Proporción de respuestas cortadas a mitad")
+    chunk_size: int = Field(65536, ge=1, description="Tamaño de los fragmentos del cuerpo")
+    chunk_delay_ms: float = Field(0.0, ge=0, description="Pausa entre fragmentos (cuerpos lentos)")
+
+
+class MockStats:
+    """Contadores de peticiones por endpoint y estado"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.requests: Dict[str, Dict[str, int]] = {}
+        self.bytes_sent = 0
+
+    def record(self, endpoint: str, status: str) -> None:
+        by_status = self.requests.setdefault(endpoint, {})
+        by_status[status] = by_status.get(status, 0) + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'uptime_s': round(time.time() - self.started_at, 1),
+            'requests': self.requests,
+            'total': sum(sum(v.values()) for v in self.requests.values()),
+            'bytes_sent': self.bytes_sent,
+        }
+
+
+class _RateWindow:
+    """Límite de peticiones por segundo con ventana deslizante de un segundo"""
+
+    def __init__(self):
+        self.timestamps: List[float] = []
+
+    def allow(self, rate: float, now: float) -> bool:
+        if rate <= 0:
+            return True
+        self.timestamps = [t for t in self.timestamps if now - t < 1.0]
+        if len(self.timestamps) >= rate:
+            return False
+        self.timestamps.append(now)
+        return True
+
+
+def create_app(
+    config: Optional[MockConfig] = None,
+    upstream: Optional[FixtureUpstream] = None,
+    seed: int = 0
+) -> FastAPI:
+    """
+    Crea la aplicación del servidor simulado
+
+    Args:
+        config: Parámetros iniciales
+        upstream: Datos a servir (por defecto, el fixture de 2024)
+        seed: Semilla para la latencia y los errores aleatorios
+
+    Returns:
+        Aplicación FastAPI
+    """
+    app = FastAPI(title="OpenF1 mock", docs_url=None, redoc_url=None)
+    uvicorn_logger = logging.getLogger("uvicorn.error")
+    if not any(isinstance(f, _TruncationLogFilter) for f in uvicorn_logger.filters):
+        uvicorn_logger.addFilter(_TruncationLogFilter())
+    app.state.config = config or MockConfig()
+    app.state.upstream = upstream or FixtureUpstream()
+    app.state.stats = MockStats()
+    rng = random.Random(seed)
+    window = _RateWindow()
+    started_at = time.monotonic()
+
+    def retry_after_burst(now: float) -> Optional[float]:
+        """Segundos que quedan de la ráfaga de 429 actual (None si no hay ráfaga)"""
+        cfg: MockConfig = app.state.config
+        if cfg.burst_every <= 0 or cfg.burst_duration <= 0:
+            return None
+        phase = (now - started_at) % cfg.burst_every
+        if phase < cfg.burst_duration:
+            return cfg.burst_duration - phase
+        return None
+
+    async def body_chunks(payload: bytes, truncate: bool) -> AsyncIterator[bytes]:
+        cfg: MockConfig = app.state.config
+        limit = len(payload) // 2 if truncate else len(payload)
+        for offset in range(0, limit, cfg.chunk_size):
+            chunk = payload[offset:min(offset + cfg.chunk_size, limit)]
+            app.state.stats.bytes_sent += len(chunk)
+            yield chunk
+            if cfg.chunk_delay_ms:
+                await asyncio.sleep(cfg.chunk_delay_ms / 1000.0)
+        if truncate:
+            # Cerrar la conexión sin completar el cuerpo
+            raise SimulatedTruncation("Respuesta truncada por el servidor simulado")
+
+    @app.get("/_mock/stats")
+    async def mock_stats() -> Dict[str, Any]:
+        return app.state.stats.as_dict()
+
+    @app.get("/_mock/config")
+    async def mock_get_config() -> MockConfig:
+        return app.state.config
+
+    @app.post("/_mock/config")
+    async def mock_set_config(update: Dict[str, Any]) -> MockConfig:
+        app.state.config = MockConfig(**{**app.state.config.model_dump(), **update})
+        logger.info(f"Configuración del mock actualizada: {app.state.config}")
+        return app.state.config
+
+    @app.post("/_mock/reset")
+    async def mock_reset() -> Dict[str, Any]:
+        app.state.stats = MockStats()
+        return {'reset': True}
+
+    @app.get("/v1/{endpoint}")
+    async def openf1_endpoint(endpoint: str, request: Request) -> Response:
+        cfg: MockConfig = app.state.config
+        stats: MockStats = app.state.stats
+
+        delay = cfg.latency_ms + (rng.uniform(0, cfg.jitter_ms) if cfg.jitter_ms else 0.0)
+        if delay:
+            await asyncio.sleep(delay / 1000.0)
+
+        now = time.monotonic()
+        burst_left = retry_after_burst(now)
+        if burst_left is not None or not window.allow(cfg.rate_limit, now):
+            retry_after = max(1, math.ceil(burst_left if burst_left is not None else 1.0))
+            stats.record(endpoint, '429')
+            return JSONResponse(
+                {'detail': 'Too Many Requests'}, status_code=429,
+                headers={'Retry-After': str(retry_after)}
+            )
+
+        if cfg.error_rate and rng.random() < cfg.error_rate:
+            status_code = rng.choice((500, 502, 503))
+            stats.record(endpoint, str(status_code))
+            return JSONResponse({'detail': 'Simulated upstream error'}, status_code=status_code)
+
+        rows = app.state.upstream.rows(endpoint, dict(request.query_params))
+        if not rows:
+            stats.record(endpoint, '404')
+            return JSONResponse({'detail': 'No results found.'}, status_code=404)
+
+        payload = json.dumps(rows, separators=(',', ':')).encode()
+        truncate = bool(cfg.truncate_rate) and rng.random() < cfg.truncate_rate
+        stats.record(endpoint, 'truncated' if truncate else '200')
+        return StreamingResponse(body_chunks(payload, truncate), media_type='application/json')
+
+    return app
+
+
+def main() -> int:
+    """Punto de entrada"""
+    parser = argparse.ArgumentParser(description="Servidor OpenF1 simulado a partir del fixture grabado")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixture', default=DEFAULT_FIXTURE)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--race-laps', type=int, default=57, help="Vueltas de las carreras generadas")
+    parser.add_argument('--payload-scale', type=int, default=1, help="Multiplicador de muestras de position por vuelta")
+    for name, field in MockConfig.model_fields.items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=type(field.default), default=field.default,
+            help=field.description
+        )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    config = MockConfig(**{name: getattr(args, name) for name in MockConfig.model_fields})
+    upstream = FixtureUpstream(args.fixture, race_laps=args.race_laps, payload_scale=args.payload_scale)
+    app = create_app(config, upstream, seed=args.seed)
+
+    logger.info(f"OpenF1 simulado en http://{args.host}:{args.port}/v1 con {config}")
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
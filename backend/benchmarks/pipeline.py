@@ -0,0 +1,340 @@
+"""
+Benchmark reproducible del pipeline de preguntas
+
+Construye KnowledgeBase, NLPProcessor y QueryService sobre el fixture de
+temporada (sin red), reproduce el corpus sintético y mide:
+
+- throughput (preguntas por segundo)
+- p50/p95/p99 de cada etapa (intent, entities, query, openf1, format) y del total
+- latencia por query_type
+- asignaciones de memoria con tracemalloc (pasada aparte, para no
+  distorsionar las latencias)
+
+Los resultados se guardan en benchmarks/results/ como JSON para comparar
+entre commits.
+
+Uso (desde backend/):
+    python -m benchmarks.pipeline --size 5000
+    python -m benchmarks.pipeline --compare benchmarks/results/pipeline-abc1234.json
+    python -m benchmarks.pipeline --diff base.json nuevo.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from .corpus import build_corpus, corpus_stats
+from .fixtures import build_services
+from .stats import percentile, summarize
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+PERCENTILES = (50, 95, 99)
+
+# Métricas comparadas con --compare/--diff: (ruta en el JSON, mayor es mejor)
+COMPARED_METRICS = [
+    (('throughput_qps',), True),
+    (('total', 'p50_ms'), False),
+    (('total', 'p95_ms'), False),
+    (('total', 'p99_ms'), False),
+    (('stages', 'intent', 'p99_ms'), False),
+    (('stages', 'entities', 'p99_ms'), False),
+    (('stages', 'query', 'p99_ms'), False),
+    (('stages', 'openf1', 'p99_ms'), False),
+    (('stages', 'format', 'p99_ms'), False),
+    (('allocations', 'peak_per_question_p95_bytes'), False),
+    (('allocations', 'retained_bytes'), False),
+]
+
+
+def git_revision() -> Optional[str]:
+    """Commit actual (abreviado) o None fuera de un repositorio git"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(__file__), stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def measure_latency(query_service, corpus: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reproduce el corpus midiendo la duración de cada etapa
+
+    Args:
+        query_service: Servicio de consultas
+        corpus: Preguntas a reproducir
+
+    Returns:
+        Resultados de latencia y throughput
+    """
+    stages: Dict[str, List[float]] = {}
+    totals: List[float] = []
+    by_type: Dict[str, List[float]] = {}
+    misclassified = 0
+    cache_hits = 0
+
+    wall_start = time.perf_counter()
+    for item in corpus:
+        timings: Dict[str, float] = {}
+        start = time.perf_counter()
+        response = await query_service.process_question(item['question'], timings)
+        elapsed = time.perf_counter() - start
+
+        totals.append(elapsed)
+        by_type.setdefault(response.query_type, []).append(elapsed)
+        if not timings:
+            cache_hits += 1
+        for stage, seconds in timings.items():
+            stages.setdefault(stage, []).append(seconds)
+        if response.query_type != item['expected_type']:
+            misclassified += 1
+    wall = time.perf_counter() - wall_start
+
+    return {
+        'wall_s': round(wall, 3),
+        'throughput_qps': round(len(corpus) / wall, 1) if wall else 0.0,
+        'cache_hits': cache_hits,
+        'misclassified': misclassified,
+        'total': summarize(totals, PERCENTILES),
+        'stages': {stage: summarize(values, PERCENTILES) for stage, values in sorted(stages.items())},
+        'by_query_type': {
+            query_type: summarize(values, PERCENTILES) for query_type, values in sorted(by_type.items())
+        },
+    }
+
+
+def _short_path(filename: str) -> str:
+    """Ruta legible de un fichero fuente (relativa al proyecto o a site-packages)"""
+    if 'site-packages' + os.sep in filename:
+        return filename.split('site-packages' + os.sep, 1)[1]
+    if filename.startswith(os.getcwd() + os.sep):
+        return os.path.relpath(filename)
+    return os.sep.join(filename.split(os.sep)[-2:])
+
+
+async def measure_allocations(query_service, corpus: List[Dict[str, Any]], top: int = 10) -> Dict[str, Any]:
+    """
+    Mide con tracemalloc el pico de memoria por pregunta y lo retenido
+
+    Args:
+        query_service: Servicio de consultas (con la caché vacía)
+        corpus: Preguntas a reproducir
+        top: Número de puntos de asignación a listar
+
+    Returns:
+        Resumen de asignaciones
+    """
+    peaks: List[float] = []
+    tracemalloc.start(10)
+    try:
+        before = tracemalloc.take_snapshot()
+        baseline, _ = tracemalloc.get_traced_memory()
+        for item in corpus:
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await query_service.process_question(item['question'])
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(max(0, peak - current))
+        retained, _ = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap>")]
+    diff = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+    sites = [
+        {
+            'site': f"{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+            'size_diff_bytes': stat.size_diff,
+            'count_diff': stat.count_diff,
+        }
+        for stat in diff[:top]
+    ]
+
+    return {
+        'questions': len(corpus),
+        'peak_per_question_p50_bytes': int(percentile(peaks, 50)),
+        'peak_per_question_p95_bytes': int(percentile(peaks, 95)),
+        'peak_per_question_max_bytes': int(max(peaks)) if peaks else 0,
+        'retained_bytes': int(retained - baseline),
+        'top_retained_sites': sites,
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Ejecuta el benchmark completo"""
+    knowledge_base, _, query_service = await build_services(strategy=args.strategy)
+
+    corpus = build_corpus(args.size, args.seed, args.typo_rate, args.repeat_rate)
+    warmup = build_corpus(args.warmup, args.seed + 1, args.typo_rate, 0.0) if args.warmup else []
+
+    try:
+        # Calentamiento: carga perezosa de telemetría, regex compiladas, pools
+        for item in warmup:
+            await query_service.process_question(item['question'])
+        query_service.response_cache.clear()
+
+        results = await measure_latency(query_service, corpus)
+
+        if args.alloc_sample:
+            query_service.response_cache.clear()
+            results['allocations'] = await measure_allocations(query_service, corpus[:args.alloc_sample])
+    finally:
+        query_service.executor.shutdown()
+        await knowledge_base.client.close()
+
+    results['meta'] = {
+        'label': args.label,
+        'git_revision': git_revision(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'strategy': args.strategy,
+        'corpus': corpus_stats(corpus),
+        'seed': args.seed,
+        'typo_rate': args.typo_rate,
+        'repeat_rate': args.repeat_rate,
+        'warmup': args.warmup,
+    }
+    return results
+
+
+def _lookup(data: Dict[str, Any], path) -> Optional[float]:
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compara dos resultados del benchmark
+
+    Args:
+        baseline: Resultado de referencia
+        current: Resultado nuevo
+
+    Returns:
+        Filas con métrica, valores, variación (%) y si es una mejora
+    """
+    rows = []
+    for path, higher_is_better in COMPARED_METRICS:
+        old = _lookup(baseline, path)
+        new = _lookup(current, path)
+        if old is None or new is None:
+            continue
+        change = ((new - old) / old * 100.0) if old else 0.0
+        rows.append({
+            'metric': '.'.join(path),
+            'baseline': old,
+            'current': new,
+            'change_pct': round(change, 1),
+            'better': (change > 0) == higher_is_better if change else None,
+        })
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]], baseline_label: str, current_label: str) -> None:
+    """Imprime la tabla de comparación"""
+    print(f"\n{'métrica':<42} {baseline_label:>14} {current_label:>14} {'cambio':>9}")
+    print("-" * 82)
+    for row in rows:
+        marker = '' if row['better'] is None else (' +' if row['better'] else ' -')
+        print(f"{row['metric']:<42} {row['baseline']:>14} {row['current']:>14} {row['change_pct']:>8}%{marker}")
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    """Imprime un resumen legible"""
+    meta = results['meta']
+    corpus = meta['corpus']
+    print(
+        f"{corpus['questions']} preguntas ({corpus['unique']} únicas, {corpus['typos']} con errata) "
+        f"en {results['wall_s']} s -> {results['throughput_qps']} preguntas/s "
+        f"[estrategia {meta['strategy']}, commit {meta['git_revision']}]"
+    )
+    print(f"Aciertos de caché: {results['cache_hits']}, tipo distinto del esperado: {results['misclassified']}\n")
+
+    header = f"{'':<20} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    print(header)
+    print("-" * len(header))
+    rows = [('total', results['total'])]
+    rows += [(f"etapa {name}", summary) for name, summary in results['stages'].items()]
+    rows += [(f"tipo {name}", summary) for name, summary in results['by_query_type'].items()]
+    for name, summary in rows:
+        print(
+            f"{name:<20} {summary['count']:>6} {summary['p50_ms']:>9} {summary['p95_ms']:>9} "
+            f"{summary['p99_ms']:>9} {summary['max_ms']:>9}"
+        )
+
+    allocations = results.get('allocations')
+    if allocations:
+        print(
+            f"\nMemoria ({allocations['questions']} preguntas): pico por pregunta p50 "
+            f"{allocations['peak_per_question_p50_bytes']} B, p95 {allocations['peak_per_question_p95_bytes']} B; "
+            f"retenido {allocations['retained_bytes']} B"
+        )
+        for site in allocations['top_retained_sites'][:5]:
+            print(f"  {site['site']}: {site['size_diff_bytes']} B en {site['count_diff']} bloques")
+
+
+def default_output(label: Optional[str]) -> str:
+    """Ruta por defecto del fichero de resultados"""
+    name = label or git_revision() or 'local'
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    return os.path.join(RESULTS_DIR, f"pipeline-{name}-{stamp}.json")
+
+
+def main() -> int:
+    """Punto de entrada"""
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de preguntas sobre el fixture")
+    parser.add_argument('--size', type=int, default=5000, help="Preguntas del corpus")
+    parser.add_argument('--seed', type=int, default=2024)
+    parser.add_argument('--typo-rate', type=float, default=0.2)
+    parser.add_argument('--repeat-rate', type=float, default=0.1)
+    parser.add_argument('--warmup', type=int, default=200, help="Preguntas de calentamiento (no medidas)")
+    parser.add_argument('--strategy', default='inline', help="Estrategia del StageExecutor")
+    parser.add_argument('--alloc-sample', type=int, default=500, help="Preguntas medidas con tracemalloc (0 = no medir)")
+    parser.add_argument('--label', help="Etiqueta del resultado (por defecto, el commit)")
+    parser.add_argument('--output', help="Fichero JSON de resultados")
+    parser.add_argument('--compare', metavar='BASELINE', help="Compara el resultado con otro JSON")
+    parser.add_argument('--diff', nargs=2, metavar=('BASELINE', 'CURRENT'), help="Compara dos JSON sin ejecutar")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.diff:
+        with open(args.diff[0]) as f:
+            baseline = json.load(f)
+        with open(args.diff[1]) as f:
+            current = json.load(f)
+        print_comparison(compare(baseline, current), 'base', 'actual')
+        return 0
+
+    results = asyncio.run(run(args))
+    print_results(results)
+
+    output = args.output or default_output(args.label)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print_comparison(compare(baseline, results), 'base', 'actual')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Coste de poblar la red semántica
+
+Dos medidas, a varias escalas (número de sesiones sintéticas):
+
+- network: sesiones y vueltas ('vuelta', cada una con una arista
+  ``pertenece_a`` a su sesión) insertadas en una SemanticNetwork vacía con
+  add_node/add_edge uno a uno y con add_nodes_bulk/add_edges_bulk
+- knowledge_base: KnowledgeBase.load_data de una temporada sintética
+  (meetings, sesiones y pilotos servidos desde memoria, sin red), que mide
+  solo la CPU de poblar la red
+
+Uso (desde backend/):
+    python -m benchmarks.population
+    python -m benchmarks.population --sessions 100 1000 --laps 100
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+SESSION_NAMES = ('Practice 1', 'Practice 2', 'Practice 3', 'Qualifying', 'Race')
+
+
+def synthetic_calendar(sessions: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Meetings y sesiones con el formato de OpenF1 (cinco sesiones por meeting)
+
+    Args:
+        sessions: Número de sesiones
+
+    Returns:
+        Tupla (meetings, sessions)
+    """
+    meetings = []
+    rows = []
+    for index in range(sessions):
+        meeting_index, slot = divmod(index, len(SESSION_NAMES))
+        circuit_key = 1000 + meeting_index
+        country = f"Country {meeting_index % 50}"
+        if slot == 0:
+            meetings.append({
+                'meeting_key': circuit_key,
+                'circuit_key': circuit_key,
+                'circuit_short_name': f"Circuit {meeting_index}",
+                'country_name': country,
+                'location': f"City {meeting_index}",
+            })
+        rows.append({
+            'session_key': 100000 + index,
+            'session_name': SESSION_NAMES[slot],
+            'session_type': SESSION_NAMES[slot].split()[0],
+            'date_start': f"2024-{1 + meeting_index % 12:02d}-{1 + slot:02d}T13:00:00+00:00",
+            'year': 2024,
+            'circuit_key': circuit_key,
+            'location': f"City {meeting_index}",
+            'country_name': country,
+        })
+    return meetings, rows
+
+
+def _network_items(sessions: int, laps: int) -> Tuple[List[Tuple[str, str, Dict[str, Any]]], List[Tuple[str, str, str, None]]]:
+    """Nodos (sesiones y vueltas) y aristas vuelta -> sesión"""
+    nodes = []
+    edges = []
+    for session in range(sessions):
+        session_id = f"session_{session}"
+        nodes.append((session_id, 'sesion', {'session_key': session, 'year': 2024}))
+        for lap in range(1, laps + 1):
+            lap_id = f"lap_{session}_{lap}"
+            nodes.append((lap_id, 'vuelta', {'lap_number': lap, 'lap_duration': 90.0 + lap % 7}))
+            edges.append((lap_id, session_id, 'pertenece_a', None))
+    return nodes, edges
+
+
+def _insert_single(network, nodes, edges) -> None:
+    for node_id, node_type, attributes in nodes:
+        network.add_node(node_id, node_type, attributes)
+    for source, target, relation, attributes in edges:
+        network.add_edge(source, target, relation, attributes)
+
+
+def _insert_bulk(network, nodes, edges) -> None:
+    network.add_nodes_bulk(nodes)
+    network.add_edges_bulk(edges)
+
+
+def _best_seconds(insert, nodes, edges, rounds: int) -> Tuple[float, Tuple[int, int]]:
+    """Mejor tiempo de varias inserciones en redes nuevas y tamaño de la red"""
+    from src.core.semantic_network import SemanticNetwork
+
+    best = float('inf')
+    size = (0, 0)
+    for _ in range(rounds):
+        network = SemanticNetwork()
+        gc.collect()
+        start = time.perf_counter()
+        insert(network, nodes, edges)
+        best = min(best, time.perf_counter() - start)
+        size = (network.graph.number_of_nodes(), network.graph.number_of_edges())
+        del network
+    return best, size
+
+
+def measure_network(sessions: int, laps: int, rounds: int = 3) -> Dict[str, Any]:
+    """
+    Inserta la misma red uno a uno y en lote
+
+    Args:
+        sessions: Sesiones sintéticas
+        laps: Vueltas por sesión
+        rounds: Repeticiones de cada medida (se toma la mejor)
+
+    Returns:
+        Fila de resultados
+    """
+    nodes, edges = _network_items(sessions, laps)
+    single_s, single_size = _best_seconds(_insert_single, nodes, edges, rounds)
+    bulk_s, bulk_size = _best_seconds(_insert_bulk, nodes, edges, rounds)
+    assert single_size == bulk_size == (len(nodes), len(edges))
+
+    items = len(nodes) + len(edges)
+    return {
+        'sessions': sessions,
+        'nodes': len(nodes),
+        'edges': len(edges),
+        'single_ms': round(single_s * 1000, 1),
+        'bulk_ms': round(bulk_s * 1000, 1),
+        'single_us': round(single_s / items * 1e6, 2),
+        'bulk_us': round(bulk_s / items * 1e6, 2),
+    }
+
+
+class SyntheticClient:
+    """Cliente de OpenF1 en memoria con el calendario sintético"""
+
+    ENGINES = ('Ferrari', 'Mercedes', 'Renault', 'Red Bull')
+
+    def __init__(self, sessions: int):
+        """
+        Genera el calendario y los pilotos
+
+        Args:
+            sessions: Número de sesiones; cada una de las cinco primeras
+                devuelve sessions / 5 pilotos, dos por equipo
+        """
+        self.meetings, self.sessions = synthetic_calendar(sessions)
+        drivers = max(20, sessions // 5)
+        self.drivers = [
+            {
+                'driver_number': number,
+                'full_name': f"Driver {number}",
+                'name_acronym': f"D{number:02d}"[:3],
+                'team_name': f"Team {number // 2} {self.ENGINES[number // 2 % len(self.ENGINES)]}",
+                'country_code': 'ESP',
+            }
+            for number in range(1, drivers + 1)
+        ]
+
+    async def get_meetings(self, year: int) -> List[Dict[str, Any]]:
+        return self.meetings
+
+    async def get_sessions(self, year: int) -> List[Dict[str, Any]]:
+        return self.sessions
+
+    async def get_drivers(self, session_key: int) -> List[Dict[str, Any]]:
+        return [dict(driver, session_key=session_key) for driver in self.drivers]
+
+
+async def measure_knowledge_base(sessions: int) -> Dict[str, Any]:
+    """
+    Carga una temporada sintética con KnowledgeBase.load_data
+
+    Args:
+        sessions: Sesiones sintéticas
+
+    Returns:
+        Fila de resultados
+    """
+    from src.services.knowledge_base import KnowledgeBase
+
+    knowledge_base = KnowledgeBase(SyntheticClient(sessions))
+    gc.collect()
+    start = time.perf_counter()
+    await knowledge_base.load_data(year=2024)
+    elapsed = time.perf_counter() - start
+
+    graph = knowledge_base.network.graph
+    return {
+        'sessions': sessions,
+        'nodes': graph.number_of_nodes(),
+        'edges': graph.number_of_edges(),
+        'populate_ms': round(elapsed * 1000, 1),
+        'per_session_us': round(elapsed / max(1, sessions) * 1e6, 2),
+    }
+
+
+def print_rows(network_rows: List[Dict[str, Any]], kb_rows: List[Dict[str, Any]]) -> None:
+    """Imprime las tablas de resultados"""
+    header = (
+        f"{'sesiones':>8} {'nodos':>8} {'aristas':>8} {'uno a uno ms':>13} {'lote ms':>9} "
+        f"{'µs/elem 1a1':>12} {'µs/elem lote':>13}"
+    )
+    print("SemanticNetwork")
+    print(header)
+    print("-" * len(header))
+    for row in network_rows:
+        print(
+            f"{row['sessions']:>8} {row['nodes']:>8} {row['edges']:>8} {row['single_ms']:>13} "
+            f"{row['bulk_ms']:>9} {row['single_us']:>12} {row['bulk_us']:>13}"
+        )
+
+    header = f"{'sesiones':>8} {'nodos':>8} {'aristas':>8} {'poblar ms':>10} {'µs/sesión':>10}"
+    print()
+    print("KnowledgeBase")
+    print(header)
+    print("-" * len(header))
+    for row in kb_rows:
+        print(
+            f"{row['sessions']:>8} {row['nodes']:>8} {row['edges']:>8} "
+            f"{row['populate_ms']:>10} {row['per_session_us']:>10}"
+        )
+
+
+def main() -> int:
+    """Punto de entrada"""
+    parser = argparse.ArgumentParser(description="Coste de poblar la red semántica")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[100, 1000],
+                        help="Sesiones sintéticas por escala")
+    parser.add_argument('--laps', type=int, default=100, help="Vueltas por sesión en la red")
+    parser.add_argument('--kb-scale', type=int, default=10,
+                        help="Multiplicador de sesiones para la medida de KnowledgeBase")
+    parser.add_argument('--json', dest='json_output', help="Guarda los resultados en este fichero")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    network_rows = [measure_network(sessions, args.laps) for sessions in args.sessions]
+    kb_rows = [
+        asyncio.run(measure_knowledge_base(sessions * args.kb_scale))
+        for sessions in args.sessions
+    ]
+    print_rows(network_rows, kb_rows)
+
+    if args.json_output:
+        with open(args.json_output, 'w') as f:
+            json.dump({'network': network_rows, 'knowledge_base': kb_rows}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Coste de serialización de las respuestas por endpoint
+
+Sobre el fixture de temporada (sin red) construye los payloads de /ask,
+/entities, /network/explore y /stats y mide, por respuesta:
+
+- fastapi: el camino por defecto de FastAPI (validación contra el
+  response_model, serialización del modelo y json.dumps de JSONResponse)
+- fast: el payload construido por el endpoint serializado directamente
+  (orjson si está instalado)
+- memo: servir los bytes ya serializados (respuestas cacheadas por ETag
+  o por pregunta)
+
+Uso (desde backend/):
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --repeat 2000 --json resultados.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from .fixtures import build_services
+
+QUESTIONS = [
+    "¿Quién es Max Verstappen?",
+    "¿En qué equipo corre Hamilton?",
+    "¿Qué motor usa McLaren?",
+    "¿Dónde está el circuito de Monza?",
+]
+
+
+def _per_call_us(func: Callable[[], Any], repeat: int) -> float:
+    """Microsegundos por llamada (mejor de tres tandas)"""
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return round(best * 1e6, 2)
+
+
+def _fastapi_path(model_type, content: Any) -> Callable[[], bytes]:
+    """Validación y serialización que FastAPI aplica a un valor devuelto por el endpoint"""
+    field = create_response_field(name='response', type_=model_type, mode='serialization')
+
+    async def serialize() -> bytes:
+        serialized = await serialize_response(field=field, response_content=content)
+        return JSONResponse(serialized).body
+
+    def run() -> bytes:
+        # serialize_response no suspende en endpoints async: se ejecuta la
+        # corrutina sin event loop para no medir su coste
+        coroutine = serialize()
+        try:
+            coroutine.send(None)
+        except StopIteration as done:
+            return done.value
+        raise RuntimeError("serialize_response se suspendió")
+
+    return run
+
+
+async def build_payloads() -> Dict[str, Dict[str, Any]]:
+    """Payloads reales de cada endpoint (modelo, contenido devuelto y dict construido)"""
+    from src.api.routes import ENTITY_TYPES
+    from src.models.schemas import AnswerResponse, EntityListResponse, NetworkExploreResponse
+
+    knowledge_base, _, query_service = await build_services()
+    network = knowledge_base.get_semantic_network()
+    payloads: Dict[str, Dict[str, Any]] = {}
+
+    try:
+        for index, question in enumerate(QUESTIONS):
+            answer = await query_service.process_question(question)
+            payloads[f"ask[{index}]"] = {
+                'model': AnswerResponse, 'content': answer, 'payload': answer.model_dump(),
+            }
+
+        for entity_type, limit in (('drivers', 50), ('sessions', 1000)):
+            page = network.list_nodes(ENTITY_TYPES[entity_type], limit=limit)
+            payload = {
+                'entity_type': entity_type,
+                'count': len(page['nodes']),
+                'total': page['total'],
+                'entities': page['nodes'],
+                'next_cursor': None,
+            }
+            payloads[f"entities/{entity_type}?limit={limit}"] = {
+                'model': EntityListResponse, 'content': EntityListResponse(**payload), 'payload': payload,
+            }
+
+        for node_id, depth in (('driver_1', 2), ('driver_1', 3), ('team_ferrari', 3)):
+            details = network.get_node_details(node_id)
+            payload = {
+                'node_id': node_id,
+                'node_type': details['type'],
+                'attributes': details['attributes'],
+                'related_nodes': network.get_related_entities(node_id, max_depth=depth),
+            }
+            payloads[f"explore/{node_id}?depth={depth}"] = {
+                'model': NetworkExploreResponse, 'content': NetworkExploreResponse(**payload), 'payload': payload,
+            }
+
+        stats = {'status': 'success', 'stats': network.get_stats(), 'knowledge_base_loaded': True}
+        payloads['stats'] = {'model': dict, 'content': stats, 'payload': stats}
+    finally:
+        query_service.executor.shutdown()
+        await knowledge_base.client.close()
+
+    return payloads
+
+
+def measure(payloads: Dict[str, Dict[str, Any]], repeat: int) -> List[Dict[str, Any]]:
+    """
+    Mide cada camino de serialización para cada payload
+
+    Args:
+        payloads: Payloads por endpoint (ver build_payloads)
+        repeat: Repeticiones por tanda
+
+    Returns:
+        Filas con bytes y microsegundos por camino
+    """
+    from src.api.responses import SerializedCache, dumps
+
+    rows = []
+    for name, item in payloads.items():
+        fastapi_run = _fastapi_path(item['model'], item['content'])
+        payload = item['payload']
+        body = dumps(payload)
+
+        cache = SerializedCache(max_entries=8)
+        cache.get_or_build(name, lambda: payload)
+
+        # El camino de FastAPI es mucho más lento: menos repeticiones
+        fastapi_us = _per_call_us(fastapi_run, max(1, repeat // 10))
+        fast_us = _per_call_us(lambda: dumps(payload), repeat)
+        memo_us = _per_call_us(lambda: cache.get_or_build(name, lambda: payload), repeat)
+
+        rows.append({
+            'endpoint': name,
+            'bytes': len(body),
+            'fastapi_us': fastapi_us,
+            'fast_us': fast_us,
+            'memo_us': memo_us,
+            'speedup_fast': round(fastapi_us / fast_us, 1) if fast_us else None,
+        })
+    return rows
+
+
+def print_rows(rows: List[Dict[str, Any]]) -> None:
+    """Imprime la tabla de resultados"""
+    header = f"{'endpoint':<34} {'bytes':>9} {'fastapi µs':>11} {'fast µs':>9} {'memo µs':>9} {'x':>6}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['endpoint']:<34} {row['bytes']:>9} {row['fastapi_us']:>11} "
+            f"{row['fast_us']:>9} {row['memo_us']:>9} {row['speedup_fast']:>6}"
+        )
+
+
+def main() -> int:
+    """Punto de entrada"""
+    parser = argparse.ArgumentParser(description="Coste de serialización de las respuestas por endpoint")
+    parser.add_argument('--repeat', type=int, default=500, help="Repeticiones por tanda")
+    parser.add_argument('--json', dest='json_output', help="Guarda los resultados en este fichero")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    from src.api.responses import orjson
+    print(f"Codificador: {'orjson ' + orjson.__version__ if orjson else 'json (stdlib)'}\n")
+
+    rows = measure(asyncio.run(build_payloads()), args.repeat)
+    print_rows(rows)
+
+    if args.json_output:
+        with open(args.json_output, 'w') as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
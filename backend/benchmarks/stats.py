@@ -0,0 +1,33 @@
+"""
+Utilidades estadísticas compartidas por los benchmarks
+"""
+import statistics
+from typing import Dict, List
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentil por el método del rango más cercano"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(values: List[float], percentiles=(50, 99)) -> Dict[str, float]:
+    """
+    Resumen en milisegundos de una serie de latencias
+
+    Args:
+        values: Latencias en segundos
+        percentiles: Percentiles a incluir (claves pNN_ms)
+
+    Returns:
+        Diccionario con count, percentiles, max_ms y mean_ms
+    """
+    summary: Dict[str, float] = {'count': len(values)}
+    for pct in percentiles:
+        summary[f'p{pct}_ms'] = round(percentile(values, pct) * 1000, 3)
+    summary['max_ms'] = round(max(values) * 1000, 3) if values else 0.0
+    summary['mean_ms'] = round(statistics.fmean(values) * 1000, 3) if values else 0.0
+    return summary
@@ -0,0 +1,226 @@
+"""
+Comportamiento del cliente de OpenF1 frente a un upstream degradado
+
+Arranca el servidor simulado (o usa uno externo con --base-url) y ejecuta
+un escenario con la configuración real del cliente: carga de la base de
+conocimiento o una ráfaga de preguntas de ganador sin caché. Informa del
+tiempo total, las peticiones por estado que vio el servidor y los
+reintentos, respuestas stale y fallos que vio el cliente.
+
+Con --capture el tráfico se graba en un log y con --replay el escenario se
+repite desde un log grabado (de este script o de producción, con
+OPENF1_CAPTURE_PATH), sin servidor ni red. --profile guarda un perfil
+cProfile del escenario.
+
+Uso (desde backend/):
+    python -m benchmarks.upstream --scenario load --latency-ms 120 --error-rate 0.1
+    python -m benchmarks.upstream --scenario winners --burst-every 5 --burst-duration 1
+    python -m benchmarks.upstream --scenario winners --capture /tmp/openf1.jsonl.gz
+    python -m benchmarks.upstream --scenario winners --replay /tmp/openf1.jsonl.gz --speed 0 --profile /tmp/w.prof
+"""
+import argparse
+import asyncio
+import json
+import logging
+import socket
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .corpus import CIRCUITS
+from .fixtures import FixtureUpstream
+from .mock_openf1 import MockConfig, create_app
+from .stats import summarize
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def start_mock(config: MockConfig, payload_scale: int = 1, seed: int = 0):
+    """
+    Arranca el servidor simulado en este proceso
+
+    Args:
+        config: Parámetros del servidor
+        payload_scale: Multiplicador del volumen de position
+        seed: Semilla de la latencia y los errores
+
+    Returns:
+        Tupla (servidor uvicorn, tarea, URL base)
+    """
+    import uvicorn
+
+    port = _free_port()
+    app = create_app(config, FixtureUpstream(payload_scale=payload_scale), seed=seed)
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    return server, task, f"http://127.0.0.1:{port}"
+
+
+def build_client(base_url: str, transport: Optional[httpx.AsyncBaseTransport] = None):
+    """Cliente de OpenF1 con la configuración de la aplicación"""
+    from src.core.config import get_settings
+    from src.services.openf1_client import OpenF1Client
+
+    return OpenF1Client.from_settings(get_settings(), base_url=f"{base_url}/v1", transport=transport)
+
+
+async def scenario_load(client, year: int) -> Dict[str, Any]:
+    """Carga completa de la base de conocimiento"""
+    from src.services.knowledge_base import KnowledgeBase
+
+    knowledge_base = KnowledgeBase(client)
+    start = time.perf_counter()
+    await knowledge_base.load_data(year=year)
+    return {
+        'elapsed_s': round(time.perf_counter() - start, 3),
+        'network': knowledge_base.get_semantic_network().get_stats(),
+    }
+
+
+async def scenario_winners(client, year: int, questions: int, concurrency: int) -> Dict[str, Any]:
+    """Ráfaga de preguntas de ganador (cada una llama a OpenF1)"""
+    from src.services.knowledge_base import KnowledgeBase
+    from src.services.nlp_processor import NLPProcessor
+    from src.services.query_service import QueryService
+
+    knowledge_base = KnowledgeBase(client)
+    await knowledge_base.load_data(year=year)
+    query_service = QueryService(knowledge_base, NLPProcessor(knowledge_base.get_semantic_network()))
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    outcomes: Dict[str, int] = {}
+
+    async def ask(index: int) -> None:
+        circuit = CIRCUITS[index % len(CIRCUITS)]
+        # Sufijo para que ninguna pregunta salga de la caché de respuestas
+        question = f"¿Quién ganó el GP de {circuit}? ({index})"
+        async with semaphore:
+            start = time.perf_counter()
+            response = await query_service.process_question(question)
+            latencies.append(time.perf_counter() - start)
+        metadata = response.metadata or {}
+        if metadata.get('upstream_error') or response.confidence == 0.0:
+            outcome = 'failed'
+        elif metadata.get('stale_data'):
+            outcome = 'stale'
+        else:
+            outcome = 'ok'
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(ask(i) for i in range(questions)))
+    elapsed = time.perf_counter() - start
+    return {
+        'elapsed_s': round(elapsed, 3),
+        'questions_per_s': round(questions / elapsed, 1) if elapsed else 0.0,
+        'latency': summarize(latencies, (50, 95, 99)),
+        'outcomes': outcomes,
+    }
+
+
+def client_counters() -> Dict[str, Dict[str, float]]:
+    """Intentos por endpoint y estado registrados por el cliente"""
+    from src.core.metrics import OPENF1_REQUESTS_TOTAL
+
+    counters: Dict[str, Dict[str, float]] = {}
+    for line in OPENF1_REQUESTS_TOTAL.samples():
+        labels, value = line.rsplit(' ', 1)
+        endpoint = labels.split('endpoint="', 1)[1].split('"', 1)[0]
+        status = labels.split('status="', 1)[1].split('"', 1)[0]
+        counters.setdefault(endpoint, {})[status] = float(value)
+    return counters
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Ejecuta el escenario elegido"""
+    from src.services.openf1_capture import CaptureTransport, ReplayTransport
+
+    config = MockConfig(**{name: getattr(args, name) for name in MockConfig.model_fields})
+    server = task = None
+    base_url: Optional[str] = args.base_url
+    transport: Optional[httpx.AsyncBaseTransport] = None
+
+    if args.replay:
+        base_url = "http://openf1.replay"
+        transport = ReplayTransport(args.replay, args.speed)
+    elif base_url is None:
+        server, task, base_url = await start_mock(config, args.payload_scale, args.seed)
+    if args.capture:
+        transport = CaptureTransport(args.capture, inner=transport)
+
+    client = build_client(base_url, transport)
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        if args.scenario == 'load':
+            result = await scenario_load(client, args.year)
+        else:
+            result = await scenario_winners(client, args.year, args.questions, args.concurrency)
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+
+        mock_stats: Dict[str, Any] = {}
+        if not args.replay:
+            async with httpx.AsyncClient(base_url=base_url) as http:
+                mock_stats = (await http.get('/_mock/stats')).json()
+    finally:
+        await client.close()
+        if server is not None:
+            server.should_exit = True
+            await task
+
+    result.update({
+        'scenario': args.scenario,
+        'mock_config': config.model_dump() if server is not None else None,
+        'server_requests': mock_stats.get('requests'),
+        'replay_misses': transport.misses if isinstance(transport, ReplayTransport) else None,
+        'client_attempts': client_counters(),
+        'circuit_state': client.circuit_breaker.state,
+        'stale_cache_entries': len(client.stale_cache),
+    })
+    return result
+
+
+def main() -> int:
+    """Punto de entrada"""
+    parser = argparse.ArgumentParser(description="Cliente de OpenF1 frente al servidor simulado")
+    parser.add_argument('--scenario', choices=('load', 'winners'), default='load')
+    parser.add_argument('--base-url', help="Servidor simulado externo (por defecto se arranca uno)")
+    parser.add_argument('--year', type=int, default=2024)
+    parser.add_argument('--questions', type=int, default=50, help="Preguntas del escenario winners")
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--payload-scale', type=int, default=1)
+    parser.add_argument('--capture', metavar='LOG', help="Graba el tráfico con OpenF1 en este log")
+    parser.add_argument('--replay', metavar='LOG', help="Reproduce el escenario desde un log grabado")
+    parser.add_argument('--speed', type=float, default=1.0, help="Velocidad de reproducción (0 = sin esperas)")
+    parser.add_argument('--profile', metavar='PROF', help="Guarda un perfil cProfile del escenario")
+    for name, field in MockConfig.model_fields.items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=type(field.default), default=field.default,
+            help=field.description
+        )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    print(json.dumps(asyncio.run(run(args)), indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+Caché de respuestas de /ask en el borde HTTP
+
+Guarda los bytes finales de las respuestas cacheables de /api/v1/ask
+(y, si se activa, su versión gzip) indexados por la pregunta normalizada y
+la versión de la base de conocimiento. Un middleware ASGI los sirve antes
+del enrutado, la inyección de dependencias y la validación de pydantic: un
+acierto solo lee el cuerpo, busca la clave y envía los bytes.
+"""
+import gzip
+import logging
+import unicodedata
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from ..core import metrics
+from .responses import JSON_MEDIA_TYPE, loads
+
+logger = logging.getLogger(__name__)
+
+ASK_PATH = "/api/v1/ask"
+MAX_QUESTION_LENGTH = 500  # Igual que QuestionRequest.question
+MAX_BODY_BYTES = 16384  # Cuerpos mayores se pasan a la ruta sin leerlos aquí
+GZIP_MIN_BYTES = 256  # Por debajo de este tamaño gzip no compensa
+
+
+def normalize_question(question: str) -> str:
+    """
+    Forma canónica de una pregunta (clave de caché y entrada del pipeline)
+
+    Compone los caracteres Unicode (NFC) y colapsa los espacios. No cambia
+    mayúsculas ni puntuación porque la extracción de entidades las usa.
+
+    Args:
+        question: Pregunta tal como llega en la petición
+
+    Returns:
+        Pregunta normalizada (vacía si solo tenía espacios)
+    """
+    return ' '.join(unicodedata.normalize('NFC', question).split())
+
+
+class CachedAnswer(NamedTuple):
+    """Bytes de una respuesta cacheada"""
+    body: bytes
+    gzipped: Optional[bytes]
+
+
+class AnswerBytesCache:
+    """LRU de respuestas de /ask serializadas, por pregunta y versión de la base"""
+
+    def __init__(self, max_entries: int = 512, gzip_enabled: bool = False):
+        """
+        Inicializa la caché
+
+        Args:
+            max_entries: Respuestas máximas (0 = desactivada)
+            gzip_enabled: Guardar también el cuerpo comprimido con gzip
+        """
+        self.max_entries = max_entries
+        self.gzip_enabled = gzip_enabled
+        self._entries: "OrderedDict[Tuple[str, str], CachedAnswer]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, question: str, version: str) -> Optional[CachedAnswer]:
+        """
+        Busca una respuesta
+
+        Args:
+            question: Pregunta normalizada
+            version: Versión de la base de conocimiento
+
+        Returns:
+            CachedAnswer o None si no está
+        """
+        key = (question, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, question: str, version: str, body: bytes) -> None:
+        """
+        Guarda una respuesta
+
+        Args:
+            question: Pregunta normalizada
+            version: Versión de la base de conocimiento con la que se respondió
+            body: Bytes JSON de la respuesta
+        """
+        if self.max_entries <= 0:
+            return
+        gzipped = None
+        if self.gzip_enabled and len(body) >= GZIP_MIN_BYTES:
+            gzipped = gzip.compress(body, compresslevel=6, mtime=0)
+        with self._lock:
+            self._entries[(question, version)] = CachedAnswer(body, gzipped)
+            self._entries.move_to_end((question, version))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Vacía la caché"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _accepts_gzip(value: bytes) -> bool:
+    """Interpreta Accept-Encoding (gzip aceptado salvo q=0)"""
+    for coding in value.decode('latin-1').lower().split(','):
+        name, _, params = coding.partition(';')
+        if name.strip() in ('gzip', '*'):
+            quality = params.strip()
+            return not (quality.startswith('q=') and quality[2:].strip() in ('0', '0.0', '0.00', '0.000'))
+    return False
+
+
+class AnswerCacheMiddleware:
+    """
+    Middleware ASGI que sirve desde AnswerBytesCache los aciertos de POST /ask
+
+    Solo atiende peticiones sin query string ni cabecera X-Profile y con
+    cuerpo JSON válido para QuestionRequest; el resto (y los fallos de
+    caché) siguen a la aplicación con el cuerpo ya leído.
+    """
+
+    def __init__(self, app: Callable, cache: AnswerBytesCache, path: str = ASK_PATH):
+        self.app = app
+        self.cache = cache
+        self.path = path
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if (
+            scope['type'] != 'http'
+            or scope['method'] != 'POST'
+            or scope['path'] != self.path
+            or scope['query_string']
+            or self.cache.max_entries <= 0
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        accept_gzip = False
+        json_body = False
+        for name, value in scope['headers']:
+            if name == b'x-profile':
+                await self.app(scope, receive, send)
+                return
+            if name == b'content-type':
+                json_body = value.split(b';', 1)[0].strip().lower() == JSON_MEDIA_TYPE.encode()
+            elif name == b'content-length' and (not value.isdigit() or int(value) > MAX_BODY_BYTES):
+                await self.app(scope, receive, send)
+                return
+            elif name == b'accept-encoding':
+                accept_gzip = _accepts_gzip(value)
+
+        body, messages = await self._read_body(receive)
+        entry = self._lookup(scope, body) if json_body and body is not None else None
+        if entry is None:
+            await self.app(scope, self._replay(messages, receive), send)
+            return
+
+        metrics.ANSWER_EDGE_CACHE_TOTAL.inc(result='hit')
+        headers: List[Tuple[bytes, bytes]] = [(b'content-type', JSON_MEDIA_TYPE.encode())]
+        payload = entry.body
+        if accept_gzip and entry.gzipped is not None:
+            payload = entry.gzipped
+            headers.append((b'content-encoding', b'gzip'))
+            headers.append((b'vary', b'Accept-Encoding'))
+        headers.append((b'content-length', str(len(payload)).encode()))
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': payload})
+
+    async def _read_body(self, receive: Callable) -> Tuple[Optional[bytes], List[Dict[str, Any]]]:
+        """
+        Lee el cuerpo de la petición conservando los mensajes para reenviarlos
+
+        Deja de leer en cuanto el cuerpo supera MAX_BODY_BYTES (p. ej. un
+        cuerpo chunked sin Content-Length): el resto lo lee la ruta.
+
+        Returns:
+            Cuerpo completo (None si la conexión se cerró antes o es demasiado
+            grande) y mensajes recibidos
+        """
+        messages = []
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message['type'] != 'http.request':
+                return None, messages
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                return None, messages
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                return b''.join(chunks), messages
+
+    def _lookup(self, scope: Dict[str, Any], body: bytes) -> Optional[CachedAnswer]:
+        """Respuesta cacheada para el cuerpo de la petición (None si no hay o no aplica)"""
+        state = scope['app'].state if 'app' in scope else None
+        knowledge_base = getattr(state, 'knowledge_base', None)
+        if knowledge_base is None:
+            return None
+        try:
+            payload = loads(body)
+        except ValueError:
+            return None
+        if not isinstance(payload, dict):
+            return None
+        question = payload.get('question')
+        context = payload.get('context')
+        if not isinstance(question, str) or not 0 < len(question) <= MAX_QUESTION_LENGTH:
+            return None
+        if context is not None and not isinstance(context, dict):
+            return None
+        question = normalize_question(question)
+        entry = self.cache.get(question, knowledge_base.version)
+        if entry is None:
+            metrics.ANSWER_EDGE_CACHE_TOTAL.inc(result='miss')
+            return None
+        # Los aciertos de aquí no llegan a QueryService: se cuentan en su
+        # sketch de intenciones para que las preguntas más servidas sigan
+        # en su nivel caliente
+        query_service = getattr(state, 'query_service', None)
+        if query_service is not None:
+            query_service.response_cache.get(question)
+        return entry
+
+    @staticmethod
+    def _replay(messages: List[Dict[str, Any]], receive: Callable) -> Callable[[], Awaitable[Dict[str, Any]]]:
+        """receive que devuelve primero los mensajes ya leídos"""
+        pending = list(messages)
+
+        async def replay() -> Dict[str, Any]:
+            if pending:
+                return pending.pop(0)
+            return await receive()
+
+        return replay
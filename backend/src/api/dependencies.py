@@ -1,11 +1,35 @@
 """
 Dependency Injection para FastAPI
 """
-from fastapi import Request
+from functools import lru_cache
+
+from fastapi import HTTPException, Request, status
 from ..core.config import Settings, get_settings
 from ..services.knowledge_base import KnowledgeBase
 from ..services.nlp_processor import NLPProcessor
 from ..services.query_service import QueryService
+from .answer_cache import AnswerBytesCache
+
+
+def _app_service(request: Request, name: str):
+    """
+    Servicio del estado de la aplicación; 503 si el arranque aún no lo ha creado
+    
+    Args:
+        request: Request de FastAPI
+        name: Atributo de app.state
+        
+    Returns:
+        El servicio
+    """
+    service = getattr(request.app.state, name, None)
+    if service is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="El servicio se está iniciando",
+            headers={'Retry-After': '5'}
+        )
+    return service
 
 
 def get_knowledge_base(request: Request) -> KnowledgeBase:
@@ -18,7 +42,7 @@ def get_knowledge_base(request: Request) -> KnowledgeBase:
     Returns:
         Instancia de KnowledgeBase
     """
-    return request.app.state.knowledge_base
+    return _app_service(request, 'knowledge_base')
 
 
 def get_nlp_processor(request: Request) -> NLPProcessor:
@@ -31,7 +55,7 @@ def get_nlp_processor(request: Request) -> NLPProcessor:
     Returns:
         Instancia de NLPProcessor
     """
-    return request.app.state.nlp_processor
+    return _app_service(request, 'nlp_processor')
 
 
 def get_query_service(request: Request) -> QueryService:
@@ -44,13 +68,30 @@ def get_query_service(request: Request) -> QueryService:
     Returns:
         Instancia de QueryService
     """
-    return request.app.state.query_service
+    return _app_service(request, 'query_service')
 
 
+def get_answer_cache(request: Request) -> AnswerBytesCache:
+    """
+    Obtiene la caché de bytes de /ask del estado de la aplicación
+    
+    Args:
+        request: Request de FastAPI
+        
+    Returns:
+        Instancia de AnswerBytesCache
+    """
+    return request.app.state.answer_cache
+
+
+@lru_cache(maxsize=1)
 def get_settings_dependency() -> Settings:
     """
     Obtiene la configuración de la aplicación
     
+    Se lee una vez por proceso: construir Settings relee el entorno y el
+    .env, demasiado caro para hacerlo en cada petición.
+    
     Returns:
         Instancia de Settings
     """
@@ -3,16 +3,34 @@ Aplicación Principal FastAPI - F1 Q&A System
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
+import asyncio
 import logging
+import os
 import sys
+from typing import Optional
 
+from ..core import metrics
 from ..core.config import get_settings
 from ..services.openf1_client import OpenF1Client
 from ..services.knowledge_base import KnowledgeBase
 from ..services.nlp_processor import NLPProcessor
 from ..services.query_service import QueryService
-from .routes import router
+from ..services.executor import StageExecutor
+from ..services.hot_answers import HotAnswerCache
+from ..services.startup import (
+    PHASE_INDEXES,
+    PHASE_KNOWLEDGE_BASE,
+    PHASE_NLP,
+    PHASE_WARMUP,
+    StartupState,
+    load_warmup_corpus,
+    run_warmup,
+)
+from .answer_cache import AnswerBytesCache, AnswerCacheMiddleware, normalize_question
+from .responses import FastJSONResponse, model_json
+from .routes import router, warm_entity_indexes
 
 # Configurar logging
 logging.basicConfig(
@@ -28,59 +46,161 @@ logger = logging.getLogger(__name__)
 # Obtener configuración
 settings = get_settings()
 
+# Base de conocimiento cargada por el proceso padre antes de crear los workers
+# con fork (src.api.serve): los workers la usan en lugar de cargar la suya
+_preloaded_knowledge_base: Optional[KnowledgeBase] = None
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+
+def use_preloaded_knowledge_base(knowledge_base: KnowledgeBase) -> None:
     """
-    Gestiona el ciclo de vida de la aplicación (startup y shutdown)
+    Registra la base de conocimiento que usarán los workers creados con fork
+    
+    Args:
+        knowledge_base: Base de conocimiento ya cargada (en solo lectura)
     """
-    # Startup
-    logger.info("Iniciando F1 Q&A System...")
+    global _preloaded_knowledge_base
+    _preloaded_knowledge_base = knowledge_base
+
+
+async def start_services(app: FastAPI) -> None:
+    """
+    Arranque en segundo plano: carga, índices, NLP y calentamiento
+    
+    Cada servicio se publica en ``app.state`` cuando está listo (hasta
+    entonces las rutas que lo usan responden 503) y el estado de arranque
+    solo pasa a ``ready`` al terminar todas las fases.
     
+    Args:
+        app: Aplicación FastAPI
+    """
+    startup: StartupState = app.state.startup
     try:
-        # Inicializar cliente OpenF1
-        logger.info("Inicializando OpenF1Client...")
-        openf1_client = OpenF1Client(
-            base_url=settings.openf1_base_url,
-            api_key=settings.openf1_api_key if settings.openf1_api_key else None
-        )
-        app.state.openf1_client = openf1_client
-        
-        # Inicializar base de conocimiento
-        logger.info("Inicializando KnowledgeBase...")
-        knowledge_base = KnowledgeBase(openf1_client)
-        app.state.knowledge_base = knowledge_base
+        with startup.run_phase(PHASE_KNOWLEDGE_BASE):
+            # Inicializar cliente OpenF1
+            logger.info("Inicializando OpenF1Client...")
+            openf1_client = OpenF1Client.from_settings(settings)
+            app.state.openf1_client = openf1_client
+            
+            if _preloaded_knowledge_base is not None:
+                # Worker creado con fork: la red ya está en memoria (compartida
+                # con el padre y los demás workers hasta que se escribe)
+                knowledge_base = _preloaded_knowledge_base
+                knowledge_base.client = openf1_client
+                logger.info("Usando la base de conocimiento cargada por el proceso padre")
+            else:
+                # Inicializar base de conocimiento. Crear la red importa networkx:
+                # en un hilo, para que uvicorn abra el puerto mientras tanto
+                logger.info("Inicializando KnowledgeBase...")
+                knowledge_base = await asyncio.to_thread(
+                    KnowledgeBase,
+                    openf1_client,
+                    telemetry_archive_dir=settings.telemetry_archive_dir or None
+                )
+                
+                # Cargar datos: desde el snapshot si existe, si no desde OpenF1
+                if settings.kb_snapshot_path and os.path.exists(settings.kb_snapshot_path):
+                    await asyncio.to_thread(knowledge_base.load_snapshot, settings.kb_snapshot_path)
+                else:
+                    logger.info("Cargando datos desde OpenF1 API...")
+                    await knowledge_base.load_data(year=settings.kb_year)
+            app.state.knowledge_base = knowledge_base
+            logger.info("Datos cargados exitosamente")
         
-        # Cargar datos (puede tardar un poco)
-        logger.info("Cargando datos desde OpenF1 API...")
-        await knowledge_base.load_data(year=2024)
-        logger.info("Datos cargados exitosamente")
+        with startup.run_phase(PHASE_INDEXES):
+            network = knowledge_base.get_semantic_network()
+            indexes = await asyncio.to_thread(warm_entity_indexes, network)
+            logger.info(f"{indexes} índices de la red construidos")
         
-        # Inicializar procesador NLP
-        logger.info("Inicializando NLPProcessor...")
-        nlp_processor = NLPProcessor()
-        app.state.nlp_processor = nlp_processor
+        with startup.run_phase(PHASE_NLP):
+            # Inicializar procesador NLP (compila sus patrones y construye el
+            # índice de entidades desde la red)
+            logger.info("Inicializando NLPProcessor...")
+            nlp_processor = await asyncio.to_thread(NLPProcessor, network)
+            app.state.nlp_processor = nlp_processor
+            
+            # Inicializar servicio de consultas
+            logger.info("Inicializando QueryService...")
+            executor = StageExecutor(
+                strategy=settings.query_execution_strategy,
+                max_workers=settings.query_executor_workers
+            )
+            app.state.executor = executor
+            await executor.warm_up(nlp_processor)
+            response_cache = HotAnswerCache(
+                max_entries=settings.answer_cache_size,
+                hot_entries=settings.answer_hot_tier_size,
+                min_hits=settings.answer_hot_min_hits
+            )
+            query_service = QueryService(knowledge_base, nlp_processor, executor, response_cache)
+            app.state.query_service = query_service
         
-        # Inicializar servicio de consultas
-        logger.info("Inicializando QueryService...")
-        query_service = QueryService(knowledge_base, nlp_processor)
-        app.state.query_service = query_service
+        if settings.warmup_enabled:
+            with startup.run_phase(PHASE_WARMUP):
+                # El almacén de telemetría (y NumPy) se crea aquí y no en la
+                # primera pregunta de telemetría
+                await asyncio.to_thread(lambda: knowledge_base.telemetry)
+                await warm_up_answers(app, query_service, knowledge_base)
         
         # Obtener estadísticas
-        network = knowledge_base.get_semantic_network()
         stats = network.get_stats()
         logger.info(f"Sistema iniciado correctamente. Estadísticas: {stats}")
+        startup.mark_ready()
         
-        yield
-        
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
         logger.error(f"Error durante el inicio: {e}", exc_info=True)
-        raise
+        startup.mark_failed(str(e))
+
+
+async def warm_up_answers(app: FastAPI, query_service: QueryService, knowledge_base: KnowledgeBase) -> None:
+    """
+    Responde el corpus de calentamiento y guarda las respuestas en la caché de /ask
+    
+    Args:
+        app: Aplicación FastAPI
+        query_service: Servicio de consultas
+        knowledge_base: Base de conocimiento cargada
+    """
+    questions = [normalize_question(q) for q in load_warmup_corpus(settings.warmup_corpus_path)]
+    questions = [q for q in questions if q]
+    version = knowledge_base.version
+    app.state.startup.warmup = await run_warmup(query_service, questions, timeout=settings.warmup_timeout)
+    
+    # Las respuestas cacheadas también se sirven desde la caché de bytes
+    for question in questions:
+        response = query_service.cached_answer(question)
+        if response is not None:
+            app.state.answer_cache.put(question, version, model_json(response))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Gestiona el ciclo de vida de la aplicación (startup y shutdown)
+    
+    El arranque corre en segundo plano: el servidor acepta conexiones
+    desde el principio (liveness) y /api/v1/ready indica cuándo está listo.
+    """
+    # Startup
+    logger.info("Iniciando F1 Q&A System...")
+    app.state.startup = StartupState()
+    startup_task = asyncio.create_task(start_services(app))
+    
+    yield
     
     # Shutdown
     logger.info("Cerrando F1 Q&A System...")
     
     try:
+        if not startup_task.done():
+            startup_task.cancel()
+            await asyncio.gather(startup_task, return_exceptions=True)
+        
+        # Detener pools de ejecución
+        if hasattr(app.state, 'executor'):
+            app.state.executor.shutdown()
+        
         # Cerrar cliente OpenF1
         if hasattr(app.state, 'openf1_client'):
             await app.state.openf1_client.close()
@@ -110,14 +230,24 @@ app = FastAPI(
     
     * `/api/v1/ask` - Hacer preguntas sobre F1
     * `/api/v1/health` - Verificar estado del sistema
+    * `/api/v1/live` y `/api/v1/ready` - Liveness y readiness
     * `/api/v1/entities/{type}` - Listar entidades
     * `/api/v1/network/explore/{node_id}` - Explorar red semántica
     """,
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc"
 )
 
+# Respuestas de /ask ya serializadas, servidas antes del enrutado. Se añade
+# antes que CORS para que CORS la envuelva y sus cabeceras lleguen a los aciertos
+app.state.answer_cache = AnswerBytesCache(
+    max_entries=settings.answer_edge_cache_size,
+    gzip_enabled=settings.answer_edge_cache_gzip
+)
+app.add_middleware(AnswerCacheMiddleware, cache=app.state.answer_cache)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -148,15 +278,33 @@ async def root():
         "docs": "/docs",
         "redoc": "/redoc",
         "health": "/api/v1/health",
+        "live": "/api/v1/live",
+        "ready": "/api/v1/ready",
         "endpoints": {
             "ask": "/api/v1/ask",
             "entities": "/api/v1/entities/{type}",
             "explore": "/api/v1/network/explore/{node_id}",
-            "stats": "/api/v1/stats"
+            "stats": "/api/v1/stats",
+            "metrics": "/metrics"
         }
     }
 
 
+@app.get(
+    "/metrics",
+    tags=["Root"],
+    summary="Métricas",
+    description="Métricas de la aplicación en formato de exposición de Prometheus",
+    response_class=PlainTextResponse
+)
+async def metrics_endpoint() -> PlainTextResponse:
+    """
+    Expone latencias por etapa, caché de respuestas, llamadas a OpenF1 y
+    duración de la carga de la base de conocimiento
+    """
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
 # Manejador de errores global (opcional)
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -0,0 +1,140 @@
+"""
+Serialización rápida de las respuestas de la API
+
+Los endpoints que construyen su propio payload (dicts que ya cumplen el
+esquema) lo devuelven como bytes JSON ya serializados, sin pasar por la
+validación del response_model ni por jsonable_encoder. Se usa orjson si
+está instalado y json de la biblioteca estándar si no.
+"""
+import json
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Optional
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def _default(value: Any) -> Any:
+    """Tipos que el codificador JSON no conoce (numpy, conjuntos, modelos)"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode='json')
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if hasattr(value, 'tolist'):
+        # Escalares y arrays de numpy
+        return value.tolist()
+    return str(value)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(content: Any) -> bytes:
+        """Serializa a JSON (UTF-8, sin espacios)"""
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+    loads = orjson.loads
+else:
+    def dumps(content: Any) -> bytes:
+        """Serializa a JSON (UTF-8, sin espacios)"""
+        return json.dumps(
+            content, ensure_ascii=False, separators=(',', ':'), default=_default
+        ).encode('utf-8')
+
+    loads = json.loads
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse que serializa con orjson (clase de respuesta por defecto)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_bytes_response(body: bytes, status_code: int = 200, headers: Optional[dict] = None) -> Response:
+    """Respuesta con un cuerpo JSON ya serializado"""
+    return Response(content=body, status_code=status_code, headers=headers, media_type=JSON_MEDIA_TYPE)
+
+
+def model_json(model: BaseModel) -> bytes:
+    """
+    JSON de un modelo, memorizado en el propio objeto
+
+    Las respuestas cacheadas (el mismo objeto servido muchas veces) solo se
+    serializan la primera vez. El modelo debe declarar el atributo privado
+    ``_json`` y no modificarse después de servirse.
+
+    Args:
+        model: Modelo de respuesta
+
+    Returns:
+        Bytes JSON del modelo
+    """
+    cached = getattr(model, '_json', None)
+    if cached is not None:
+        return cached
+    body = dumps(model.model_dump())
+    try:
+        model._json = body
+    except (AttributeError, ValueError):
+        pass
+    return body
+
+
+class SerializedCache:
+    """LRU de respuestas ya serializadas, indexado por ETag"""
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Inicializa la caché
+
+        Args:
+            max_entries: Entradas máximas (0 = desactivada)
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = Lock()
+
+    def get_or_build(self, key: str, build: Callable[[], Any]) -> bytes:
+        """
+        Bytes JSON de una respuesta, construyéndola solo si no está en caché
+
+        Args:
+            key: Clave de la respuesta (su ETag)
+            build: Función que construye el payload (dict serializable)
+
+        Returns:
+            Bytes JSON
+        """
+        if self.max_entries <= 0:
+            return dumps(build())
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                return body
+        body = dumps(build())
+        with self._lock:
+            self._entries[key] = body
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body
+
+    def clear(self) -> None:
+        """Vacía la caché"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,26 +1,38 @@
 """
 Rutas de la API - Endpoints de FastAPI
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from typing import Any, Dict, Optional
+import asyncio
+import base64
+import binascii
+import hashlib
 import logging
 
+from ..core.config import Settings
 from ..models.schemas import (
     QuestionRequest,
     AnswerResponse,
     HealthResponse,
+    ReadinessResponse,
     EntityListResponse,
     NetworkExploreResponse,
     ErrorResponse
 )
 from ..services.knowledge_base import KnowledgeBase
 from ..services.query_service import QueryService
-from .dependencies import get_knowledge_base, get_query_service
+from ..services.startup import StartupState
+from .answer_cache import AnswerBytesCache, normalize_question
+from .dependencies import get_answer_cache, get_knowledge_base, get_query_service, get_settings_dependency
+from .responses import FastJSONResponse, SerializedCache, json_bytes_response, model_json
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["F1 Q&A"])
 
+# Respuestas serializadas de /entities, /network/explore y /stats por ETag
+serialized_responses = SerializedCache(max_entries=256)
+
 
 @router.post(
     "/ask",
@@ -30,34 +42,77 @@ router = APIRouter(prefix="/api/v1", tags=["F1 Q&A"])
     responses={
         200: {"description": "Respuesta exitosa"},
         400: {"description": "Pregunta inválida", "model": ErrorResponse},
+        403: {"description": "Profiling desactivado", "model": ErrorResponse},
         500: {"description": "Error del servidor", "model": ErrorResponse}
     }
 )
 async def ask_question(
     request: QuestionRequest,
-    query_service: QueryService = Depends(get_query_service)
-) -> AnswerResponse:
+    profile: bool = Query(False, description="Perfilar la petición (requiere PROFILING_ENABLED)"),
+    x_profile: Optional[str] = Header(None, description="Alternativa a ?profile=true"),
+    query_service: QueryService = Depends(get_query_service),
+    knowledge_base: KnowledgeBase = Depends(get_knowledge_base),
+    answer_cache: AnswerBytesCache = Depends(get_answer_cache),
+    settings: Settings = Depends(get_settings_dependency)
+) -> Response:
     """
     Endpoint principal para hacer preguntas sobre F1
     
+    Con ``?profile=true`` o la cabecera ``X-Profile: 1`` la pregunta se
+    ejecuta bajo cProfile, sin caché, y el desglose de tiempos se devuelve
+    en ``metadata['profile']``.
+    
+    La pregunta se normaliza (ver normalize_question) antes de responderla y
+    las respuestas cacheables se guardan en AnswerBytesCache, desde donde
+    AnswerCacheMiddleware las sirve sin llegar a esta ruta.
+    
     Args:
         request: Pregunta del usuario y contexto opcional
+        profile: Activa el profiling de esta petición
+        x_profile: Cabecera X-Profile (equivalente a profile)
         query_service: Servicio de consultas (inyectado)
+        knowledge_base: Base de conocimiento (inyectada)
+        answer_cache: Caché de bytes de /ask (inyectada)
+        settings: Configuración (inyectada)
         
     Returns:
-        AnswerResponse con la respuesta generada
+        AnswerResponse serializada
     """
     try:
         logger.info(f"Recibida pregunta: {request.question}")
         
-        if not request.question or len(request.question.strip()) == 0:
+        question = normalize_question(request.question)
+        if not question:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="La pregunta no puede estar vacía"
             )
         
-        response = await query_service.process_question(request.question)
-        return response
+        if profile or _header_flag(x_profile):
+            if not settings.profiling_enabled:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="El profiling está desactivado (PROFILING_ENABLED=false)"
+                )
+            # Import diferido: cProfile solo se carga si se usa
+            from ..services.profiling import profile_question
+            response = await profile_question(
+                query_service,
+                question,
+                top=settings.profiling_top_functions,
+                output_dir=settings.profiling_output_dir or None
+            )
+            return json_bytes_response(model_json(response))
+        
+        # Versión leída antes de responder: una recarga a mitad de la pregunta
+        # deja la respuesta bajo la versión anterior, que ya no se consulta
+        version = knowledge_base.version
+        response = await query_service.process_question(question)
+        # Las respuestas cacheadas se sirven con el JSON memorizado
+        body = model_json(response)
+        if query_service.cached_answer(question) is response:
+            answer_cache.put(question, version, body)
+        return json_bytes_response(body)
         
     except HTTPException:
         raise
@@ -69,39 +124,212 @@ async def ask_question(
         )
 
 
+def _header_flag(value: Optional[str]) -> bool:
+    """Interpreta una cabecera booleana (1, true, yes, on)"""
+    return value is not None and value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
 @router.get(
     "/health",
     response_model=HealthResponse,
     summary="Health Check",
     description="Verifica el estado del sistema y la base de conocimiento"
 )
-async def health_check(
-    knowledge_base: KnowledgeBase = Depends(get_knowledge_base)
-) -> HealthResponse:
+async def health_check(request: Request) -> HealthResponse:
     """
     Endpoint de health check
     
+    El estado es ``healthy`` solo cuando el arranque ha terminado;
+    mientras tanto es ``starting`` (``unhealthy`` si el arranque falló).
+    
     Args:
-        knowledge_base: Base de conocimiento (inyectada)
+        request: Request de FastAPI
         
     Returns:
         HealthResponse con el estado del sistema
     """
+    startup: StartupState = request.app.state.startup
+    knowledge_base = getattr(request.app.state, 'knowledge_base', None)
+    if startup.ready:
+        health_status = "healthy"
+    elif startup.failed:
+        health_status = "unhealthy"
+    else:
+        health_status = "starting"
     return HealthResponse(
-        status="healthy",
+        status=health_status,
         version="1.0.0",
-        knowledge_base_loaded=knowledge_base.loaded
+        knowledge_base_loaded=knowledge_base is not None and knowledge_base.loaded
     )
 
 
+@router.get(
+    "/live",
+    response_model=ReadinessResponse,
+    summary="Liveness",
+    description="200 mientras el proceso funciona, incluso durante el arranque; 503 si el arranque falló",
+    responses={503: {"description": "El arranque falló", "model": ReadinessResponse}}
+)
+async def liveness(request: Request) -> FastJSONResponse:
+    """
+    Liveness: el proceso responde y el arranque no ha fallado
+    
+    Args:
+        request: Request de FastAPI
+        
+    Returns:
+        Estado del arranque (503 si falló: el proceso debe reiniciarse)
+    """
+    startup: StartupState = request.app.state.startup
+    code = status.HTTP_503_SERVICE_UNAVAILABLE if startup.failed else status.HTTP_200_OK
+    return FastJSONResponse(startup.as_dict(), status_code=code)
+
+
+@router.get(
+    "/ready",
+    response_model=ReadinessResponse,
+    summary="Readiness",
+    description="200 cuando la base de conocimiento, los índices, el NLP y el calentamiento están listos; 503 mientras tanto",
+    responses={503: {"description": "Arranque en curso o fallido", "model": ReadinessResponse}}
+)
+async def readiness(request: Request) -> FastJSONResponse:
+    """
+    Readiness: el servicio ha completado el arranque y acepta tráfico
+    
+    Args:
+        request: Request de FastAPI
+        
+    Returns:
+        Estado del arranque (503 hasta que termine)
+    """
+    startup: StartupState = request.app.state.startup
+    if startup.ready:
+        return FastJSONResponse(startup.as_dict())
+    return FastJSONResponse(
+        startup.as_dict(),
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': '5'}
+    )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Comparación débil de If-None-Match (nginx marca como W/ los ETag que comprime)"""
+    if if_none_match.strip() == '*':
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return any(tag.removeprefix('W/') == etag for tag in candidates)
+
+
+def conditional_get(
+    request: Request,
+    knowledge_base: KnowledgeBase = Depends(get_knowledge_base),
+    settings: Settings = Depends(get_settings_dependency)
+) -> Dict[str, str]:
+    """
+    ETag de una respuesta derivada solo de la base de conocimiento
+    
+    El ETag combina la versión de la base de conocimiento con la ruta y los
+    parámetros, así que se calcula sin tocar el grafo. Si coincide con
+    If-None-Match se responde 304 antes de ejecutar el endpoint.
+    
+    Args:
+        request: Request de FastAPI
+        knowledge_base: Base de conocimiento (inyectada)
+        settings: Configuración (inyectada)
+        
+    Returns:
+        Cabeceras ETag y Cache-Control para la respuesta
+    """
+    params = '&'.join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    digest = hashlib.blake2b(
+        f"{request.url.path}?{params}".encode('utf-8'), digest_size=8
+    ).hexdigest()
+    etag = f'"{knowledge_base.version}.{digest}"'
+    headers = {
+        'ETag': etag,
+        'Cache-Control': f"public, max-age={settings.http_cache_max_age}, must-revalidate"
+    }
+    
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match and _etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return headers
+
+
+# Tipo de entidad de la API -> tipo de nodo en la red
+ENTITY_TYPES = {
+    'drivers': 'piloto',
+    'teams': 'equipo',
+    'circuits': 'circuito',
+    'sessions': 'sesion',
+    'motors': 'motor',
+    'countries': 'pais'
+}
+
+# Filtro de la API -> atributo indexado por tipo de nodo
+ENTITY_FILTERS = {
+    'name': {
+        'piloto': 'nombre', 'equipo': 'nombre_equipo', 'circuito': 'circuit_short_name',
+        'sesion': 'session_name', 'motor': 'fabricante', 'pais': 'nombre'
+    },
+    'year': {'sesion': 'year'},
+    'country': {'circuito': 'pais', 'sesion': 'pais', 'piloto': 'nacionalidad', 'pais': 'nombre'},
+    'team': {'piloto': 'team_name', 'equipo': 'team_name'},
+    'session_type': {'sesion': 'session_type'},
+}
+
+
+def warm_entity_indexes(network) -> int:
+    """
+    Construye los índices que usan /entities (orden por id y atributos filtrables)
+
+    Args:
+        network: Red semántica
+
+    Returns:
+        Número de índices construidos
+    """
+    count = 0
+    for node_type in ENTITY_TYPES.values():
+        network.sorted_node_ids(node_type)
+        count += 1
+    for attributes in ENTITY_FILTERS.values():
+        for node_type, attribute in attributes.items():
+            network.attribute_index(node_type, attribute)
+            count += 1
+    return count
+
+
+def _encode_cursor(node_id: str) -> str:
+    """Cursor opaco a partir del último ID de una página"""
+    return base64.urlsafe_b64encode(node_id.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor: str) -> str:
+    """ID codificado en un cursor (ValueError si no es válido)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        node_id = base64.b64decode(padded, altchars=b'-_', validate=True).decode('utf-8')
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
+    if not node_id:
+        raise ValueError(f"Cursor inválido: {cursor}")
+    return node_id
+
+
 @router.get(
     "/entities/{entity_type}",
     response_model=EntityListResponse,
     summary="Listar entidades",
-    description="Obtiene una lista de entidades de un tipo específico (drivers, teams, circuits, sessions)",
+    description=(
+        "Obtiene una página de entidades de un tipo (drivers, teams, circuits, sessions, motors, countries) "
+        "en orden estable. Para la página siguiente se pasa next_cursor como cursor."
+    ),
     responses={
         200: {"description": "Lista de entidades"},
-        400: {"description": "Tipo de entidad inválido", "model": ErrorResponse},
+        400: {"description": "Tipo de entidad, filtro o cursor inválido", "model": ErrorResponse},
+        304: {"description": "Sin cambios desde el ETag indicado en If-None-Match"},
         404: {"description": "No se encontraron entidades", "model": ErrorResponse}
     }
 )
@@ -109,78 +337,93 @@ async def get_entities(
     entity_type: str,
     year: Optional[int] = None,
     name: Optional[str] = None,
-    limit: int = 50,
-    knowledge_base: KnowledgeBase = Depends(get_knowledge_base)
-) -> EntityListResponse:
+    country: Optional[str] = None,
+    team: Optional[str] = None,
+    session_type: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Atributos a devolver, separados por comas"),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    limit: int = Query(50, ge=1, le=1000),
+    knowledge_base: KnowledgeBase = Depends(get_knowledge_base),
+    cache_headers: Dict[str, str] = Depends(conditional_get)
+) -> Response:
     """
     Obtiene entidades de un tipo específico
     
     Args:
-        entity_type: Tipo de entidad (drivers, teams, circuits, sessions)
-        year: Año para filtrar (opcional)
-        name: Nombre para filtrar (opcional)
-        limit: Límite de resultados
+        entity_type: Tipo de entidad (drivers, teams, circuits, sessions, motors, countries)
+        year: Año para filtrar (sesiones)
+        name: Nombre para filtrar (contiene, sin distinguir mayúsculas)
+        country: País para filtrar (circuitos, sesiones, pilotos, países)
+        team: Equipo para filtrar (pilotos, equipos)
+        session_type: Tipo de sesión para filtrar (Race, Qualifying, Practice)
+        fields: Atributos a devolver (por defecto, todos)
+        cursor: Cursor de la página anterior
+        limit: Tamaño de la página
         knowledge_base: Base de conocimiento (inyectada)
+        cache_headers: ETag y Cache-Control (inyectados)
         
     Returns:
-        EntityListResponse con la lista de entidades
+        EntityListResponse serializada
     """
     try:
-        # Mapear tipo de entidad de plural a singular
-        type_map = {
-            'drivers': 'piloto',
-            'teams': 'equipo',
-            'circuits': 'circuito',
-            'sessions': 'sesion',
-            'motors': 'motor',
-            'countries': 'pais'
-        }
-        
-        node_type = type_map.get(entity_type.lower())
+        node_type = ENTITY_TYPES.get(entity_type.lower())
         
         if not node_type:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Tipo de entidad inválido: {entity_type}. Tipos válidos: {', '.join(type_map.keys())}"
+                detail=f"Tipo de entidad inválido: {entity_type}. Tipos válidos: {', '.join(ENTITY_TYPES.keys())}"
             )
         
-        # Construir filtros
+        # Construir filtros sobre los atributos indexados
+        requested = {
+            'name': name, 'year': year, 'country': country,
+            'team': team, 'session_type': session_type
+        }
         filters = {}
-        if year:
-            filters['year'] = year
-        if name:
-            filters['nombre'] = name
-        
-        # Obtener entidades
-        network = knowledge_base.get_semantic_network()
-        entities = network.find_nodes_by_type(node_type, filters if filters else None)
-        
-        # Limitar resultados
-        entities = entities[:limit]
-        
-        if not entities:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"No se encontraron entidades de tipo {entity_type}"
-            )
-        
-        # Formatear entidades
-        formatted_entities = [
-            {
-                'id': entity['id'],
-                'type': entity['type'],
-                'attributes': entity['attributes']
+        for filter_name, value in requested.items():
+            if value is None:
+                continue
+            attribute = ENTITY_FILTERS[filter_name].get(node_type)
+            if attribute is None:
+                supported = [f for f, types in ENTITY_FILTERS.items() if node_type in types]
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Filtro '{filter_name}' no disponible para {entity_type}. Filtros válidos: {', '.join(supported)}"
+                )
+            filters[attribute] = value
+        
+        try:
+            after = _decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        
+        field_list = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+        
+        def build() -> Dict[str, Any]:
+            # Página en orden estable sin construir las relaciones de cada nodo
+            network = knowledge_base.get_semantic_network()
+            page = network.list_nodes(node_type, filters or None, after=after, limit=limit, fields=field_list)
+            entities = page['nodes']
+            
+            if not entities and after is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"No se encontraron entidades de tipo {entity_type}"
+                )
+            
+            logger.info(f"Retornadas {len(entities)} entidades de tipo {entity_type}")
+            
+            # Mismo contenido que EntityListResponse, sin validarlo de nuevo
+            return {
+                'entity_type': entity_type,
+                'count': len(entities),
+                'total': page['total'],
+                'entities': entities,
+                'next_cursor': _encode_cursor(page['next_after']) if page['next_after'] else None
             }
-            for entity in entities
-        ]
         
-        logger.info(f"Retornadas {len(formatted_entities)} entidades de tipo {entity_type}")
-        
-        return EntityListResponse(
-            entity_type=entity_type,
-            count=len(formatted_entities),
-            entities=formatted_entities
-        )
+        body = serialized_responses.get_or_build(cache_headers['ETag'], build)
+        return json_bytes_response(body, headers=cache_headers)
         
     except HTTPException:
         raise
@@ -199,14 +442,16 @@ async def get_entities(
     description="Explora el vecindario de un nodo en la red semántica",
     responses={
         200: {"description": "Vecindario del nodo"},
+        304: {"description": "Sin cambios desde el ETag indicado en If-None-Match"},
         404: {"description": "Nodo no encontrado", "model": ErrorResponse}
     }
 )
 async def explore_network(
     node_id: str,
     depth: int = 2,
-    knowledge_base: KnowledgeBase = Depends(get_knowledge_base)
-) -> NetworkExploreResponse:
+    knowledge_base: KnowledgeBase = Depends(get_knowledge_base),
+    cache_headers: Dict[str, str] = Depends(conditional_get)
+) -> Response:
     """
     Explora el vecindario de un nodo en la red semántica
     
@@ -214,33 +459,39 @@ async def explore_network(
         node_id: ID del nodo a explorar
         depth: Profundidad de exploración (default: 2)
         knowledge_base: Base de conocimiento (inyectada)
+        cache_headers: ETag y Cache-Control (inyectados)
         
     Returns:
-        NetworkExploreResponse con el nodo y sus nodos relacionados
+        NetworkExploreResponse serializada
     """
     try:
-        network = knowledge_base.get_semantic_network()
-        
-        # Obtener detalles del nodo
-        node_details = network.get_node_details(node_id)
-        
-        if not node_details:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Nodo '{node_id}' no encontrado"
-            )
-        
-        # Explorar vecindario
-        related_entities = network.get_related_entities(node_id, max_depth=min(depth, 3))
-        
-        logger.info(f"Explorado nodo {node_id} con profundidad {depth}")
+        def build() -> Dict[str, Any]:
+            network = knowledge_base.get_semantic_network()
+            
+            # Obtener detalles del nodo
+            node_details = network.get_node_details(node_id)
+            
+            if not node_details:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Nodo '{node_id}' no encontrado"
+                )
+            
+            # Explorar vecindario
+            related_entities = network.get_related_entities(node_id, max_depth=min(depth, 3))
+            
+            logger.info(f"Explorado nodo {node_id} con profundidad {depth}")
+            
+            # Mismo contenido que NetworkExploreResponse, sin validarlo de nuevo
+            return {
+                'node_id': node_id,
+                'node_type': node_details['type'],
+                'attributes': node_details['attributes'],
+                'related_nodes': related_entities
+            }
         
-        return NetworkExploreResponse(
-            node_id=node_id,
-            node_type=node_details['type'],
-            attributes=node_details['attributes'],
-            related_nodes=related_entities
-        )
+        body = serialized_responses.get_or_build(cache_headers['ETag'], build)
+        return json_bytes_response(body, headers=cache_headers)
         
     except HTTPException:
         raise
@@ -259,6 +510,7 @@ async def explore_network(
     description="Recarga la base de conocimiento con datos del año especificado",
     responses={
         200: {"description": "Base de conocimiento recargada"},
+        409: {"description": "Base de conocimiento de solo lectura", "model": ErrorResponse},
         500: {"description": "Error al recargar", "model": ErrorResponse}
     }
 )
@@ -276,6 +528,13 @@ async def reload_knowledge_base(
     Returns:
         Diccionario con el estado de la recarga
     """
+    if knowledge_base.read_only:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="La base de conocimiento es de solo lectura (compartida entre workers "
+                   "o cargada desde un snapshot). Reinicia el servidor para recargarla."
+        )
+    
     try:
         logger.info(f"Recargando base de conocimiento para el año {year}")
         
@@ -289,7 +548,7 @@ async def reload_knowledge_base(
         await knowledge_base.load_data(year=year)
         
         network = knowledge_base.get_semantic_network()
-        stats = network.get_stats()
+        stats = await asyncio.to_thread(network.get_stats)
         
         return {
             "status": "success",
@@ -316,26 +575,32 @@ async def reload_knowledge_base(
     description="Obtiene estadísticas de la red semántica"
 )
 async def get_stats(
-    knowledge_base: KnowledgeBase = Depends(get_knowledge_base)
-) -> dict:
+    knowledge_base: KnowledgeBase = Depends(get_knowledge_base),
+    cache_headers: Dict[str, str] = Depends(conditional_get)
+) -> Response:
     """
     Obtiene estadísticas de la red semántica
     
     Args:
         knowledge_base: Base de conocimiento (inyectada)
+        cache_headers: ETag y Cache-Control (inyectados)
         
     Returns:
-        Diccionario con estadísticas
+        Diccionario con estadísticas, serializado
     """
     try:
-        network = knowledge_base.get_semantic_network()
-        stats = network.get_stats()
+        def build() -> Dict[str, Any]:
+            network = knowledge_base.get_semantic_network()
+            stats = network.get_stats()
+            
+            return {
+                "status": "success",
+                "stats": stats,
+                "knowledge_base_loaded": knowledge_base.loaded
+            }
         
-        return {
-            "status": "success",
-            "stats": stats,
-            "knowledge_base_loaded": knowledge_base.loaded
-        }
+        body = serialized_responses.get_or_build(cache_headers['ETag'], build)
+        return json_bytes_response(body, headers=cache_headers)
         
     except Exception as e:
         logger.error(f"Error obteniendo estadísticas: {e}", exc_info=True)
@@ -344,3 +609,31 @@ async def get_stats(
             detail=f"Error al obtener estadísticas: {str(e)}"
         )
 
+
+
+@router.get(
+    "/cache/hot",
+    response_model=dict,
+    summary="Preguntas más frecuentes",
+    description="Intenciones más frecuentes según el sketch de QueryService y respuestas fijadas en su nivel caliente"
+)
+async def get_hot_answers(
+    limit: int = Query(20, ge=1, le=100, description="Intenciones y preguntas listadas"),
+    query_service: QueryService = Depends(get_query_service)
+) -> dict:
+    """
+    Estado de la caché de respuestas de QueryService para operadores
+    
+    Sin ETag: cambia con cada pregunta.
+    
+    Args:
+        limit: Número máximo de intenciones y preguntas calientes listadas
+        query_service: Servicio de consultas (inyectado)
+        
+    Returns:
+        Diccionario con tamaños de los niveles, promociones e intenciones más frecuentes
+    """
+    return {
+        "status": "success",
+        "cache": query_service.response_cache.stats(limit)
+    }
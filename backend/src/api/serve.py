@@ -0,0 +1,218 @@
+"""
+Arranque del servidor con uno o varios workers
+
+Con BACKEND_WORKERS > 1 este proceso carga la base de conocimiento una sola
+vez, abre el socket y crea N workers de uvicorn con fork. Los workers
+heredan la red ya construida: sus páginas se comparten copy-on-write y solo
+se copian las que un worker modifica. Antes del fork, gc.freeze() saca esos
+objetos de las generaciones del recolector, que de otro modo escribiría en
+sus cabeceras (y copiaría las páginas) en cada recolección de los workers.
+
+La base de conocimiento queda en solo lectura: /reload responde 409 y la
+telemetría no se enlaza con la red (cada worker acabaría con una red
+distinta y perdería las páginas compartidas). Para recargar hay que
+reiniciar el servidor.
+
+Si OpenF1 falla o no devuelve datos, se usa el snapshot de KB_SNAPSHOT_PATH
+(que se reescribe en cada carga correcta) y, si no hay ninguno, el servidor
+no arranca.
+
+Uso:
+    python -m src.api.serve
+"""
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Set
+
+import uvicorn
+
+from ..core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+RESTART_DELAY = 1.0  # Segundos antes de sustituir un worker que ha terminado
+
+
+async def preload_knowledge_base(settings: Settings):
+    """
+    Carga la base de conocimiento en el proceso padre
+
+    Args:
+        settings: Configuración
+
+    Returns:
+        KnowledgeBase en solo lectura, o None si no se pudo cargar ni hay snapshot
+    """
+    from ..services.knowledge_base import KnowledgeBase
+    from ..services.openf1_client import OpenF1Client
+    from ..services.snapshot import check_network
+
+    archive_dir = settings.telemetry_archive_dir or None
+    snapshot_path = settings.kb_snapshot_path
+    client = OpenF1Client.from_settings(settings)
+    try:
+        knowledge_base = KnowledgeBase(client, telemetry_archive_dir=archive_dir)
+        try:
+            await knowledge_base.load_data(year=settings.kb_year)
+            stats = check_network(knowledge_base.get_semantic_network())
+        except Exception as e:
+            if not snapshot_path or not os.path.exists(snapshot_path):
+                logger.error(f"No se pudo cargar la base de conocimiento: {e}")
+                return None
+            logger.warning(f"No se pudo cargar desde OpenF1 ({e}), se usa el snapshot {snapshot_path}")
+            knowledge_base = KnowledgeBase(client, telemetry_archive_dir=archive_dir)
+            knowledge_base.load_snapshot(snapshot_path)
+        else:
+            logger.info(f"Base de conocimiento cargada: {stats}")
+            if snapshot_path:
+                try:
+                    knowledge_base.save_snapshot(snapshot_path)
+                except OSError as e:
+                    logger.warning(f"No se pudo guardar el snapshot en {snapshot_path}: {e}")
+        knowledge_base.read_only = True
+        return knowledge_base
+    finally:
+        await client.close()
+
+
+def _spawn_worker(config: uvicorn.Config, sock: socket.socket) -> int:
+    """
+    Crea un worker con fork
+
+    Args:
+        config: Configuración de uvicorn (con la aplicación ya importada)
+        sock: Socket ya abierto por el proceso padre
+
+    Returns:
+        PID del worker (en el proceso padre)
+    """
+    pid = os.fork()
+    if pid:
+        return pid
+
+    code = 0
+    try:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        uvicorn.Server(config).run(sockets=[sock])
+    except BaseException:
+        logger.exception("El worker terminó con un error")
+        code = 1
+    finally:
+        os._exit(code)
+
+
+def supervise(config: uvicorn.Config, sock: socket.socket, workers: int) -> int:
+    """
+    Mantiene N workers: sustituye los que terminan y los detiene con SIGTERM/SIGINT
+
+    Args:
+        config: Configuración de uvicorn
+        sock: Socket compartido
+        workers: Número de workers
+
+    Returns:
+        Código de salida
+    """
+    children: Set[int] = set()
+    stopping = False
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        children.add(_spawn_worker(config, sock))
+    logger.info(f"{workers} workers arrancados: {sorted(children)}")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            logger.warning(f"El worker {pid} terminó (estado {status}), arrancando otro")
+            time.sleep(RESTART_DELAY)
+            if not stopping:
+                children.add(_spawn_worker(config, sock))
+    sock.close()
+    return 0
+
+
+def serve_preforked(settings: Settings, workers: int) -> int:
+    """
+    Carga la base de conocimiento, congela el heap y crea los workers
+
+    Args:
+        settings: Configuración
+        workers: Número de workers
+
+    Returns:
+        Código de salida
+    """
+    knowledge_base = asyncio.run(preload_knowledge_base(settings))
+    if knowledge_base is None:
+        return 1
+
+    from . import main as app_module
+    from .routes import warm_entity_indexes
+
+    # Los índices de /entities también se construyen una vez y se comparten
+    warm_entity_indexes(knowledge_base.get_semantic_network())
+    app_module.use_preloaded_knowledge_base(knowledge_base)
+
+    config = uvicorn.Config(
+        app_module.app,
+        host=settings.backend_host,
+        port=settings.backend_port,
+        log_level=settings.log_level.lower()
+    )
+    sock = config.bind_socket()
+
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Heap congelado ({gc.get_freeze_count()} objetos), creando {workers} workers")
+    return supervise(config, sock, workers)
+
+
+def main() -> int:
+    """Punto de entrada del servidor"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+
+    settings = get_settings()
+    workers = max(1, settings.backend_workers)
+
+    if workers > 1:
+        logger.info(f"Modo multi-worker: {workers} workers creados con fork")
+        return serve_preforked(settings, workers)
+
+    uvicorn.run(
+        "src.api.main:app",
+        host=settings.backend_host,
+        port=settings.backend_port,
+        log_level=settings.log_level.lower()
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,10 +12,54 @@ class Settings(BaseSettings):
     # API OpenF1
     openf1_base_url: str = "https://api.openf1.org/v1"
     openf1_api_key: str = ""  # API key para OpenF1 (opcional, requerido durante sesiones en vivo)
+    openf1_rate_limit: float = 3.0  # Peticiones por segundo hacia OpenF1 (0 = sin límite)
+    openf1_rate_burst: int = 3  # Ráfaga máxima de peticiones
+    openf1_max_retries: int = 3  # Reintentos ante 429, 5xx o errores de conexión
+    openf1_backoff_base: float = 0.5  # Espera base del backoff exponencial (segundos)
+    openf1_backoff_max: float = 8.0  # Espera máxima entre reintentos (segundos)
+    openf1_circuit_threshold: int = 5  # Fallos consecutivos que abren el circuit breaker
+    openf1_circuit_reset: float = 30.0  # Segundos con el circuito abierto antes de reintentar
+    openf1_capture_path: str = ""  # Graba cada intercambio con OpenF1 en este log JSONL (.gz para comprimir)
+    openf1_replay_path: str = ""  # Responde desde un log grabado en lugar de llamar a OpenF1
+    openf1_replay_speed: float = 1.0  # Velocidad de reproducción (1 = tiempos originales, 0 = sin esperas)
+    
+    # Telemetría
+    telemetry_archive_dir: str = ""  # Directorio del archivo mmap de telemetría (vacío = solo memoria)
+    
+    # Base de conocimiento
+    kb_year: int = 2024  # Temporada que se carga al arrancar
+    kb_snapshot_path: str = ""  # Fichero de snapshot: respaldo si OpenF1 falla al arrancar
+    
+    # Ejecución del pipeline de preguntas
+    query_execution_strategy: str = "thread"  # inline | thread | process
+    query_executor_workers: int = 4  # Tamaño del pool de hilos/procesos
+    
+    # Profiling bajo demanda (cabecera X-Profile o ?profile=true en /ask)
+    profiling_enabled: bool = False  # Desactivado por defecto: expone detalles internos
+    profiling_output_dir: str = ""  # Si se indica, se guarda un .prof por petición perfilada
+    profiling_top_functions: int = 15  # Funciones listadas en metadata['profile']
+    
+    # Caché HTTP de /entities, /network/explore y /stats (ETag por versión de la base de conocimiento)
+    http_cache_max_age: int = 0  # Segundos que navegadores y proxies pueden servir sin revalidar
+    
+    # Caché de bytes de /ask antes del enrutado (pregunta normalizada + versión de la base)
+    answer_edge_cache_size: int = 512  # Respuestas guardadas (0 = desactivada)
+    answer_edge_cache_gzip: bool = False  # Guarda también el cuerpo en gzip para clientes que lo acepten
+    
+    # Caché de respuestas de QueryService: nivel caliente (por frecuencia de la intención) delante de un LRU
+    answer_cache_size: int = 4096  # Respuestas del LRU (0 = sin límite)
+    answer_hot_tier_size: int = 64  # Respuestas fijas de las intenciones más frecuentes (0 = sin nivel caliente)
+    answer_hot_min_hits: int = 3  # Frecuencia estimada mínima de una intención para fijar sus respuestas
+    
+    # Arranque: el servicio solo está listo (/api/v1/ready) tras calentar cachés
+    warmup_enabled: bool = True  # Responde el corpus de calentamiento antes de marcarse como listo
+    warmup_corpus_path: str = ""  # Preguntas frecuentes, una por línea (vacío = corpus por defecto)
+    warmup_timeout: float = 60.0  # Segundos máximos de calentamiento (0 = sin límite)
     
     # Server
     backend_host: str = "0.0.0.0"
     backend_port: int = 8000
+    backend_workers: int = 1  # Procesos de uvicorn (>1: workers con fork que comparten la red)
     
     # CORS
     cors_origins: str = "http://localhost:3000,http://localhost:8080,http://localhost"
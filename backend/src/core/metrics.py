@@ -0,0 +1,295 @@
+"""
+Métricas de la aplicación en formato de exposición de Prometheus
+
+Registro mínimo (contadores, gauges e histogramas con etiquetas) sin
+dependencias externas. Cada proceso tiene su propio registro: con varios
+workers cada uno expone sus métricas y Prometheus debe raspar cada worker
+o agregarlas.
+"""
+import math
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Starlette añade "; charset=utf-8" a los tipos text/*
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Buckets (segundos) pensados para etapas de milisegundos y llamadas de red
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Tiempos por etapa de la pregunta en curso; el cliente de OpenF1 suma aquí
+# la duración de sus llamadas para separarla de la etapa de consulta
+stage_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+
+def add_stage_time(stage: str, seconds: float) -> None:
+    """
+    Acumula tiempo en una etapa de la pregunta en curso (si la hay)
+
+    Args:
+        stage: Nombre de la etapa
+        seconds: Duración a sumar
+    """
+    timings = stage_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{_escape(extra[1])}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base de las métricas con etiquetas"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Etiquetas inválidas para {self.name}: {sorted(labels)} (esperadas {self.labelnames})")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Bloque de texto de la métrica (HELP, TYPE y muestras)"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Contador monótono"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Incrementa el contador para una combinación de etiquetas"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Valor actual para una combinación de etiquetas"""
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """Valor que puede subir y bajar"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        """Fija el valor para una combinación de etiquetas"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def value(self, **labels: str) -> float:
+        """Valor actual para una combinación de etiquetas"""
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Histograma acumulativo con buckets fijos"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # clave -> [conteos por bucket..., suma, total]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Registra una observación"""
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [0.0] * (len(self.buckets) + 2)
+                self._values[key] = state
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, **labels: str) -> int:
+        """Número de observaciones para una combinación de etiquetas"""
+        state = self._values.get(self._key(labels))
+        return int(state[-1]) if state else 0
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        for key, state in items:
+            cumulative = 0.0
+            for index, bound in enumerate(self.buckets):
+                cumulative += state[index]
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {_format_value(cumulative)}"
+            labels = _format_labels(self.labelnames, key, ("le", "+Inf"))
+            yield f"{self.name}_bucket{labels} {_format_value(state[-1])}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state[-2])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {_format_value(state[-1])}"
+
+
+class MetricsRegistry:
+    """Conjunto de métricas expuestas en /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """
+        Registra una métrica
+
+        Args:
+            metric: Métrica a registrar
+
+        Returns:
+            La propia métrica
+
+        Raises:
+            ValueError: Si ya existe una métrica con el mismo nombre
+        """
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrica duplicada: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Exposición en formato de texto de Prometheus"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+QUESTION_STAGE_SECONDS = REGISTRY.register(Histogram(
+    "f1qa_question_stage_seconds",
+    "Duración de cada etapa de process_question (intent, entities, query, openf1, format)",
+    ("stage", "query_type")
+))
+
+QUESTION_SECONDS = REGISTRY.register(Histogram(
+    "f1qa_question_seconds",
+    "Duración total de las preguntas no cacheadas",
+    ("query_type",)
+))
+
+ANSWER_CACHE_TOTAL = REGISTRY.register(Counter(
+    "f1qa_answer_cache_total",
+    "Consultas a la caché de respuestas",
+    ("result",)
+))
+
+ANSWER_EDGE_CACHE_TOTAL = REGISTRY.register(Counter(
+    "f1qa_answer_edge_cache_total",
+    "Consultas a la caché de bytes de /ask antes del enrutado",
+    ("result",)
+))
+
+OPENF1_REQUESTS_TOTAL = REGISTRY.register(Counter(
+    "f1qa_openf1_requests_total",
+    "Peticiones HTTP a OpenF1 (cada intento) por endpoint y estado",
+    ("endpoint", "status")
+))
+
+OPENF1_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "f1qa_openf1_request_seconds",
+    "Duración de cada intento de petición a OpenF1 hasta recibir las cabeceras o el cuerpo",
+    ("endpoint",)
+))
+
+KB_LOAD_DURATION_SECONDS = REGISTRY.register(Gauge(
+    "f1qa_kb_load_duration_seconds",
+    "Duración de la última carga de la base de conocimiento",
+    ("source",)
+))
+
+KB_LOADED_TIMESTAMP_SECONDS = REGISTRY.register(Gauge(
+    "f1qa_kb_loaded_timestamp_seconds",
+    "Momento (epoch) de la última carga de la base de conocimiento",
+    ("source",)
+))
+
+STARTUP_PHASE_SECONDS = REGISTRY.register(Gauge(
+    "f1qa_startup_phase_seconds",
+    "Duración de cada fase del arranque (knowledge_base, indexes, nlp, warmup)",
+    ("phase",)
+))
+
+READY = REGISTRY.register(Gauge(
+    "f1qa_ready",
+    "1 si el servicio ha completado el arranque y acepta tráfico"
+))
+
+
+def record_kb_load(source: str, seconds: float) -> None:
+    """
+    Registra una carga de la base de conocimiento
+
+    Args:
+        source: Origen de los datos (openf1 o snapshot)
+        seconds: Duración de la carga
+    """
+    KB_LOAD_DURATION_SECONDS.set(seconds, source=source)
+    KB_LOADED_TIMESTAMP_SECONDS.set(time.time(), source=source)
@@ -1,23 +1,182 @@
 """
 Red Semántica usando NetworkX
+
+networkx se importa al crear la primera red y no al importar el módulo: así
+el proceso de la API arranca (y responde a /live) antes de pagar su coste.
 """
-import networkx as nx
+import gc
 import logging
-from typing import Dict, List, Optional, Any
+import bisect
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from types import ModuleType
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Any, Set, Tuple
 from collections import defaultdict
 
+if TYPE_CHECKING:
+    import networkx
+
 logger = logging.getLogger(__name__)
 
 
+@contextmanager
+def _gc_paused():
+    """
+    Pausa el recolector cíclico mientras dura una inserción en lote
+
+    Cada nodo y arista del grafo son diccionarios nuevos: en un lote de
+    decenas de miles el recolector se dispara una y otra vez para recorrer
+    objetos que no forman ciclos que liberar.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class ReadWriteLock:
+    """
+    Lock de lectores/escritor entre hilos
+
+    Varias lecturas a la vez o una sola escritura. Las consultas pueden
+    recorrer la red en los hilos del StageExecutor: un escritor espera a que
+    terminen las lecturas en curso y las nuevas esperan a que termine la
+    escritura. El hilo que escribe puede volver a adquirir el lock (para
+    escribir o leer).
+
+    Las escrituras no se hacen desde el event loop (KnowledgeBase y
+    TelemetryStore las mandan a un hilo con asyncio.to_thread): esperar a
+    las lecturas de los hilos bloquearía el loop. Una lectura desde el loop
+    solo espera mientras una escritura está en curso.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer: Optional[int] = None
+        self._depth = 0
+
+    @contextmanager
+    def read(self):
+        """Sección de lectura"""
+        me = threading.get_ident()
+        with self._condition:
+            counted = self._writer != me
+            if counted:
+                while self._writer is not None:
+                    self._condition.wait()
+                self._readers += 1
+        try:
+            yield
+        finally:
+            if counted:
+                with self._condition:
+                    self._readers -= 1
+                    if not self._readers:
+                        self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        """Sección de escritura"""
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer != me:
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+                self._writer = me
+            self._depth += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._depth -= 1
+                if not self._depth:
+                    self._writer = None
+                    self._condition.notify_all()
+
+
+def _writes(method):
+    """Ejecuta un método que modifica la red con el lock de escritura"""
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock.write():
+            return method(self, *args, **kwargs)
+    return locked
+
+
+def _reads(method):
+    """Ejecuta un método que recorre la red con el lock de lectura"""
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock.read():
+            return method(self, *args, **kwargs)
+    return locked
+
+
+def _nx() -> ModuleType:
+    """Módulo networkx, importado en la primera llamada"""
+    import networkx
+    return networkx
+
+
+def _index_key(value: Any) -> Any:
+    """Clave normalizada de un valor en los índices de atributos"""
+    return value.lower() if isinstance(value, str) else value
+
+
 class SemanticNetwork:
     """Red semántica para almacenar y consultar conocimiento sobre F1"""
     
     def __init__(self):
         """Inicializa la red semántica con un grafo dirigido múltiple"""
-        self.graph = nx.MultiDiGraph()
+        self.graph: "networkx.MultiDiGraph" = _nx().MultiDiGraph()
         self.nodes_by_type: Dict[str, List[str]] = defaultdict(list)
+        # Mismos IDs que nodes_by_type en conjuntos: comprobar si un nodo ya
+        # está indexado no recorre la lista
+        self._type_members: Dict[str, Set[str]] = defaultdict(set)
+        # Contador de modificaciones: invalida los índices derivados
+        self.version = 0
+        self._sorted_ids: Dict[str, Tuple[int, List[str]]] = {}
+        self._attribute_indexes: Dict[Tuple[str, str], Tuple[int, Dict[Any, Set[str]]]] = {}
+        # Las consultas en hilos leen con lock.read(); las modificaciones
+        # toman lock.write()
+        self.lock = ReadWriteLock()
+        # Modificaciones agrupadas con batch(): la versión sube una vez al final
+        self._batch_depth = 0
+        self._batch_changed = False
         logger.info("Red semántica inicializada")
     
+    def _touch(self) -> None:
+        """Registra una modificación (incrementa la versión salvo dentro de batch)"""
+        if self._batch_depth:
+            self._batch_changed = True
+        else:
+            self.version += 1
+    
+    @contextmanager
+    def batch(self):
+        """
+        Agrupa varias modificaciones en un solo cambio de versión
+        
+        Los índices derivados (planes de consulta, índice de entidades) y
+        los ETag se invalidan una vez por lote y no una vez por llamada. El
+        lote completo se hace con el lock de escritura.
+        """
+        with self.lock.write():
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth and self._batch_changed:
+                    self._batch_changed = False
+                    self.version += 1
+    
+    @_writes
     def add_node(
         self, 
         node_id: str, 
@@ -39,11 +198,67 @@ class SemanticNetwork:
         )
         
         # Indexar por tipo para búsquedas rápidas
-        if node_id not in self.nodes_by_type[node_type]:
+        self._index_type(node_id, node_type)
+        self._touch()
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Nodo agregado: {node_id} (tipo: {node_type})")
+    
+    def _index_type(self, node_id: str, node_type: str) -> None:
+        """Añade un nodo al índice por tipo si no estaba"""
+        members = self._type_members[node_type]
+        if node_id not in members:
+            members.add(node_id)
             self.nodes_by_type[node_type].append(node_id)
+    
+    @_writes
+    def add_nodes_bulk(self, nodes: Iterable[Tuple[str, str, Dict[str, Any]]]) -> int:
+        """
+        Agrega varios nodos de una vez
+        
+        Equivale a llamar a add_node con cada uno, pero invalida los índices
+        derivados una sola vez y sin el recolector cíclico activo.
+        
+        Args:
+            nodes: Tuplas (node_id, node_type, attributes)
+            
+        Returns:
+            Número de nodos agregados o actualizados
+        """
+        add_node = self.graph.add_node
+        index_type = self._index_type
+        count = 0
+        with _gc_paused():
+            for node_id, node_type, attributes in nodes:
+                add_node(node_id, node_type=node_type, **attributes)
+                index_type(node_id, node_type)
+                count += 1
+        if count:
+            self._touch()
+            logger.debug(f"Agregados {count} nodos en lote")
+        return count
+    
+    @_writes
+    def update_node(self, node_id: str, attributes: Dict[str, Any]) -> bool:
+        """
+        Actualiza atributos de un nodo existente
+        
+        Args:
+            node_id: ID del nodo
+            attributes: Atributos a agregar o reemplazar
+            
+        Returns:
+            True si el nodo existe y fue actualizado
+        """
+        if node_id not in self.graph:
+            logger.warning(f"Nodo '{node_id}' no existe en el grafo")
+            return False
         
-        logger.debug(f"Nodo agregado: {node_id} (tipo: {node_type})")
+        self.graph.nodes[node_id].update(attributes)
+        self._touch()
+        return True
     
+    @_writes
     def add_edge(
         self, 
         source: str, 
@@ -78,9 +293,52 @@ class SemanticNetwork:
             relation=relation,
             **attributes
         )
+        self._touch()
         
-        logger.debug(f"Arista agregada: {source} --[{relation}]--> {target}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Arista agregada: {source} --[{relation}]--> {target}")
     
+    @_writes
+    def add_edges_bulk(self, edges: Iterable[Tuple[str, str, str, Optional[Dict[str, Any]]]]) -> int:
+        """
+        Agrega varias aristas de una vez
+        
+        Como add_edge, se descartan las aristas cuyos extremos no existen,
+        pero se informa de ellas con un solo aviso para todo el lote.
+        
+        Args:
+            edges: Tuplas (source, target, relation, attributes); attributes
+                puede ser None
+            
+        Returns:
+            Número de aristas agregadas
+        """
+        graph = self.graph
+        add_edge = graph.add_edge
+        count = 0
+        missing: List[str] = []
+        with _gc_paused():
+            for source, target, relation, attributes in edges:
+                if source not in graph or target not in graph:
+                    missing.append(source if source not in graph else target)
+                    continue
+                if attributes:
+                    add_edge(source, target, relation=relation, **attributes)
+                else:
+                    add_edge(source, target, relation=relation)
+                count += 1
+        
+        if missing:
+            logger.warning(
+                f"{len(missing)} aristas descartadas porque un extremo no existe en el grafo "
+                f"(p. ej. '{missing[0]}')"
+            )
+        if count:
+            self._touch()
+            logger.debug(f"Agregadas {count} aristas en lote")
+        return count
+    
+    @_reads
     def query_by_relation(
         self, 
         node_id: str, 
@@ -120,9 +378,11 @@ class SemanticNetwork:
                     if node_data:
                         related_nodes.append(node_data)
         
-        logger.debug(f"Encontrados {len(related_nodes)} nodos con relación '{relation}' ({direction})")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Encontrados {len(related_nodes)} nodos con relación '{relation}' ({direction})")
         return related_nodes
     
+    @_reads
     def find_nodes_by_type(
         self, 
         node_type: str, 
@@ -169,9 +429,140 @@ class SemanticNetwork:
             else:
                 results.append(node_data)
         
-        logger.debug(f"Encontrados {len(results)} nodos de tipo '{node_type}'")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Encontrados {len(results)} nodos de tipo '{node_type}'")
         return results
     
+    @_reads
+    def sorted_node_ids(self, node_type: str) -> List[str]:
+        """
+        IDs de un tipo en orden estable (por ID), cacheados hasta el próximo cambio
+        
+        Args:
+            node_type: Tipo de nodo
+            
+        Returns:
+            Lista ordenada de IDs (no modificar)
+        """
+        cached = self._sorted_ids.get(node_type)
+        if cached is None or cached[0] != self.version:
+            cached = (self.version, sorted(self.nodes_by_type.get(node_type, [])))
+            self._sorted_ids[node_type] = cached
+        return cached[1]
+    
+    @_reads
+    def attribute_index(self, node_type: str, attribute: str) -> Dict[Any, Set[str]]:
+        """
+        Índice valor -> IDs de un atributo de un tipo de nodo
+        
+        Se construye la primera vez que se usa y se reconstruye si la red
+        cambió desde entonces. Los valores de texto se indexan en minúsculas.
+        
+        Args:
+            node_type: Tipo de nodo
+            attribute: Atributo indexado
+            
+        Returns:
+            Diccionario de valor normalizado a conjunto de IDs (no modificar)
+        """
+        key = (node_type, attribute)
+        cached = self._attribute_indexes.get(key)
+        if cached is None or cached[0] != self.version:
+            index: Dict[Any, Set[str]] = defaultdict(set)
+            nodes = self.graph.nodes
+            for node_id in self.nodes_by_type.get(node_type, []):
+                value = nodes[node_id].get(attribute)
+                if value is not None:
+                    index[_index_key(value)].add(node_id)
+            cached = (self.version, dict(index))
+            self._attribute_indexes[key] = cached
+        return cached[1]
+    
+    @_reads
+    def match_node_ids(self, node_type: str, filters: Dict[str, Any]) -> Set[str]:
+        """
+        IDs de un tipo que cumplen todos los filtros, usando los índices
+        
+        Los filtros de texto coinciden si el valor buscado está contenido en
+        el atributo (sin distinguir mayúsculas), igual que find_nodes_by_type;
+        el resto por igualdad.
+        
+        Args:
+            node_type: Tipo de nodo
+            filters: Atributo -> valor buscado
+            
+        Returns:
+            Conjunto de IDs que cumplen los filtros
+        """
+        matched: Optional[Set[str]] = None
+        for attribute, value in filters.items():
+            index = self.attribute_index(node_type, attribute)
+            if isinstance(value, str):
+                needle = value.lower()
+                ids: Set[str] = set()
+                for key, node_ids in index.items():
+                    if isinstance(key, str) and needle in key:
+                        ids |= node_ids
+            else:
+                ids = index.get(value, set())
+            matched = set(ids) if matched is None else matched & ids
+            if not matched:
+                return set()
+        return matched if matched is not None else set(self.nodes_by_type.get(node_type, []))
+    
+    @_reads
+    def list_nodes(
+        self,
+        node_type: str,
+        filters: Optional[Dict[str, Any]] = None,
+        after: Optional[str] = None,
+        limit: int = 50,
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Página de nodos de un tipo en orden estable, sin construir sus relaciones
+        
+        Args:
+            node_type: Tipo de nodo
+            filters: Filtros sobre atributos (ver match_node_ids)
+            after: Último ID de la página anterior (paginación por clave)
+            limit: Tamaño máximo de la página
+            fields: Atributos a incluir (None = todos)
+            
+        Returns:
+            Diccionario con nodes (id, type, attributes), total de nodos que
+            cumplen los filtros y next_after (None si no hay más páginas)
+        """
+        ordered = self.sorted_node_ids(node_type)
+        matched = self.match_node_ids(node_type, filters) if filters else None
+        start = bisect.bisect_right(ordered, after) if after is not None else 0
+        
+        page: List[str] = []
+        has_more = False
+        for node_id in ordered[start:] if matched is None else (
+            n for n in ordered[start:] if n in matched
+        ):
+            if len(page) == limit:
+                has_more = True
+                break
+            page.append(node_id)
+        
+        nodes = []
+        for node_id in page:
+            data = self.graph.nodes[node_id]
+            if fields is None:
+                attributes = {k: v for k, v in data.items() if k != 'node_type'}
+            else:
+                attributes = {k: data[k] for k in fields if k in data and k != 'node_type'}
+            nodes.append({'id': node_id, 'type': node_type, 'attributes': attributes})
+        
+        return {
+            'nodes': nodes,
+            'total': len(ordered) if matched is None else len(matched),
+            'next_after': page[-1] if has_more else None
+        }
+    
+    @_reads
     def get_node_details(self, node_id: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene todos los detalles de un nodo
@@ -214,6 +605,42 @@ class SemanticNetwork:
             'incoming_relations': incoming
         }
     
+    @_reads
+    def get_nodes(
+        self,
+        node_ids: Iterable[str],
+        node_type: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Obtiene varios nodos de una vez, sin construir sus relaciones
+        
+        Args:
+            node_ids: IDs de los nodos (los repetidos se leen una vez)
+            node_type: Si se indica, se omiten los nodos de otro tipo
+        
+        Returns:
+            Diccionario ID -> nodo (id, type, attributes) en el orden de
+            node_ids; los IDs que no existen no aparecen
+        """
+        nodes = self.graph.nodes
+        result: Dict[str, Dict[str, Any]] = {}
+        for node_id in node_ids:
+            if node_id in result:
+                continue
+            data = nodes.get(node_id)
+            if data is None:
+                continue
+            if node_type is not None and data.get('node_type') != node_type:
+                continue
+            attributes = dict(data)
+            result[node_id] = {
+                'id': node_id,
+                'type': attributes.pop('node_type', 'unknown'),
+                'attributes': attributes,
+            }
+        return result
+    
+    @_reads
     def find_path(
         self, 
         source: str, 
@@ -235,6 +662,7 @@ class SemanticNetwork:
             logger.warning(f"Uno o ambos nodos no existen: {source}, {target}")
             return []
         
+        nx = _nx()
         try:
             paths = list(nx.all_simple_paths(
                 self.graph, 
@@ -248,6 +676,7 @@ class SemanticNetwork:
             logger.debug(f"No hay camino entre {source} y {target}")
             return []
     
+    @_reads
     def get_related_entities(
         self, 
         node_id: str, 
@@ -306,6 +735,40 @@ class SemanticNetwork:
         logger.debug(f"Encontradas {len(visited)-1} entidades relacionadas con {node_id}")
         return result
     
+    @_reads
+    def export_data(self) -> Dict[str, Any]:
+        """
+        Exporta nodos y aristas como estructuras simples (serializables)
+        
+        Returns:
+            Diccionario con listas de nodos y aristas
+        """
+        return {
+            'nodes': [(node_id, dict(data)) for node_id, data in self.graph.nodes(data=True)],
+            'edges': [(source, target, dict(data)) for source, target, data in self.graph.edges(data=True)]
+        }
+    
+    @_writes
+    def import_data(self, data: Dict[str, Any]) -> None:
+        """
+        Reemplaza el contenido de la red con datos exportados por export_data
+        
+        Args:
+            data: Diccionario con listas de nodos y aristas
+        """
+        self.graph = _nx().MultiDiGraph()
+        self.nodes_by_type = defaultdict(list)
+        self._type_members = defaultdict(set)
+        
+        for node_id, attributes in data['nodes']:
+            self.graph.add_node(node_id, **attributes)
+            self._index_type(node_id, attributes.get('node_type', 'unknown'))
+        
+        self.graph.add_edges_from(data['edges'])
+        self._touch()
+        logger.info(f"Red semántica importada: {self.graph.number_of_nodes()} nodos, {self.graph.number_of_edges()} aristas")
+    
+    @_reads
     def get_stats(self) -> Dict[str, Any]:
         """
         Obtiene estadísticas de la red semántica
@@ -1,7 +1,7 @@
 """
 Esquemas para request/response de la API
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from typing import Optional, List, Dict, Any
 
 
@@ -33,6 +33,9 @@ class AnswerResponse(BaseModel):
     query_type: str = Field(..., description="Tipo de consulta detectada")
     metadata: Optional[Dict[str, Any]] = Field(default=None, description="Metadatos adicionales")
     
+    # JSON memorizado al servir la respuesta (ver api.responses.model_json)
+    _json: Optional[bytes] = PrivateAttr(default=None)
+    
     model_config = {
         "json_schema_extra": {
             "examples": [
@@ -70,11 +73,24 @@ class HealthResponse(BaseModel):
     }
 
 
+class ReadinessResponse(BaseModel):
+    """Esquema para las respuestas de /live y /ready"""
+    ready: bool = Field(..., description="El arranque ha terminado y el servicio acepta tráfico")
+    phase: str = Field(..., description="Fase del arranque (knowledge_base, indexes, nlp, warmup, ready o failed)")
+    error: Optional[str] = Field(default=None, description="Error si el arranque falló")
+    uptime_s: float = Field(..., description="Segundos desde el inicio del proceso")
+    startup_s: Optional[float] = Field(default=None, description="Duración total del arranque")
+    phases: Dict[str, float] = Field(default_factory=dict, description="Duración de cada fase completada")
+    warmup: Dict[str, Any] = Field(default_factory=dict, description="Resultado del calentamiento")
+
+
 class EntityListResponse(BaseModel):
     """Esquema para respuesta de lista de entidades"""
     entity_type: str = Field(..., description="Tipo de entidad")
-    count: int = Field(..., description="Número de entidades")
+    count: int = Field(..., description="Número de entidades en la página")
+    total: Optional[int] = Field(default=None, description="Entidades que cumplen los filtros")
     entities: List[Dict[str, Any]] = Field(..., description="Lista de entidades")
+    next_cursor: Optional[str] = Field(default=None, description="Cursor de la página siguiente (None si no hay más)")
 
 
 class NetworkExploreResponse(BaseModel):
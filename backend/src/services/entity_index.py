@@ -0,0 +1,550 @@
+"""
+Índice de entidades nombradas construido desde la red semántica
+
+Sustituye a las tablas fijas de pilotos, equipos y circuitos del NLP. Para
+cada nodo de la red genera las formas con las que se le puede nombrar en una
+pregunta y las guarda en tres estructuras:
+
+- mapa exacto: nombres canónicos normalizados (``max verstappen``,
+  ``red bull racing``, ``monza circuit``)
+- mapa de alias: formas derivadas automáticamente (apellidos, nombres de
+  pila, nombres sin patrocinadores, localidades y países de los circuitos,
+  nombres en español de los países); un alias solo resuelve si apunta a un
+  único nodo
+- índice de n-gramas de caracteres de todas esas claves, que acota los
+  candidatos del fuzzy matching
+
+Las siglas de los pilotos (``VER``, ``HAM``) se buscan aparte y solo en
+mayúsculas, para no confundirlas con palabras (``ver``). Cada coincidencia
+resuelve directamente al ID del nodo.
+
+La resolución recorre los tokens de la pregunta probando frases de hasta
+``max_words`` palabras, así que su coste depende de la longitud de la
+pregunta y no del número de entidades. Cuando la red cambia, ``refresh``
+solo reindexa los nodos cuyos atributos de nombre cambiaron.
+"""
+import logging
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+from threading import RLock
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from unidecode import unidecode
+
+logger = logging.getLogger(__name__)
+
+# Tipo de nodo -> categoría de entidades y atributo con el nombre que se devuelve
+ENTITY_TYPES: Dict[str, Tuple[str, str]] = {
+    'piloto': ('drivers', 'nombre'),
+    'equipo': ('teams', 'nombre_equipo'),
+    'circuito': ('circuits', 'circuit_short_name'),
+}
+
+# Atributos de los que se generan las claves de cada tipo (si cambian, se reindexa el nodo)
+NAME_ATTRIBUTES: Dict[str, Tuple[str, ...]] = {
+    'piloto': ('nombre', 'name_acronym'),
+    'equipo': ('nombre_equipo', 'team_name'),
+    'circuito': ('nombre_oficial', 'circuit_short_name', 'location', 'pais'),
+}
+
+# Similitud mínima del fuzzy matching por categoría
+FUZZY_THRESHOLDS = {'drivers': 0.70, 'teams': 0.75, 'circuits': 0.75}
+FUZZY_MIN_LENGTH = 4  # Palabras más cortas no se comparan (falsos positivos)
+FUZZY_CANDIDATES = 5  # Claves que se comparan por palabra (las más parecidas por n-gramas)
+NGRAM_SIZE = 2
+
+# Palabras de las preguntas que se escriben con mayúscula inicial y nunca son
+# entidades: no se comparan de forma aproximada ("Cuándo" ~ "Lando")
+FUZZY_STOPWORDS = frozenset({
+    'quien', 'que', 'cual', 'cuales', 'cuando', 'donde', 'como', 'cuanto', 'cuanta', 'cuantos', 'cuantas',
+    'dime', 'hablame', 'cuentame', 'hola', 'oye', 'una', 'pregunta', 'por', 'favor', 'para', 'datos',
+    'informacion', 'piloto', 'equipo', 'escuderia', 'motor', 'circuito', 'pista', 'gran', 'premio',
+    'carrera', 'ganador', 'resultado', 'fecha', 'mejor', 'vuelta', 'vueltas', 'tiempo', 'ritmo',
+    'ubicacion', 'sesion', 'temporada',
+})
+
+# Palabras de patrocinador o genéricas que se quitan del nombre de un equipo para el alias
+TEAM_GENERIC_WORDS = frozenset({
+    'racing', 'team', 'f1', 'formula', 'one', 'scuderia', 'kick', 'stake', 'visa', 'cash',
+    'app', 'bwt', 'moneygram', 'aramco', 'cognizant', 'petronas', 'amg', 'oracle', 'mastercard',
+})
+
+# Palabras genéricas de los nombres de circuito
+CIRCUIT_GENERIC_WORDS = frozenset({'circuit', 'circuito', 'international', 'street', 'autodrome'})
+
+# Nombres anteriores de los equipos actuales (por alias normalizado)
+TEAM_FORMER_NAMES: Dict[str, Tuple[str, ...]] = {
+    'rb': ('alphatauri', 'alpha tauri', 'toro rosso', 'racing bulls'),
+    'sauber': ('alfa romeo',),
+    'aston martin': ('racing point',),
+}
+
+# Nombres en español de los países de OpenF1 (alias de sus circuitos)
+COUNTRY_NAMES_ES: Dict[str, Tuple[str, ...]] = {
+    'Bahrain': ('Bahréin',),
+    'Saudi Arabia': ('Arabia Saudita', 'Arabia Saudí'),
+    'Japan': ('Japón',),
+    'United States': ('Estados Unidos', 'EEUU'),
+    'Italy': ('Italia',),
+    'Monaco': ('Mónaco', 'Montecarlo'),
+    'Canada': ('Canadá',),
+    'Spain': ('España',),
+    'United Kingdom': ('Gran Bretaña', 'Reino Unido', 'Inglaterra'),
+    'Hungary': ('Hungría',),
+    'Belgium': ('Bélgica',),
+    'Netherlands': ('Países Bajos', 'Holanda'),
+    'Azerbaijan': ('Azerbaiyán',),
+    'Singapore': ('Singapur',),
+    'Mexico': ('México',),
+    'Brazil': ('Brasil',),
+    'United Arab Emirates': ('Abu Dabi', 'Abu Dhabi', 'Emiratos Árabes Unidos'),
+}
+
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+_SPACES_RE = re.compile(r'\s+')
+_WORD_RE = re.compile(r'\w+')
+_ACRONYM_RE = re.compile(r'\b([A-Z]{3})\b')
+_CAPITALIZED_RUN_RE = re.compile(r'\b([A-ZÁ-Ú][a-záéíóúñ]+(?:\s+[A-ZÁ-Ú][a-záéíóúñ]+)*)\b')
+
+EXACT = 'exact'
+ALIAS = 'alias'
+ACRONYM = 'acronym'
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza texto removiendo acentos y convirtiendo a minúsculas
+
+    Args:
+        text: Texto a normalizar
+
+    Returns:
+        Texto normalizado
+    """
+    # Convertir a minúsculas
+    text = text.lower()
+
+    # Remover acentos (pero mantener ñ)
+    text_unaccented = unidecode(text)
+
+    # Restaurar ñ si fue eliminada
+    text_unaccented = text_unaccented.replace('n~', 'ñ')
+
+    # Remover puntuación innecesaria pero mantener espacios
+    text_clean = _PUNCTUATION_RE.sub(' ', text_unaccented)
+
+    # Normalizar espacios múltiples
+    return _SPACES_RE.sub(' ', text_clean).strip()
+
+
+def _tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """
+    Tokens normalizados de un texto con su posición en el original
+
+    Produce los mismos tokens que ``normalize_text(text).split()``.
+
+    Args:
+        text: Texto original
+
+    Returns:
+        Lista de (token, inicio, fin) con text[inicio:fin] la palabra original
+    """
+    tokens = []
+    for match in _WORD_RE.finditer(text):
+        word = match.group()
+        if word.isascii():
+            # Sin acentos ni puntuación: normalizar es pasar a minúsculas
+            tokens.append((word.lower(), match.start(), match.end()))
+            continue
+        for token in normalize_text(word).split():
+            tokens.append((token, match.start(), match.end()))
+    return tokens
+
+
+def _ngrams(text: str) -> Set[str]:
+    """
+    N-gramas de caracteres de un texto normalizado (sin espacios)
+
+    Se marcan el principio y el final (^ y $): con bigramas sin marcas una
+    transposición en una palabra corta ("saniz" por "sainz") deja casi
+    ningún n-grama en común.
+    """
+    padded = f"^{text.replace(' ', '')}$"
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+def _without(words: Iterable[str], generic: frozenset) -> str:
+    """Palabras de un nombre normalizado sin las genéricas"""
+    return ' '.join(word for word in words if word not in generic)
+
+
+def _driver_keys(attributes: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Claves de un piloto
+
+    OpenF1 escribe el apellido en mayúsculas ("Max VERSTAPPEN", "ZHOU
+    Guanyu"); si no hay ninguna palabra en mayúsculas se toma la última.
+    """
+    name = attributes.get('nombre') or ''
+    words = name.split()
+    surname = [word for word in words if len(word) > 1 and word.isupper()] or words[-1:]
+    given = [word for word in words if word not in surname]
+
+    keys = [(EXACT, normalize_text(name)), (ALIAS, normalize_text(' '.join(surname)))]
+    if given:
+        keys.append((EXACT, normalize_text(' '.join(given + surname))))
+        keys.append((ALIAS, normalize_text(' '.join(given))))
+    acronym = (attributes.get('name_acronym') or '').strip().upper()
+    if acronym:
+        keys.append((ACRONYM, acronym))
+    return keys
+
+
+def _team_keys(attributes: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Claves de un equipo: nombre, nombre sin patrocinadores, forma sin espacios y nombres anteriores"""
+    keys = []
+    for value in (attributes.get('nombre_equipo'), attributes.get('team_name')):
+        name = normalize_text(value or '')
+        if not name:
+            continue
+        keys.append((EXACT, name))
+        short = _without(name.split(), TEAM_GENERIC_WORDS)
+        for alias in (short, name.replace(' ', ''), short.replace(' ', '')):
+            keys.append((ALIAS, alias))
+        for former in TEAM_FORMER_NAMES.get(short, ()):
+            keys.append((ALIAS, former))
+    return keys
+
+
+def _circuit_keys(attributes: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Claves de un circuito: nombres, localidad y país (en inglés y en español)"""
+    keys = []
+    for attribute in ('nombre_oficial', 'circuit_short_name'):
+        keys.append((EXACT, normalize_text(attributes.get(attribute) or '')))
+
+    for value in (attributes.get('circuit_short_name'), attributes.get('location')):
+        value = value or ''
+        name = normalize_text(value)
+        keys.append((ALIAS, name))
+        keys.append((ALIAS, _without(name.split(), CIRCUIT_GENERIC_WORDS)))
+        if '-' in value:
+            # "Spa-Francorchamps" -> "spa"
+            keys.append((ALIAS, normalize_text(value.split('-', 1)[0])))
+
+    country = attributes.get('pais') or ''
+    for name in (country, *COUNTRY_NAMES_ES.get(country, ())):
+        keys.append((ALIAS, normalize_text(name)))
+    return keys
+
+
+_KEY_BUILDERS = {
+    'piloto': _driver_keys,
+    'equipo': _team_keys,
+    'circuito': _circuit_keys,
+}
+
+
+class EntityMatch(NamedTuple):
+    """Entidad reconocida en una pregunta"""
+    category: str  # drivers, teams o circuits
+    node_id: str
+    name: str  # Nombre del nodo (atributo de ENTITY_TYPES)
+    text: str  # Texto de la pregunta que la nombra
+    start: int  # Posición de text en la pregunta (question[start:end])
+    end: int
+    score: float  # 1.0 para coincidencias exactas, similitud para las aproximadas
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Entidad en el formato de NLPProcessor.extract_entities"""
+        return {
+            'id': self.node_id,
+            'name': self.name,
+            'text': self.text,
+            'start': self.start,
+            'end': self.end,
+            'score': round(self.score, 3),
+        }
+
+
+class EntityIndex:
+    """Mapas exacto, de alias y de n-gramas de las entidades de una red semántica"""
+
+    def __init__(self):
+        """Inicializa un índice vacío (se llena con refresh)"""
+        self.version: Optional[int] = None  # Versión de la red indexada
+        self.content_version = 0  # Sube solo cuando refresh reindexa algún nodo
+        self.exact: Dict[str, Set[str]] = {}
+        self.aliases: Dict[str, Set[str]] = {}
+        self.acronyms: Dict[str, Set[str]] = {}
+        self.ngrams: Dict[str, Set[str]] = defaultdict(set)
+        self.max_words = 1
+        # Nodo -> (categoría, nombre); y claves generadas por nodo con su firma
+        self.entities: Dict[str, Tuple[str, str]] = {}
+        self._node_keys: Dict[str, Tuple[Tuple[Any, ...], List[Tuple[str, str]]]] = {}
+        self._key_refs: Dict[str, int] = defaultdict(int)
+        self._key_ngrams: Dict[str, int] = {}  # Clave -> número de n-gramas distintos
+        # Número de palabras -> claves indexadas con esa longitud (para max_words)
+        self._word_counts: Dict[int, int] = defaultdict(int)
+        self._lock = RLock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Se envía a los procesos del pool: el lock no se serializa
+        state = dict(self.__dict__)
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = RLock()
+
+    def _tables(self, table: str) -> Dict[str, Set[str]]:
+        return {EXACT: self.exact, ALIAS: self.aliases, ACRONYM: self.acronyms}[table]
+
+    def _add_key(self, table: str, key: str, node_id: str) -> None:
+        self._tables(table).setdefault(key, set()).add(node_id)
+        if table == ACRONYM:
+            return
+        if self._key_refs[key] == 0:
+            grams = _ngrams(key)
+            for gram in grams:
+                self.ngrams[gram].add(key)
+            self._key_ngrams[key] = len(grams)
+            words = key.count(' ') + 1
+            self._word_counts[words] += 1
+            self.max_words = max(self.max_words, words)
+        self._key_refs[key] += 1
+
+    def _remove_key(self, table: str, key: str, node_id: str) -> None:
+        mapping = self._tables(table)
+        node_ids = mapping.get(key)
+        if node_ids is None:
+            return
+        node_ids.discard(node_id)
+        if not node_ids:
+            del mapping[key]
+        if table == ACRONYM:
+            return
+        self._key_refs[key] -= 1
+        if self._key_refs[key] <= 0:
+            del self._key_refs[key]
+            del self._key_ngrams[key]
+            words = key.count(' ') + 1
+            self._word_counts[words] -= 1
+            if not self._word_counts[words]:
+                del self._word_counts[words]
+                if words == self.max_words:
+                    # Era la clave más larga: la ventana de n-gramas se acorta
+                    self.max_words = max(self._word_counts, default=1)
+            for gram in _ngrams(key):
+                keys = self.ngrams.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self.ngrams[gram]
+
+    def _index_node(self, node_id: str, node_type: str, attributes: Dict[str, Any]) -> None:
+        category, name_attribute = ENTITY_TYPES[node_type]
+        keys = []
+        for table, key in _KEY_BUILDERS[node_type](attributes):
+            if key and (table, key) not in keys:
+                keys.append((table, key))
+                self._add_key(table, key, node_id)
+        signature = tuple(attributes.get(a) for a in NAME_ATTRIBUTES[node_type])
+        self._node_keys[node_id] = (signature, keys)
+        self.entities[node_id] = (category, str(attributes.get(name_attribute) or node_id))
+
+    def _unindex_node(self, node_id: str) -> None:
+        _, keys = self._node_keys.pop(node_id)
+        for table, key in keys:
+            self._remove_key(table, key, node_id)
+        self.entities.pop(node_id, None)
+
+    def refresh(self, network) -> int:
+        """
+        Pone el índice al día con la red
+
+        Solo reindexa los nodos nuevos, los eliminados y aquellos cuyos
+        atributos de nombre cambiaron; si la versión de la red no cambió no
+        hace nada. content_version solo cambia si se reindexó algún nodo.
+
+        Args:
+            network: SemanticNetwork de la que se leen pilotos, equipos y circuitos
+
+        Returns:
+            Número de nodos reindexados
+        """
+        with self._lock, network.lock.read():
+            if network.version == self.version:
+                return 0
+            nodes = network.graph.nodes
+            seen: Set[str] = set()
+            changed = 0
+            for node_type in ENTITY_TYPES:
+                attributes_names = NAME_ATTRIBUTES[node_type]
+                for node_id in network.nodes_by_type.get(node_type, []):
+                    if node_id not in nodes:
+                        continue
+                    seen.add(node_id)
+                    attributes = nodes[node_id]
+                    signature = tuple(attributes.get(a) for a in attributes_names)
+                    indexed = self._node_keys.get(node_id)
+                    if indexed is not None and indexed[0] == signature:
+                        continue
+                    if indexed is not None:
+                        self._unindex_node(node_id)
+                    self._index_node(node_id, node_type, attributes)
+                    changed += 1
+            for node_id in [n for n in self._node_keys if n not in seen]:
+                self._unindex_node(node_id)
+                changed += 1
+            self.version = network.version
+            if changed:
+                self.content_version += 1
+        if changed:
+            logger.info(f"Índice de entidades actualizado: {changed} nodos reindexados (red v{network.version})")
+        return changed
+
+    def _unique(self, mapping: Dict[str, Set[str]], key: str) -> Optional[str]:
+        """ID del nodo de una clave si no es ambigua"""
+        node_ids = mapping.get(key)
+        if node_ids is not None and len(node_ids) == 1:
+            return next(iter(node_ids))
+        return None
+
+    def lookup(self, phrase: str) -> Optional[str]:
+        """
+        Nodo nombrado por una frase normalizada (mapa exacto y luego alias)
+
+        Args:
+            phrase: Frase normalizada con normalize_text
+
+        Returns:
+            ID del nodo o None si no existe o es ambigua
+        """
+        return self._unique(self.exact, phrase) or self._unique(self.aliases, phrase)
+
+    def fuzzy_match(self, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Búsqueda aproximada de una palabra o frase
+
+        Los n-gramas de la frase seleccionan las claves candidatas; solo las
+        de mayor coeficiente de Dice sobre n-gramas se comparan con
+        SequenceMatcher.
+
+        Args:
+            text: Texto normalizado
+
+        Returns:
+            Tupla (ID del nodo, similitud) o None si ninguna clave supera el
+            umbral de su categoría
+        """
+        grams = _ngrams(text)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for key in self.ngrams.get(gram, ()):
+                shared[key] += 1
+        if not shared:
+            return None
+
+        best: Optional[Tuple[str, float]] = None
+        # Empates por orden alfabético: el orden de un set depende del hash
+        # de cada proceso y cambiaría qué claves entran en el corte
+        candidates = sorted(
+            shared, key=lambda key: (-shared[key] / (len(grams) + self._key_ngrams[key]), key)
+        )[:FUZZY_CANDIDATES]
+        for key in candidates:
+            node_id = self.lookup(key)
+            if node_id is None:
+                continue
+            score = SequenceMatcher(None, text, key).ratio()
+            if score >= FUZZY_THRESHOLDS[self.entities[node_id][0]] and (best is None or score > best[1]):
+                best = (node_id, score)
+        return best
+
+    def resolve(self, question: str) -> List[EntityMatch]:
+        """
+        Reconoce las entidades de una pregunta
+
+        Primero busca frases exactas o alias (la más larga en cada posición)
+        y siglas en mayúsculas; después, las palabras con mayúscula inicial
+        que no coincidieron se buscan de forma aproximada.
+
+        Args:
+            question: Pregunta del usuario
+
+        Returns:
+            Entidades en orden de aparición, sin repetir nodos
+        """
+        matches: List[EntityMatch] = []
+        found: Set[str] = set()
+        spans: List[Tuple[int, int]] = []
+
+        def covered(position: int) -> bool:
+            return any(start <= position < end for start, end in spans)
+
+        def add(node_id: str, score: float, start: int, end: int) -> None:
+            spans.append((start, end))
+            if node_id not in found:
+                found.add(node_id)
+                category, name = self.entities[node_id]
+                matches.append(EntityMatch(category, node_id, name, question[start:end], start, end, score))
+
+        with self._lock:
+            tokens = _tokenize(question)
+            i = 0
+            while i < len(tokens):
+                for length in range(min(self.max_words, len(tokens) - i), 0, -1):
+                    node_id = self.lookup(' '.join(token for token, _, _ in tokens[i:i + length]))
+                    if node_id is not None:
+                        add(node_id, 1.0, tokens[i][1], tokens[i + length - 1][2])
+                        i += length
+                        break
+                else:
+                    i += 1
+
+            for acronym in _ACRONYM_RE.finditer(question):
+                node_id = self._unique(self.acronyms, acronym.group())
+                if node_id is not None and not covered(acronym.start()):
+                    add(node_id, 1.0, acronym.start(), acronym.end())
+
+            for run in _CAPITALIZED_RUN_RE.finditer(question):
+                words = [
+                    (token, run.start() + start, run.start() + end)
+                    for token, start, end in _tokenize(run.group())
+                    if token not in FUZZY_STOPWORDS and not covered(run.start() + start)
+                ]
+                if not words:
+                    continue
+                # La frase completa primero ("Arabai Saudita") y luego cada palabra
+                groups = [words] + ([[word] for word in words] if len(words) > 1 else [])
+                for group in groups:
+                    phrase = ' '.join(token for token, _, _ in group)
+                    if len(phrase) < FUZZY_MIN_LENGTH:
+                        continue
+                    result = self.fuzzy_match(phrase)
+                    if result is not None:
+                        logger.debug(f"Fuzzy match: '{phrase}' -> '{result[0]}' (score: {result[1]:.2f})")
+                        add(result[0], result[1], group[0][1], group[-1][2])
+                        if group is groups[0]:
+                            break
+
+        matches.sort(key=lambda match: match.start)
+        return matches
+
+    def stats(self) -> Dict[str, Any]:
+        """Tamaño del índice"""
+        by_category: Dict[str, int] = defaultdict(int)
+        for category, _ in self.entities.values():
+            by_category[category] += 1
+        return {
+            'version': self.version,
+            'content_version': self.content_version,
+            'entities': dict(by_category),
+            'exact_keys': len(self.exact),
+            'alias_keys': len(self.aliases),
+            'ambiguous_aliases': sum(1 for ids in self.aliases.values() if len(ids) > 1),
+            'acronyms': len(self.acronyms),
+            'ngrams': len(self.ngrams),
+            'max_words': self.max_words,
+        }
@@ -0,0 +1,213 @@
+"""
+Ejecución de las etapas síncronas del pipeline de preguntas fuera del event loop
+"""
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .entity_index import EntityIndex
+from .nlp_processor import NLPProcessor
+
+logger = logging.getLogger(__name__)
+
+STRATEGY_INLINE = "inline"
+STRATEGY_THREAD = "thread"
+STRATEGY_PROCESS = "process"
+
+STRATEGIES = (STRATEGY_INLINE, STRATEGY_THREAD, STRATEGY_PROCESS)
+
+# NLPProcessor propio de cada proceso del pool (estrategia "process")
+_worker_nlp: Optional[NLPProcessor] = None
+
+
+def _init_nlp_worker(entity_index: Optional[EntityIndex] = None) -> None:
+    """Inicializador de los procesos del pool (recibe el índice de entidades del proceso principal)"""
+    global _worker_nlp
+    logging.getLogger().setLevel(logging.WARNING)
+    _worker_nlp = NLPProcessor(entity_index=entity_index)
+
+
+def _call_nlp(method: str, *args: Any) -> Any:
+    """Ejecuta un método del NLPProcessor del proceso actual"""
+    return getattr(_worker_nlp, method)(*args)
+
+
+def _worker_ready() -> int:
+    """Tarea vacía para arrancar un proceso del pool (devuelve su pid)"""
+    return os.getpid()
+
+
+class StageExecutor:
+    """
+    Ejecuta las etapas síncronas del pipeline según una estrategia configurable
+
+    - inline: en el propio event loop (comportamiento original)
+    - thread: en un pool de hilos; el event loop queda libre mientras tanto
+    - process: las etapas de NLP en un pool de procesos (sin GIL compartido)
+      y el resto, que necesita la red semántica en memoria, en hilos
+
+    Cada etapa registra su duración en el diccionario de tiempos recibido.
+    """
+
+    def __init__(self, strategy: str = STRATEGY_THREAD, max_workers: Optional[int] = None):
+        """
+        Inicializa el ejecutor
+
+        Args:
+            strategy: inline, thread o process
+            max_workers: Tamaño de los pools (None = valor por defecto de Python)
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Estrategia de ejecución inválida: {strategy}. Válidas: {', '.join(STRATEGIES)}")
+
+        self.strategy = strategy
+        self.max_workers = max_workers
+        self._thread_pool: Optional[Executor] = None
+        self._process_pool: Optional[Executor] = None
+        # Índice de entidades con el que se arrancaron los procesos del pool
+        self._worker_index: Optional[EntityIndex] = None
+        self._worker_index_version: Optional[int] = None
+        logger.info(f"StageExecutor inicializado con estrategia '{strategy}'")
+
+    def _threads(self) -> Executor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="query-stage"
+            )
+        return self._thread_pool
+
+    def _processes(self) -> Executor:
+        if self._process_pool is None:
+            # Import diferido: multiprocessing solo se carga con la estrategia process
+            from concurrent.futures import ProcessPoolExecutor
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_nlp_worker,
+                initargs=(self._worker_index,)
+            )
+        return self._process_pool
+
+    def _sync_worker_index(self, nlp_processor: NLPProcessor) -> None:
+        """
+        Envía a los procesos del pool el índice de entidades si cambió
+
+        Los procesos no tienen la red: reciben una copia del índice al
+        arrancar. Si el contenido del índice del proceso principal cambió
+        (content_version), el pool se sustituye por uno nuevo (las tareas en
+        curso terminan en el anterior). Los cambios de la red que no tocan
+        nombres de entidades (p. ej. enlazar telemetría) no cambian el
+        índice y no reinician el pool.
+        """
+        nlp_processor.refresh_index()
+        index = nlp_processor.entity_index
+        if index.content_version == self._worker_index_version:
+            return
+        self._worker_index = index
+        self._worker_index_version = index.content_version
+        if self._process_pool is not None:
+            logger.info(f"Índice de entidades v{index.content_version}: reiniciando el pool de procesos")
+            self._process_pool.shutdown(wait=False)
+            self._process_pool = None
+
+    async def run(
+        self,
+        stage: str,
+        func: Callable[..., Any],
+        *args: Any,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Any:
+        """
+        Ejecuta una etapa síncrona
+
+        Args:
+            stage: Nombre de la etapa (para los tiempos)
+            func: Función a ejecutar
+            *args: Argumentos de la función
+            timings: Diccionario donde acumular la duración (segundos)
+
+        Returns:
+            Resultado de la función
+        """
+        start = time.perf_counter()
+        try:
+            if self.strategy == STRATEGY_INLINE:
+                return func(*args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._threads(), func, *args)
+        finally:
+            if timings is not None:
+                timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+    async def run_nlp(
+        self,
+        stage: str,
+        nlp_processor: NLPProcessor,
+        method: str,
+        *args: Any,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Any:
+        """
+        Ejecuta un método del NLPProcessor como etapa
+
+        Con la estrategia process se usa la instancia del proceso del pool.
+
+        Args:
+            stage: Nombre de la etapa
+            nlp_processor: Procesador NLP local
+            method: Nombre del método a invocar
+            *args: Argumentos del método
+            timings: Diccionario donde acumular la duración (segundos)
+
+        Returns:
+            Resultado del método
+        """
+        if self.strategy != STRATEGY_PROCESS:
+            return await self.run(stage, getattr(nlp_processor, method), *args, timings=timings)
+
+        start = time.perf_counter()
+        try:
+            self._sync_worker_index(nlp_processor)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._processes(), _call_nlp, method, *args)
+        finally:
+            if timings is not None:
+                timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+    async def warm_up(self, nlp_processor: Optional[NLPProcessor] = None) -> int:
+        """
+        Arranca el pool de procesos antes de la primera pregunta
+
+        Con la estrategia process cada proceso construye su NLPProcessor al
+        arrancar; sin calentarlos, las primeras preguntas esperan a ese
+        arranque. Los hilos se crean bajo demanda y no necesitan calentarse.
+
+        Args:
+            nlp_processor: Procesador cuyo índice de entidades reciben los procesos
+
+        Returns:
+            Número de procesos arrancados (0 con inline o thread)
+        """
+        if self.strategy != STRATEGY_PROCESS:
+            return 0
+        if nlp_processor is not None:
+            self._sync_worker_index(nlp_processor)
+        loop = asyncio.get_running_loop()
+        workers = self.max_workers or os.cpu_count() or 1
+        pids = await asyncio.gather(*(
+            loop.run_in_executor(self._processes(), _worker_ready) for _ in range(workers)
+        ))
+        logger.info(f"Pool de procesos listo: {len(set(pids))} procesos")
+        return len(set(pids))
+
+    def shutdown(self) -> None:
+        """Detiene los pools"""
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
@@ -0,0 +1,383 @@
+"""
+Caché de respuestas de QueryService con un nivel fijo para las preguntas calientes
+
+El tráfico está muy sesgado: unas pocas decenas de formulaciones de
+"¿Quién es X?" o "¿Qué motor usa Y?" son la mayoría de las preguntas. Un
+count-min sketch cuenta la frecuencia de cada intención (acción, entidades
+resueltas y filtros; ver intent_fingerprint), de modo que todas las
+formulaciones de una misma intención suman juntas.
+
+Las respuestas se guardan por pregunta en dos niveles:
+
+- hot: pocas entradas cuya intención es de las más frecuentes. Una
+  respuesta entra al acertar en el LRU (la pregunta se repite) si su
+  intención es más frecuente que la más fría del nivel, que vuelve al LRU.
+  No se desalojan por volumen
+- lru: el resto, con desalojo LRU. Una ráfaga de preguntas de cola larga
+  solo desaloja entradas de este nivel
+
+El sketch se envejece (todos los contadores a la mitad) cada cierto número
+de preguntas para que una intención que deja de preguntarse acabe saliendo
+del nivel caliente.
+"""
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from ..models.schemas import AnswerResponse
+
+logger = logging.getLogger(__name__)
+
+_HASH_MASK = (1 << 64) - 1
+_ROW_BITS = 16  # Bits del hash por fila: 4 filas de hasta 65536 contadores
+
+
+def intent_fingerprint(intent: Dict[str, Any]) -> str:
+    """
+    Huella de una intención: acción, IDs de las entidades resueltas y filtros
+
+    Args:
+        intent: Intención construida por NLPProcessor.build_intent
+
+    Returns:
+        Cadena como ``get_pilot_details:driver_1:year=2024``
+    """
+    entities = intent['entities']
+    ids = [
+        match['id']
+        for category in ('drivers', 'teams', 'circuits')
+        for match in entities.get(category, ())
+    ]
+    filters = ','.join(f"{key}={value}" for key, value in sorted(intent['filters'].items()))
+    return f"{intent['action']}:{','.join(ids)}:{filters}"
+
+
+class CountMinSketch:
+    """Count-min sketch con envejecimiento y seguimiento de las claves más frecuentes"""
+
+    def __init__(self, width: int = 1024, depth: int = 4, top_k: int = 32, sample_size: int = 0):
+        """
+        Inicializa el sketch
+
+        Args:
+            width: Contadores por fila (se redondea a potencia de dos, máximo 65536)
+            depth: Filas (máximo 4: cada fila usa 16 bits del hash de la clave)
+            top_k: Claves más frecuentes que se conservan para top()
+            sample_size: Incrementos entre envejecimientos (0 = 10 * width)
+
+        Raises:
+            ValueError: Si width o depth están fuera de rango
+        """
+        if not 0 < width <= 1 << _ROW_BITS:
+            raise ValueError(f"width debe estar entre 1 y {1 << _ROW_BITS}: {width}")
+        if not 0 < depth <= 64 // _ROW_BITS:
+            raise ValueError(f"depth debe estar entre 1 y {64 // _ROW_BITS}: {depth}")
+        self.width = 1 << (width - 1).bit_length()
+        self.depth = depth
+        self.top_k = top_k
+        self.sample_size = sample_size or 10 * self.width
+        self._mask = self.width - 1
+        self._shifts = tuple(range(0, depth * _ROW_BITS, _ROW_BITS))
+        self._rows: List[List[int]] = [[0] * self.width for _ in range(depth)]
+        self._additions = 0
+        self.resets = 0  # Envejecimientos realizados
+        # Clave -> estimación de las top_k claves más frecuentes
+        self._top: Dict[str, int] = {}
+        self._top_floor = 0  # Cota inferior de la menor estimación de _top
+
+    def _slots(self, key: str) -> List[int]:
+        h = hash(key) & _HASH_MASK
+        mask = self._mask
+        return [(h >> shift) & mask for shift in self._shifts]
+
+    def estimate(self, key: str) -> int:
+        """
+        Frecuencia estimada de una clave (nunca menor que la real desde el último envejecimiento)
+
+        Args:
+            key: Clave
+
+        Returns:
+            Estimación
+        """
+        return min(row[slot] for row, slot in zip(self._rows, self._slots(key)))
+
+    def add(self, key: str) -> int:
+        """
+        Cuenta una aparición de una clave
+
+        Usa actualización conservadora: solo se incrementan los contadores
+        que están en el mínimo, lo que reduce la sobreestimación por
+        colisiones.
+
+        Args:
+            key: Clave
+
+        Returns:
+            Estimación de la clave tras contarla
+        """
+        slots = self._slots(key)
+        rows = self._rows
+        count = min(row[slot] for row, slot in zip(rows, slots)) + 1
+        for row, slot in zip(rows, slots):
+            if row[slot] < count:
+                row[slot] = count
+
+        # Las estimaciones solo crecen entre envejecimientos: _top_floor sigue
+        # siendo una cota inferior aunque suba la de alguna clave de _top
+        top = self._top
+        if key in top:
+            top[key] = count
+        elif len(top) < self.top_k:
+            top[key] = count
+            if len(top) == self.top_k:
+                self._top_floor = min(top.values())
+        elif self.top_k > 0 and count > self._top_floor:
+            top[key] = count
+            del top[min(top, key=top.get)]
+            self._top_floor = min(top.values())
+
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._age()
+        return count
+
+    def _age(self) -> None:
+        """Divide todos los contadores entre dos"""
+        for row in self._rows:
+            row[:] = [value >> 1 for value in row]
+        self._top = {key: value >> 1 for key, value in self._top.items() if value > 1}
+        self._top_floor = min(self._top.values()) if len(self._top) == self.top_k else 0
+        self._additions = 0
+        self.resets += 1
+        logger.debug(f"Sketch de intenciones envejecido ({self.resets})")
+
+    def top(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Claves más frecuentes
+
+        Args:
+            limit: Número máximo de claves (por defecto, top_k)
+
+        Returns:
+            Lista de (clave, estimación) de mayor a menor
+        """
+        ranked = sorted(self._top.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit is not None else ranked
+
+    def clear(self) -> None:
+        """Pone a cero todos los contadores"""
+        for row in self._rows:
+            row[:] = [0] * self.width
+        self._top.clear()
+        self._top_floor = 0
+        self._additions = 0
+
+
+class _Entry(NamedTuple):
+    response: AnswerResponse
+    fingerprint: str
+
+
+class HotAnswerCache:
+    """Respuestas por pregunta: nivel caliente fijo delante de un LRU"""
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        hot_entries: int = 64,
+        min_hits: int = 3,
+        sketch: Optional[CountMinSketch] = None
+    ):
+        """
+        Inicializa la caché
+
+        Args:
+            max_entries: Respuestas máximas del nivel LRU (0 = sin límite)
+            hot_entries: Respuestas máximas del nivel caliente (0 = sin nivel caliente)
+            min_hits: Frecuencia estimada mínima de la intención para entrar en el nivel caliente
+            sketch: Sketch de frecuencias (por defecto, uno nuevo)
+        """
+        self.max_entries = max_entries
+        self.hot_entries = hot_entries
+        self.min_hits = min_hits
+        self.sketch = sketch or CountMinSketch()
+        self._hot: Dict[str, _Entry] = {}
+        # Pregunta caliente -> estimación de su intención en el último acceso
+        self._hot_counts: Dict[str, int] = {}
+        self._hot_floor = 0  # Cota inferior de la menor estimación de _hot_counts
+        self._sketch_resets = self.sketch.resets
+        self._lru: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.promotions = 0
+        self.demotions = 0
+
+    def get(self, question: str) -> Optional[AnswerResponse]:
+        """
+        Busca una respuesta y cuenta la pregunta en el sketch
+
+        Args:
+            question: Pregunta
+
+        Returns:
+            AnswerResponse o None si no está
+        """
+        entry = self._hot.get(question)
+        if entry is not None:
+            self._sync_resets()
+            self._hot_counts[question] = self.sketch.add(entry.fingerprint)
+            return entry.response
+
+        entry = self._lru.get(question)
+        if entry is None:
+            return None
+        self._lru.move_to_end(question)
+        self._admit(question, entry, self.sketch.add(entry.fingerprint))
+        return entry.response
+
+    def peek(self, question: str) -> Optional[AnswerResponse]:
+        """
+        Busca una respuesta sin contarla ni cambiar su posición en el LRU
+
+        Args:
+            question: Pregunta
+
+        Returns:
+            AnswerResponse o None si no está
+        """
+        entry = self._hot.get(question) or self._lru.get(question)
+        return entry.response if entry is not None else None
+
+    def put(self, question: str, response: AnswerResponse, fingerprint: str) -> None:
+        """
+        Guarda una respuesta y cuenta su intención en el sketch
+
+        Args:
+            question: Pregunta
+            response: Respuesta
+            fingerprint: Huella de la intención (intent_fingerprint)
+        """
+        entry = _Entry(response, fingerprint)
+        count = self.sketch.add(fingerprint)
+        if question in self._hot:
+            self._hot[question] = entry
+            self._hot_counts[question] = count
+            return
+
+        # Solo pasan al nivel caliente las preguntas que se repiten (en get):
+        # una formulación única de una intención frecuente ocuparía un hueco
+        # que no se vuelve a usar
+        self._lru[question] = entry
+        self._lru.move_to_end(question)
+        if self.max_entries > 0:
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def record(self, fingerprint: str) -> None:
+        """
+        Cuenta en el sketch una pregunta cuya respuesta no se guarda
+
+        Args:
+            fingerprint: Huella de la intención
+        """
+        self.sketch.add(fingerprint)
+
+    def _sync_resets(self) -> None:
+        """Envejece las estimaciones del nivel caliente si el sketch se envejeció"""
+        resets = self.sketch.resets
+        if resets == self._sketch_resets:
+            return
+        shift = resets - self._sketch_resets
+        self._hot_counts = {question: count >> shift for question, count in self._hot_counts.items()}
+        self._hot_floor >>= shift
+        self._sketch_resets = resets
+
+    def _admit(self, question: str, entry: _Entry, count: int) -> bool:
+        """
+        Pasa una respuesta del LRU al nivel caliente si su intención lo merece
+
+        Si el nivel está lleno, la pregunta más fría vuelve al LRU (como la
+        más reciente) cuando la nueva la supera.
+
+        Returns:
+            True si la respuesta entró en el nivel caliente
+        """
+        if self.hot_entries <= 0 or count < self.min_hits:
+            return False
+        self._sync_resets()
+
+        if len(self._hot) >= self.hot_entries:
+            if count <= self._hot_floor:
+                return False
+            counts = self._hot_counts
+            coldest = min(counts, key=counts.get)
+            if count <= counts[coldest]:
+                self._hot_floor = counts[coldest]
+                return False
+            del counts[coldest]
+            self._lru[coldest] = self._hot.pop(coldest)
+            self.demotions += 1
+
+        self._lru.pop(question, None)
+        self._hot[question] = entry
+        self._hot_counts[question] = count
+        if len(self._hot) >= self.hot_entries:
+            self._hot_floor = min(self._hot_counts.values())
+        self.promotions += 1
+        return True
+
+    def hot_questions(self) -> List[Tuple[str, str, int]]:
+        """
+        Preguntas del nivel caliente
+
+        Returns:
+            Lista de (pregunta, huella de la intención, estimación) de mayor a menor
+        """
+        self._sync_resets()
+        return sorted(
+            ((question, entry.fingerprint, self._hot_counts[question]) for question, entry in self._hot.items()),
+            key=lambda item: (-item[2], item[0])
+        )
+
+    def stats(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Estado de la caché para operadores
+
+        Args:
+            limit: Número máximo de intenciones y preguntas calientes listadas
+
+        Returns:
+            Diccionario con tamaños, promociones y las intenciones más frecuentes
+        """
+        return {
+            'entries': len(self._lru),
+            'max_entries': self.max_entries,
+            'hot_entries': len(self._hot),
+            'hot_capacity': self.hot_entries,
+            'min_hits': self.min_hits,
+            'promotions': self.promotions,
+            'demotions': self.demotions,
+            'sketch_resets': self.sketch.resets,
+            'top_intents': [
+                {'fingerprint': fingerprint, 'estimate': estimate}
+                for fingerprint, estimate in self.sketch.top(limit)
+            ],
+            'hot_questions': [
+                {'question': question, 'fingerprint': fingerprint, 'estimate': estimate}
+                for question, fingerprint, estimate in self.hot_questions()[:limit]
+            ],
+        }
+
+    def clear(self) -> None:
+        """Vacía los dos niveles y el sketch"""
+        self._hot.clear()
+        self._hot_counts.clear()
+        self._hot_floor = 0
+        self._lru.clear()
+        self.sketch.clear()
+        self._sketch_resets = self.sketch.resets
+
+    def __contains__(self, question: str) -> bool:
+        return question in self._hot or question in self._lru
+
+    def __len__(self) -> int:
+        return len(self._hot) + len(self._lru)
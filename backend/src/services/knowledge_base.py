@@ -1,14 +1,37 @@
 """
 Base de Conocimiento - Carga y pobla la red semántica con datos de F1
 """
+import asyncio
+import hashlib
+import json
 import logging
-from typing import Dict, List, Any, Optional
+import time
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Tuple
+from ..core.metrics import record_kb_load
 from ..core.semantic_network import SemanticNetwork
 from .openf1_client import OpenF1Client
+from . import snapshot
+
+if TYPE_CHECKING:
+    from .telemetry import TelemetryStore
 
 logger = logging.getLogger(__name__)
 
 
+def _content_id(data: Any) -> str:
+    """
+    Identificador corto y estable de unos datos (para los ETag)
+
+    Args:
+        data: Estructura serializable a JSON (None para una base vacía)
+
+    Returns:
+        12 caracteres hexadecimales
+    """
+    encoded = json.dumps(data, sort_keys=True, default=str, ensure_ascii=False).encode()
+    return hashlib.blake2b(encoded, digest_size=6).hexdigest()
+
+
 class KnowledgeBase:
     """Gestiona la carga y población de la red semántica"""
     
@@ -62,18 +85,84 @@ class KnowledgeBase:
         'haas f1 team': 'Guenther Steiner',
     }
     
-    def __init__(self, openf1_client: OpenF1Client):
+    # Tipo de sesión -> nodo de tipo de evento
+    SESSION_TYPE_IDS = {'R': 'tipo_race', 'Q': 'tipo_qualifying', 'P': 'tipo_practice'}
+    
+    # Mapeo flexible de nombres de equipos a motores: nombre completo en
+    # minúsculas o, si no está, fragmento contenido en el nombre
+    TEAM_ENGINE_KEYWORDS = {
+        'red bull': 'Honda RBPT',
+        'redbull': 'Honda RBPT',
+        'mercedes': 'Mercedes',
+        'ferrari': 'Ferrari',
+        'mclaren': 'Mercedes',
+        'aston martin': 'Mercedes',
+        'alpine': 'Renault',
+        'williams': 'Mercedes',
+        'alphatauri': 'Honda RBPT',
+        'rb': 'Honda RBPT',
+        'alfa romeo': 'Ferrari',
+        'sauber': 'Ferrari',
+        'kick sauber': 'Ferrari',
+        'haas': 'Ferrari',
+    }
+    
+    MOTORS = [
+        {'fabricante': 'Mercedes', 'proveedor_combustible': 'Petronas'},
+        {'fabricante': 'Ferrari', 'proveedor_combustible': 'Shell'},
+        {'fabricante': 'Honda RBPT', 'proveedor_combustible': 'ExxonMobil'},
+        {'fabricante': 'Renault', 'proveedor_combustible': 'BP'},
+    ]
+    
+    EVENT_TYPES = [
+        {'id': 'tipo_race', 'nombre': 'Race', 'descripcion': 'Carrera principal'},
+        {'id': 'tipo_qualifying', 'nombre': 'Qualifying', 'descripcion': 'Sesión de clasificación'},
+        {'id': 'tipo_practice', 'nombre': 'Practice', 'descripcion': 'Sesión de práctica'},
+    ]
+    
+    def __init__(self, openf1_client: OpenF1Client, telemetry_archive_dir: Optional[str] = None):
         """
         Inicializa la base de conocimiento
         
         Args:
             openf1_client: Cliente para la API de OpenF1
+            telemetry_archive_dir: Directorio opcional del archivo de telemetría en disco
         """
         self.client = openf1_client
         self.network = SemanticNetwork()
+        self.telemetry_archive_dir = telemetry_archive_dir
+        self._telemetry: Optional["TelemetryStore"] = None
         self.loaded = False
+        self.read_only = False  # True si se cargó desde un snapshot
+        self.year: Optional[int] = None
+        # Identifica el contenido cargado en los ETag (junto con la versión de
+        # la red): se deriva de los datos, de modo que varios workers con los
+        # mismos datos generan los mismos ETag y las revalidaciones que llegan
+        # a otro worker siguen respondiendo 304
+        self.instance_id = _content_id(None)
         logger.info("KnowledgeBase inicializada")
     
+    @property
+    def telemetry(self) -> "TelemetryStore":
+        """
+        Almacén de telemetría, creado en el primer uso
+        
+        El módulo de telemetría importa NumPy, que solo hace falta para las
+        preguntas de telemetría: importarlo al arrancar retrasaría el inicio
+        del proceso.
+        
+        Returns:
+            TelemetryStore de esta base de conocimiento
+        """
+        if self._telemetry is None:
+            from .telemetry import TelemetryStore
+            from .telemetry_archive import TelemetryArchive
+            archive = TelemetryArchive(self.telemetry_archive_dir) if self.telemetry_archive_dir else None
+            self._telemetry = TelemetryStore(
+                self.client, self.network, archive, link_network=not self.read_only
+            )
+        return self._telemetry
+    
     def _normalize_name(self, name: str) -> str:
         """Normaliza nombres para usar como IDs"""
         return name.lower().replace(' ', '_').replace('-', '_')
@@ -86,6 +175,7 @@ class KnowledgeBase:
             year: Año para cargar datos
         """
         logger.info(f"Iniciando carga de datos para el año {year}")
+        started_at = time.perf_counter()
         
         try:
             # Cargar datos en orden
@@ -93,6 +183,8 @@ class KnowledgeBase:
             logger.info(f"Obtenidos {len(meetings)} meetings")
             if meetings:
                 logger.info(f"Primer meeting de ejemplo: {meetings[0]}")
+            elif meetings.failed:
+                logger.error(f"⚠️ Falló la petición de meetings a la API: {meetings.error}")
             else:
                 logger.warning("⚠️ No se obtuvieron meetings de la API!")
             
@@ -100,381 +192,286 @@ class KnowledgeBase:
             logger.info(f"Obtenidas {len(sessions)} sesiones")
             if sessions:
                 logger.info(f"Primera sesión de ejemplo: {sessions[0]}")
+            elif sessions.failed:
+                logger.error(f"⚠️ Falló la petición de sesiones a la API: {sessions.error}")
             else:
                 logger.warning("⚠️ No se obtuvieron sesiones de la API!")
             
-            # Poblar red semántica
-            await self._populate_circuits(meetings)
-            await self._populate_sessions(sessions)
-            await self._populate_drivers(sessions)
-            await self._populate_teams()
-            await self._populate_motors()
-            await self._populate_types()
-            await self._create_relationships(sessions)
+            drivers = await self._fetch_drivers(sessions)
+            
+            # Poblar red semántica en un hilo: el lock de escritura espera a
+            # las lecturas en curso de los hilos del StageExecutor y no debe
+            # bloquear el event loop mientras tanto
+            await asyncio.to_thread(self._populate, meetings, sessions, drivers)
             
             self.loaded = True
-            stats = self.network.get_stats()
+            self.year = year
+            record_kb_load('openf1', time.perf_counter() - started_at)
+            stats = await asyncio.to_thread(self.network.get_stats)
             logger.info(f"Base de conocimiento cargada exitosamente: {stats}")
             
         except Exception as e:
             logger.error(f"Error cargando base de conocimiento: {e}", exc_info=True)
             raise
     
-    async def _populate_circuits(self, meetings: List[Dict[str, Any]]) -> None:
+    async def _fetch_drivers(self, sessions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Pobla nodos de circuitos y países
+        Obtiene las filas de pilotos de las primeras sesiones
         
         Args:
-            meetings: Lista de meetings desde la API
+            sessions: Lista de sesiones desde la API
+            
+        Returns:
+            Filas de /drivers en el orden de las sesiones
         """
-        logger.info("Poblando circuitos...")
+        rows: List[Dict[str, Any]] = []
+        for session in sessions[:5]:  # Limitar a primeras 5 sesiones para optimizar
+            session_key = session.get('session_key')
+            if session_key:
+                rows.extend(await self.client.get_drivers(session_key=session_key))
+        return rows
+    
+    def _circuit_record(self, meeting: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Normaliza un meeting en (ID del circuito, atributos), o None si no identifica un circuito"""
+        circuit_key = meeting.get('circuit_key')
+        circuit_name = meeting.get('circuit_short_name', '')
+        if not circuit_key or not circuit_name:
+            return None
+        
+        # Nombre oficial del circuito (puede requerir mapeo manual)
+        official_name = f"{circuit_name} Circuit"
+        if 'Monaco' in circuit_name:
+            official_name = "Circuit de Monaco"
+        elif 'Silverstone' in circuit_name:
+            official_name = "Silverstone Circuit"
+        
+        return f"circuit_{circuit_key}", {
+            'nombre_oficial': official_name,
+            'pais': meeting.get('country_name', ''),
+            'longitud_metros': 5000.0,  # Valor por defecto
+            'circuit_key': circuit_key,
+            'circuit_short_name': circuit_name,
+            'location': meeting.get('location', '')
+        }
+    
+    def _session_record(self, session: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Normaliza una sesión en (ID de la sesión, atributos), o None si no tiene clave"""
+        session_key = session.get('session_key')
+        if not session_key:
+            return None
+        
+        session_name = session.get('session_name', '')
+        date_start = session.get('date_start', '')
+        
+        # Determinar tipo de sesión
+        tipo = 'P'  # Practice por defecto
+        if 'Race' in session_name or 'Sprint' in session_name:
+            tipo = 'R'
+        elif 'Qualifying' in session_name:
+            tipo = 'Q'
+        
+        return f"session_{session_key}", {
+            'session_key': session_key,
+            'tipo': tipo,
+            # Extraer solo la fecha
+            'fecha': date_start.split('T')[0] if 'T' in date_start else date_start,
+            'session_name': session_name,
+            'year': session.get('year') or 2024,
+            'location': session.get('location', ''),
+            'pais': session.get('country_name', ''),
+            'session_type': session.get('session_type', ''),
+            'circuit_key': session.get('circuit_key')
+        }
+    
+    def _driver_record(self, driver: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Normaliza una fila de /drivers en (ID del piloto, atributos), o None si está incompleta"""
+        driver_number = driver.get('driver_number')
+        full_name = driver.get('full_name', '')
+        if not driver_number or not full_name:
+            return None
+        
+        country_code = driver.get('country_code', '')
+        return f"driver_{driver_number}", {
+            'nombre': full_name,
+            'numero_piloto': driver_number,
+            # Obtener nombre completo de país
+            'nacionalidad': self.COUNTRY_CODES.get(country_code, country_code),
+            'driver_number': driver_number,
+            'name_acronym': driver.get('name_acronym', ''),
+            'team_name': driver.get('team_name', ''),
+            'country_code': country_code
+        }
+    
+    def _team_engine(self, team_name: str) -> str:
+        """Motor de un equipo según TEAM_ENGINE_KEYWORDS ('' si no se reconoce)"""
+        team_name = team_name.lower()
+        
+        # Intentar buscar motor con el nombre completo primero
+        engine = self.TEAM_ENGINE_KEYWORDS.get(team_name, '')
+        
+        # Si no se encuentra, buscar por palabras clave
+        if not engine:
+            for key, motor in self.TEAM_ENGINE_KEYWORDS.items():
+                if key in team_name or team_name in key:
+                    return motor
+        return engine
+    
+    def _populate(
+        self,
+        meetings: List[Dict[str, Any]],
+        sessions: List[Dict[str, Any]],
+        drivers: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Pobla la red semántica en una sola pasada por las filas de la API
+        
+        Cada fila se normaliza (_circuit_record, _session_record,
+        _driver_record) y emite en el momento sus nodos y aristas. Lo que
+        hace falta para las relaciones (países y equipos ya vistos, motor de
+        cada equipo, nodo de tipo de cada sesión) se guarda en tablas en
+        memoria en lugar de releerlo de la red, y todo se inserta al final
+        con una llamada a add_nodes_bulk y otra a add_edges_bulk.
         
+        Args:
+            meetings: Meetings desde la API
+            sessions: Sesiones desde la API
+            drivers: Filas de /drivers (ver _fetch_drivers)
+        """
+        nodes: List[Tuple[str, str, Dict[str, Any]]] = []
+        edges: List[Tuple[str, str, str, Optional[Dict[str, Any]]]] = []
+        
+        # Circuitos y países (circuito -esta_en-> país)
         circuits_added = set()
         countries_added = set()
-        
         for meeting in meetings:
-            circuit_key = meeting.get('circuit_key')
-            circuit_name = meeting.get('circuit_short_name', '')
-            country_name = meeting.get('country_name', '')
-            location = meeting.get('location', '')
-            
-            if not circuit_key or not circuit_name:
+            record = self._circuit_record(meeting)
+            if record is None:
                 continue
-            
-            circuit_id = f"circuit_{circuit_key}"
+            circuit_id, attributes = record
             
             # Agregar nodo de circuito solo una vez
             if circuit_id not in circuits_added:
-                # Nombre oficial del circuito (puede requerir mapeo manual)
-                official_name = f"{circuit_name} Circuit"
-                if 'Monaco' in circuit_name:
-                    official_name = "Circuit de Monaco"
-                elif 'Silverstone' in circuit_name:
-                    official_name = "Silverstone Circuit"
-                
-                self.network.add_node(
-                    node_id=circuit_id,
-                    node_type='circuito',
-                    attributes={
-                        'nombre_oficial': official_name,
-                        'pais': country_name,
-                        'longitud_metros': 5000.0,  # Valor por defecto
-                        'circuit_key': circuit_key,
-                        'circuit_short_name': circuit_name,
-                        'location': location
-                    }
-                )
+                nodes.append((circuit_id, 'circuito', attributes))
                 circuits_added.add(circuit_id)
             
-            # Agregar nodo de país
+            country_name = meeting.get('country_name', '')
             if country_name:
                 country_id = f"country_{self._normalize_name(country_name)}"
-                
                 if country_id not in countries_added:
-                    self.network.add_node(
-                        node_id=country_id,
-                        node_type='pais',
-                        attributes={
-                            'nombre': country_name,
-                            'codigo': ''
-                        }
-                    )
+                    nodes.append((country_id, 'pais', {'nombre': country_name, 'codigo': ''}))
                     countries_added.add(country_id)
-                
-                # Crear relación circuito -> país
-                self.network.add_edge(
-                    source=circuit_id,
-                    target=country_id,
-                    relation='esta_en'
-                )
-        
-        logger.info(f"Agregados {len(circuits_added)} circuitos y {len(countries_added)} países")
-    
-    async def _populate_sessions(self, sessions: List[Dict[str, Any]]) -> None:
-        """
-        Pobla nodos de sesiones
-        
-        Args:
-            sessions: Lista de sesiones desde la API
-        """
-        logger.info("Poblando sesiones...")
+                edges.append((circuit_id, country_id, 'esta_en', None))
         
+        # Sesiones (sesión -ocurre_en-> circuito, sesión -es_un_tipo_de-> tipo)
         sessions_added = 0
-        
         for session in sessions:
-            session_key = session.get('session_key')
-            session_name = session.get('session_name', '')
-            date_start = session.get('date_start', '')
-            year = session.get('year')
-            circuit_key = session.get('circuit_key')
-            location = session.get('location', '')
-            
-            if not session_key:
+            record = self._session_record(session)
+            if record is None:
                 continue
-            
-            # Determinar tipo de sesión
-            tipo = 'P'  # Practice por defecto
-            if 'Race' in session_name or 'Sprint' in session_name:
-                tipo = 'R'
-            elif 'Qualifying' in session_name:
-                tipo = 'Q'
-            
-            session_id = f"session_{session_key}"
-            
-            # Extraer solo la fecha
-            fecha = date_start.split('T')[0] if 'T' in date_start else date_start
-            
-            self.network.add_node(
-                node_id=session_id,
-                node_type='sesion',
-                attributes={
-                    'session_key': session_key,
-                    'tipo': tipo,
-                    'fecha': fecha,
-                    'session_name': session_name,
-                    'year': year or 2024,
-                    'location': location,
-                    'circuit_key': circuit_key
-                }
-            )
-            
-            # Crear relación sesión -> circuito
-            if circuit_key:
-                circuit_id = f"circuit_{circuit_key}"
-                self.network.add_edge(
-                    source=session_id,
-                    target=circuit_id,
-                    relation='ocurre_en'
-                )
-            
+            session_id, attributes = record
+            nodes.append((session_id, 'sesion', attributes))
+            if attributes['circuit_key']:
+                edges.append((session_id, f"circuit_{attributes['circuit_key']}", 'ocurre_en', None))
+            edges.append((session_id, self.SESSION_TYPE_IDS[attributes['tipo']], 'es_un_tipo_de', None))
             sessions_added += 1
         
-        logger.info(f"Agregadas {sessions_added} sesiones")
-    
-    async def _populate_drivers(self, sessions: List[Dict[str, Any]]) -> None:
-        """
-        Pobla nodos de pilotos
-        
-        Args:
-            sessions: Lista de sesiones para obtener pilotos
-        """
-        logger.info("Poblando pilotos...")
-        
+        # Pilotos (piloto -conduce_para-> equipo); los equipos salen de sus filas
         drivers_added = set()
-        
-        # Obtener pilotos de varias sesiones
-        for session in sessions[:5]:  # Limitar a primeras 5 sesiones para optimizar
-            session_key = session.get('session_key')
-            if not session_key:
+        teams: Dict[str, str] = {}  # Nombre del equipo -> ID, en orden de aparición
+        for driver in drivers:
+            record = self._driver_record(driver)
+            if record is None:
                 continue
+            driver_id, attributes = record
             
-            drivers = await self.client.get_drivers(session_key=session_key)
-            
-            for driver in drivers:
-                driver_number = driver.get('driver_number')
-                full_name = driver.get('full_name', '')
-                name_acronym = driver.get('name_acronym', '')
-                team_name = driver.get('team_name', '')
-                country_code = driver.get('country_code', '')
-                
-                if not driver_number or not full_name:
-                    continue
-                
-                driver_id = f"driver_{driver_number}"
-                
-                # Agregar solo una vez
-                if driver_id in drivers_added:
-                    continue
-                
-                # Obtener nombre completo de país
-                nacionalidad = self.COUNTRY_CODES.get(country_code, country_code)
-                
-                self.network.add_node(
-                    node_id=driver_id,
-                    node_type='piloto',
-                    attributes={
-                        'nombre': full_name,
-                        'numero_piloto': driver_number,
-                        'nacionalidad': nacionalidad,
-                        'driver_number': driver_number,
-                        'name_acronym': name_acronym,
-                        'team_name': team_name,
-                        'country_code': country_code
-                    }
-                )
-                
-                drivers_added.add(driver_id)
-        
-        logger.info(f"Agregados {len(drivers_added)} pilotos")
-    
-    async def _populate_teams(self) -> None:
-        """Pobla nodos de equipos"""
-        logger.info("Poblando equipos...")
-        
-        # Obtener equipos únicos de los pilotos ya agregados
-        teams_from_drivers = set()
-        
-        for node_id in self.network.nodes_by_type.get('piloto', []):
-            node_data = self.network.get_node_details(node_id)
-            if node_data:
-                team_name = node_data['attributes'].get('team_name', '')
-                if team_name:
-                    teams_from_drivers.add(team_name)
-        
-        # Agregar nodos de equipos
-        for team_name in teams_from_drivers:
-            team_id = f"team_{self._normalize_name(team_name)}"
-            
-            # Obtener jefe de equipo
-            team_principal = self.TEAM_PRINCIPALS.get(team_name.lower(), '')
-            
-            self.network.add_node(
-                node_id=team_id,
-                node_type='equipo',
-                attributes={
-                    'nombre_equipo': team_name,
-                    'jefe_equipo': team_principal,
-                    'team_name': team_name
-                }
-            )
-        
-        logger.info(f"Agregados {len(teams_from_drivers)} equipos")
-    
-    async def _populate_motors(self) -> None:
-        """Pobla nodos de motores"""
-        logger.info("Poblando motores...")
-        
-        motors = [
-            {'fabricante': 'Mercedes', 'proveedor_combustible': 'Petronas'},
-            {'fabricante': 'Ferrari', 'proveedor_combustible': 'Shell'},
-            {'fabricante': 'Honda RBPT', 'proveedor_combustible': 'ExxonMobil'},
-            {'fabricante': 'Renault', 'proveedor_combustible': 'BP'},
-        ]
-        
-        for motor in motors:
-            motor_id = f"engine_{self._normalize_name(motor['fabricante'])}"
+            # Agregar solo una vez
+            if driver_id in drivers_added:
+                continue
+            drivers_added.add(driver_id)
+            nodes.append((driver_id, 'piloto', attributes))
             
-            self.network.add_node(
-                node_id=motor_id,
-                node_type='motor',
-                attributes=motor
-            )
+            team_name = attributes['team_name']
+            if team_name:
+                team_id = teams.get(team_name)
+                if team_id is None:
+                    team_id = teams[team_name] = f"team_{self._normalize_name(team_name)}"
+                edges.append((driver_id, team_id, 'conduce_para', {'season': 2024}))
+        
+        # Equipos (equipo -usa_motor-> motor)
+        for team_name, team_id in teams.items():
+            nodes.append((team_id, 'equipo', {
+                'nombre_equipo': team_name,
+                'jefe_equipo': self.TEAM_PRINCIPALS.get(team_name.lower(), ''),
+                'team_name': team_name
+            }))
+            engine = self._team_engine(team_name)
+            if engine:
+                edges.append((team_id, f"engine_{self._normalize_name(engine)}", 'usa_motor', None))
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Relación creada: {team_name.lower()} -> {engine}")
+            else:
+                logger.warning(f"No se encontró motor para el equipo: {team_name.lower()}")
         
-        logger.info(f"Agregados {len(motors)} motores")
-    
-    async def _populate_types(self) -> None:
-        """Pobla nodos de tipos de eventos"""
-        logger.info("Poblando tipos de eventos...")
+        # Motores y tipos de evento
+        for motor in self.MOTORS:
+            nodes.append((f"engine_{self._normalize_name(motor['fabricante'])}", 'motor', motor))
+        for tipo in self.EVENT_TYPES:
+            nodes.append((tipo['id'], 'tipo_evento', {'nombre': tipo['nombre'], 'descripcion': tipo['descripcion']}))
         
-        types = [
-            {'id': 'tipo_race', 'nombre': 'Race', 'descripcion': 'Carrera principal'},
-            {'id': 'tipo_qualifying', 'nombre': 'Qualifying', 'descripcion': 'Sesión de clasificación'},
-            {'id': 'tipo_practice', 'nombre': 'Practice', 'descripcion': 'Sesión de práctica'},
-        ]
+        # Nota: Las relaciones "tiene_ganador" se crearían con datos de resultados
+        # que requieren consultas adicionales a la API
         
-        for tipo in types:
-            self.network.add_node(
-                node_id=tipo['id'],
-                node_type='tipo_evento',
-                attributes={
-                    'nombre': tipo['nombre'],
-                    'descripcion': tipo['descripcion']
-                }
-            )
+        with self.network.batch():
+            self.network.add_nodes_bulk(nodes)
+            relationships_count = self.network.add_edges_bulk(edges)
+        self.instance_id = _content_id((nodes, edges))
         
-        logger.info(f"Agregados {len(types)} tipos de eventos")
+        logger.info(
+            f"Agregados {len(circuits_added)} circuitos, {len(countries_added)} países, "
+            f"{sessions_added} sesiones, {len(drivers_added)} pilotos, {len(teams)} equipos, "
+            f"{len(self.MOTORS)} motores y {len(self.EVENT_TYPES)} tipos de eventos"
+        )
+        logger.info(f"Creadas {relationships_count} relaciones")
     
-    async def _create_relationships(self, sessions: List[Dict[str, Any]]) -> None:
+    def save_snapshot(self, path: str) -> None:
         """
-        Crea relaciones entre nodos
+        Guarda la base de conocimiento como snapshot
         
         Args:
-            sessions: Lista de sesiones
+            path: Ruta del fichero de snapshot
         """
-        logger.info("Creando relaciones...")
-        
-        relationships_count = 0
-        
-        # Relación piloto -> equipo (conduce_para)
-        for driver_id in self.network.nodes_by_type.get('piloto', []):
-            driver_data = self.network.get_node_details(driver_id)
-            if driver_data:
-                team_name = driver_data['attributes'].get('team_name', '')
-                if team_name:
-                    team_id = f"team_{self._normalize_name(team_name)}"
-                    self.network.add_edge(
-                        source=driver_id,
-                        target=team_id,
-                        relation='conduce_para',
-                        attributes={'season': 2024}
-                    )
-                    relationships_count += 1
-        
-        # Relación equipo -> motor (usa_motor)
-        # Mapeo flexible de nombres de equipos a motores
-        flexible_team_engine_map = {
-            'red bull': 'Honda RBPT',
-            'redbull': 'Honda RBPT',
-            'mercedes': 'Mercedes',
-            'ferrari': 'Ferrari',
-            'mclaren': 'Mercedes',
-            'aston martin': 'Mercedes',
-            'alpine': 'Renault',
-            'williams': 'Mercedes',
-            'alphatauri': 'Honda RBPT',
-            'rb': 'Honda RBPT',
-            'alfa romeo': 'Ferrari',
-            'sauber': 'Ferrari',
-            'kick sauber': 'Ferrari',
-            'haas': 'Ferrari',
-        }
-        
-        for team_id in self.network.nodes_by_type.get('equipo', []):
-            team_data = self.network.get_node_details(team_id)
-            if team_data:
-                team_name = team_data['attributes'].get('team_name', '').lower()
-                
-                # Intentar buscar motor con el nombre completo primero
-                engine = flexible_team_engine_map.get(team_name, '')
-                
-                # Si no se encuentra, buscar por palabras clave
-                if not engine:
-                    for key, motor in flexible_team_engine_map.items():
-                        if key in team_name or team_name in key:
-                            engine = motor
-                            break
-                
-                if engine:
-                    engine_id = f"engine_{self._normalize_name(engine)}"
-                    self.network.add_edge(
-                        source=team_id,
-                        target=engine_id,
-                        relation='usa_motor'
-                    )
-                    relationships_count += 1
-                    logger.debug(f"Relación creada: {team_name} -> {engine}")
-                else:
-                    logger.warning(f"No se encontró motor para el equipo: {team_name}")
-        
-        # Relación sesión -> tipo (es_un_tipo_de)
-        for session_id in self.network.nodes_by_type.get('sesion', []):
-            session_data = self.network.get_node_details(session_id)
-            if session_data:
-                tipo = session_data['attributes'].get('tipo', 'P')
-                type_map = {'R': 'tipo_race', 'Q': 'tipo_qualifying', 'P': 'tipo_practice'}
-                type_id = type_map.get(tipo, 'tipo_practice')
-                
-                self.network.add_edge(
-                    source=session_id,
-                    target=type_id,
-                    relation='es_un_tipo_de'
-                )
-                relationships_count += 1
+        snapshot.save_snapshot(
+            self.network, path, metadata={'year': self.year, 'content_id': self.instance_id}
+        )
+    
+    def load_snapshot(self, path: str) -> None:
+        """
+        Carga un snapshot guardado por otro proceso
         
-        # Nota: Las relaciones "tiene_ganador" se crearían con datos de resultados
-        # que requieren consultas adicionales a la API
+        La base de conocimiento queda en modo solo lectura: no se llama a
+        OpenF1 para cargarla y no se puede recargar desde este proceso.
         
-        logger.info(f"Creadas {relationships_count} relaciones")
+        Args:
+            path: Ruta del fichero de snapshot
+        """
+        logger.info(f"Cargando base de conocimiento desde snapshot {path}")
+        started_at = time.perf_counter()
+        payload = snapshot.load_snapshot(path)
+        self.network.import_data(payload['network'])
+        self.year = payload['metadata'].get('year')
+        # Todos los procesos que cargan el mismo snapshot comparten el ID
+        self.instance_id = payload['metadata'].get('content_id') or _content_id(payload['created_at'])
+        self.loaded = True
+        self.read_only = True
+        if self._telemetry is not None:
+            self._telemetry.link_network = False
+        record_kb_load('snapshot', time.perf_counter() - started_at)
+        logger.info(f"Base de conocimiento cargada desde snapshot (solo lectura): {self.network.get_stats()}")
+    
+    @property
+    def version(self) -> str:
+        """Versión del contenido: cambia con cada carga o modificación de la red"""
+        return f"{self.instance_id}.{self.network.version}"
     
     def get_semantic_network(self) -> SemanticNetwork:
         """Retorna la instancia de la red semántica"""
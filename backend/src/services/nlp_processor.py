@@ -4,25 +4,53 @@ Procesador de Lenguaje Natural para analizar preguntas en español
 import re
 import logging
 from typing import Dict, List, Any, Optional
-from unidecode import unidecode
-from difflib import SequenceMatcher
+from .entity_index import EntityIndex, normalize_text
 
 logger = logging.getLogger(__name__)
 
+# Expresiones de la extracción de entidades, compiladas una vez por proceso
+_YEAR_RE = re.compile(r'\b(20\d{2})\b')
+_NUMBER_RE = re.compile(r'\b(\d{1,2})\b')
+
 
 class NLPProcessor:
     """Procesador NLP para analizar preguntas sobre F1 en español"""
     
-    def __init__(self):
-        """Inicializa el procesador NLP con patrones y diccionarios"""
+    def __init__(self, network=None, entity_index: Optional[EntityIndex] = None):
+        """
+        Inicializa el procesador NLP con patrones y diccionarios
+        
+        Los pilotos, equipos y circuitos se reconocen con un índice construido
+        desde la red semántica, que se actualiza solo cuando la red cambia.
+        
+        Args:
+            network: SemanticNetwork de la que se construye el índice de entidades
+            entity_index: Índice ya construido (los procesos del pool reciben
+                el del proceso principal y no tienen la red)
+        """
         self._init_patterns()
         self._init_synonyms()
-        self._init_known_entities()
+        self.network = None
+        self.entity_index = entity_index or EntityIndex()
+        if network is not None:
+            self.attach_network(network)
         logger.info("NLPProcessor inicializado")
     
     def _init_patterns(self):
         """Define patrones de regex para diferentes tipos de preguntas"""
         self.patterns = {
+            'fastest_lap_info': [
+                r'vuelta\s+(?:más|mas)\s+(?:rápida|rapida)',
+                r'(?:mejor|récord de|record de)\s+vuelta',
+            ],
+            'laps_led_info': [
+                r'(?:cuántas|cuantas)\s+vueltas\s+(?:lideró|lidero|encabezó|encabezo|fue líder|fue lider)',
+                r'vueltas\s+(?:lideradas|en cabeza|como líder|como lider)',
+            ],
+            'pace_info': [
+                r'ritmo\s+(?:medio|promedio)',
+                r'(?:tiempo|duración|duracion)\s+(?:medio|media|promedio)\s+(?:de|por)\s+vuelta',
+            ],
             'pilot_info': [
                 r'(?:quién es|quien es|quíen es|dime (?:sobre|quién es)|información (?:sobre|de)|háblame (?:de|sobre))\s+([A-ZÁ-Ú][a-záéíóúñ]+(?:\s+[A-ZÁ-Ú][a-záéíóúñ]+)*)',
                 r'(?:qué|que) piloto.*(?:número|numero)\s+(\d+)',
@@ -60,6 +88,11 @@ class NLPProcessor:
                 r'(?:qué|que)\s+sesión.*([A-ZÁ-Ú][a-záéíóúñ]+)',
             ]
         }
+        # Compilados al iniciar: la primera pregunta no paga la compilación
+        self.compiled_patterns = {
+            query_type: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+            for query_type, patterns in self.patterns.items()
+        }
     
     def _init_synonyms(self):
         """Define diccionario de sinónimos"""
@@ -72,141 +105,38 @@ class NLPProcessor:
             'corre': ['conduce', 'pilota', 'compite', 'está', 'esta'],
         }
     
-    def _init_known_entities(self):
-        """Define entidades conocidas (pilotos, equipos, circuitos)"""
-        self.known_drivers = {
-            'max verstappen': {'name': 'Max Verstappen', 'number': 1},
-            'sergio perez': {'name': 'Sergio Pérez', 'number': 11},
-            'lewis hamilton': {'name': 'Lewis Hamilton', 'number': 44},
-            'george russell': {'name': 'George Russell', 'number': 63},
-            'charles leclerc': {'name': 'Charles Leclerc', 'number': 16},
-            'carlos sainz': {'name': 'Carlos Sainz', 'number': 55},
-            'lando norris': {'name': 'Lando Norris', 'number': 4},
-            'oscar piastri': {'name': 'Oscar Piastri', 'number': 81},
-            'fernando alonso': {'name': 'Fernando Alonso', 'number': 14},
-            'lance stroll': {'name': 'Lance Stroll', 'number': 18},
-            'pierre gasly': {'name': 'Pierre Gasly', 'number': 10},
-            'esteban ocon': {'name': 'Esteban Ocon', 'number': 31},
-            'valtteri bottas': {'name': 'Valtteri Bottas', 'number': 77},
-            'zhou guanyu': {'name': 'Zhou Guanyu', 'number': 24},
-            'kevin magnussen': {'name': 'Kevin Magnussen', 'number': 20},
-            'nico hulkenberg': {'name': 'Nico Hulkenberg', 'number': 27},
-            'yuki tsunoda': {'name': 'Yuki Tsunoda', 'number': 22},
-            'daniel ricciardo': {'name': 'Daniel Ricciardo', 'number': 3},
-            'alexander albon': {'name': 'Alexander Albon', 'number': 23},
-            'logan sargeant': {'name': 'Logan Sargeant', 'number': 2},
-        }
-        
-        self.known_teams = {
-            'red bull': 'Red Bull Racing',
-            'redbull': 'Red Bull Racing',
-            'mercedes': 'Mercedes-AMG Petronas',
-            'ferrari': 'Scuderia Ferrari',
-            'mclaren': 'McLaren Racing',
-            'aston martin': 'Aston Martin Aramco',
-            'alpine': 'Alpine F1 Team',
-            'williams': 'Williams Racing',
-            'alphatauri': 'Scuderia AlphaTauri',
-            'rb': 'RB F1 Team',
-            'alfa romeo': 'Alfa Romeo F1 Team',
-            'sauber': 'Alfa Romeo F1 Team',
-            'haas': 'Haas F1 Team',
-        }
+    def attach_network(self, network) -> None:
+        """
+        Conecta el procesador a la red semántica de la que se construye el índice de entidades
         
-        self.known_circuits = {
-            'bahrain': {'name': 'Bahrain International Circuit', 'country': 'Bahrain'},
-            'jeddah': {'name': 'Jeddah Corniche Circuit', 'country': 'Saudi Arabia'},
-            'melbourne': {'name': 'Albert Park Circuit', 'country': 'Australia'},
-            'suzuka': {'name': 'Suzuka Circuit', 'country': 'Japan'},
-            'shanghai': {'name': 'Shanghai International Circuit', 'country': 'China'},
-            'miami': {'name': 'Miami International Autodrome', 'country': 'USA'},
-            'imola': {'name': 'Autodromo Enzo e Dino Ferrari', 'country': 'Italy'},
-            'monaco': {'name': 'Circuit de Monaco', 'country': 'Monaco'},
-            'mónaco': {'name': 'Circuit de Monaco', 'country': 'Monaco'},
-            'barcelona': {'name': 'Circuit de Barcelona-Catalunya', 'country': 'Spain'},
-            'montreal': {'name': 'Circuit Gilles Villeneuve', 'country': 'Canada'},
-            'silverstone': {'name': 'Silverstone Circuit', 'country': 'United Kingdom'},
-            'austria': {'name': 'Red Bull Ring', 'country': 'Austria'},
-            'spielberg': {'name': 'Red Bull Ring', 'country': 'Austria'},
-            'paul ricard': {'name': 'Circuit Paul Ricard', 'country': 'France'},
-            'hungaroring': {'name': 'Hungaroring', 'country': 'Hungary'},
-            'spa': {'name': 'Circuit de Spa-Francorchamps', 'country': 'Belgium'},
-            'zandvoort': {'name': 'Circuit Zandvoort', 'country': 'Netherlands'},
-            'monza': {'name': 'Autodromo Nazionale di Monza', 'country': 'Italy'},
-            'singapore': {'name': 'Marina Bay Street Circuit', 'country': 'Singapore'},
-            'austin': {'name': 'Circuit of the Americas', 'country': 'USA'},
-            'mexico': {'name': 'Mexico City', 'country': 'Mexico'},
-            'méxico': {'name': 'Mexico City', 'country': 'Mexico'},
-            'mexico city': {'name': 'Mexico City', 'country': 'Mexico'},
-            'interlagos': {'name': 'Autódromo José Carlos Pace', 'country': 'Brazil'},
-            'sao paulo': {'name': 'Autódromo José Carlos Pace', 'country': 'Brazil'},
-            'las vegas': {'name': 'Las Vegas Street Circuit', 'country': 'USA'},
-            'yas marina': {'name': 'Yas Marina Circuit', 'country': 'UAE'},
-            'abu dhabi': {'name': 'Yas Marina Circuit', 'country': 'UAE'},
-        }
+        Args:
+            network: SemanticNetwork cargada
+        """
+        self.network = network
+        self.refresh_index()
     
-    def normalize_text(self, text: str) -> str:
+    def refresh_index(self) -> int:
         """
-        Normaliza texto removiendo acentos y convirtiendo a minúsculas
+        Actualiza el índice de entidades si la red cambió desde la última vez
         
-        Args:
-            text: Texto a normalizar
-            
         Returns:
-            Texto normalizado
+            Número de nodos reindexados (0 si no hay red o no cambió)
         """
-        # Convertir a minúsculas
-        text = text.lower()
-        
-        # Remover acentos (pero mantener ñ)
-        text_unaccented = unidecode(text)
-        
-        # Restaurar ñ si fue eliminada
-        text_unaccented = text_unaccented.replace('n~', 'ñ')
-        
-        # Remover puntuación innecesaria pero mantener espacios
-        text_clean = re.sub(r'[^\w\s]', ' ', text_unaccented)
-        
-        # Normalizar espacios múltiples
-        text_clean = re.sub(r'\s+', ' ', text_clean).strip()
-        
-        return text_clean
+        if self.network is None:
+            return 0
+        return self.entity_index.refresh(self.network)
     
-    def fuzzy_match(self, text: str, candidates: Dict[str, Any], threshold: float = 0.75) -> Optional[str]:
+    def normalize_text(self, text: str) -> str:
         """
-        Realiza búsqueda fuzzy (aproximada) para encontrar la mejor coincidencia
+        Normaliza texto removiendo acentos y convirtiendo a minúsculas
         
         Args:
-            text: Texto a buscar
-            candidates: Diccionario de candidatos {clave: valor}
-            threshold: Umbral de similitud (0.0 a 1.0)
+            text: Texto a normalizar
             
         Returns:
-            Clave del mejor candidato o None si no hay coincidencias suficientes
+            Texto normalizado
         """
-        best_match = None
-        best_score = threshold
-        
-        text_normalized = self.normalize_text(text)
-        
-        for key in candidates.keys():
-            key_normalized = self.normalize_text(key)
-            
-            # Calcular similitud usando SequenceMatcher
-            similarity = SequenceMatcher(None, text_normalized, key_normalized).ratio()
-            
-            # También buscar si el texto está contenido en la clave
-            if text_normalized in key_normalized or key_normalized in text_normalized:
-                similarity = max(similarity, 0.85)
-            
-            if similarity > best_score:
-                best_score = similarity
-                best_match = key
-        
-        if best_match:
-            logger.debug(f"Fuzzy match: '{text}' -> '{best_match}' (score: {best_score:.2f})")
-        
-        return best_match
+        return normalize_text(text)
     
     def extract_query_type(self, question: str) -> str:
         """
@@ -221,9 +151,9 @@ class NLPProcessor:
         question_lower = question.lower()
         
         # Probar cada patrón
-        for query_type, patterns in self.patterns.items():
+        for query_type, patterns in self.compiled_patterns.items():
             for pattern in patterns:
-                if re.search(pattern, question, re.IGNORECASE):
+                if pattern.search(question):
                     logger.debug(f"Tipo de consulta detectado: {query_type}")
                     return query_type
         
@@ -231,17 +161,23 @@ class NLPProcessor:
         logger.debug("No se detectó tipo de consulta específico, usando 'general'")
         return 'general'
     
-    def extract_entities(self, question: str) -> Dict[str, List[str]]:
+    def extract_entities(self, question: str) -> Dict[str, List[Any]]:
         """
         Extrae entidades nombradas de la pregunta
         
+        Los pilotos, equipos y circuitos se devuelven ya resueltos a su nodo
+        de la red, de modo que las consultas acceden directamente por id.
+        
         Args:
             question: Pregunta del usuario
             
         Returns:
-            Diccionario con entidades encontradas por tipo
+            Diccionario con entidades encontradas por tipo. drivers, teams y
+            circuits contienen dicts con 'id' (nodo), 'name' (nombre del
+            nodo), 'text', 'start' y 'end' (fragmento de la pregunta) y
+            'score'; years y numbers, las cadenas encontradas
         """
-        entities: Dict[str, List[str]] = {
+        entities: Dict[str, List[Any]] = {
             'drivers': [],
             'teams': [],
             'circuits': [],
@@ -249,66 +185,17 @@ class NLPProcessor:
             'numbers': []
         }
         
-        question_normalized = self.normalize_text(question)
-        
-        # Buscar pilotos con coincidencia exacta primero
-        found_drivers = False
-        for driver_key, driver_info in self.known_drivers.items():
-            if driver_key in question_normalized:
-                entities['drivers'].append(driver_info['name'])
-                found_drivers = True
-        
-        # Si no se encontró con coincidencia exacta, intentar fuzzy matching
-        if not found_drivers:
-            # Extraer nombres propios (palabras que empiezan con mayúscula)
-            potential_names = re.findall(r'\b([A-ZÁ-Ú][a-záéíóúñ]+(?:\s+[A-ZÁ-Ú][a-záéíóúñ]+)*)\b', question)
-            for name in potential_names:
-                matched_key = self.fuzzy_match(name, self.known_drivers, threshold=0.70)
-                if matched_key and self.known_drivers[matched_key]['name'] not in entities['drivers']:
-                    entities['drivers'].append(self.known_drivers[matched_key]['name'])
-                    logger.info(f"Fuzzy match encontrado para piloto: '{name}' -> '{self.known_drivers[matched_key]['name']}'")
-        
-        # Buscar equipos con coincidencia exacta primero
-        found_teams = False
-        for team_key, team_name in self.known_teams.items():
-            if team_key in question_normalized:
-                entities['teams'].append(team_name)
-                found_teams = True
-        
-        # Si no se encontró con coincidencia exacta, intentar fuzzy matching para equipos
-        if not found_teams:
-            potential_teams = re.findall(r'\b([A-ZÁ-Ú][a-záéíóúñ]+(?:\s+[A-ZÁ-Ú][a-záéíóúñ]+)?)\b', question)
-            for team in potential_teams:
-                # Evitar palabras muy cortas (menos de 4 caracteres) que suelen ser falsos positivos
-                if len(team) < 4:
-                    continue
-                matched_key = self.fuzzy_match(team, self.known_teams, threshold=0.75)
-                if matched_key and self.known_teams[matched_key] not in entities['teams']:
-                    entities['teams'].append(self.known_teams[matched_key])
-                    logger.info(f"Fuzzy match encontrado para equipo: '{team}' -> '{self.known_teams[matched_key]}'")
-        
-        # Buscar circuitos con coincidencia exacta primero
-        found_circuits = False
-        for circuit_key, circuit_info in self.known_circuits.items():
-            if circuit_key in question_normalized:
-                entities['circuits'].append(circuit_info['name'])
-                found_circuits = True
-        
-        # Si no se encontró con coincidencia exacta, intentar fuzzy matching para circuitos
-        if not found_circuits:
-            potential_circuits = re.findall(r'\b([A-ZÁ-Ú][a-záéíóúñ]+)\b', question)
-            for circuit in potential_circuits:
-                matched_key = self.fuzzy_match(circuit, self.known_circuits, threshold=0.75)
-                if matched_key and self.known_circuits[matched_key]['name'] not in entities['circuits']:
-                    entities['circuits'].append(self.known_circuits[matched_key]['name'])
-                    logger.info(f"Fuzzy match encontrado para circuito: '{circuit}' -> '{self.known_circuits[matched_key]['name']}'")
+        # Pilotos, equipos y circuitos: índice de la red (exacto, alias y fuzzy)
+        self.refresh_index()
+        for match in self.entity_index.resolve(question):
+            entities[match.category].append(match.as_dict())
         
         # Buscar años (formato 20XX)
-        years = re.findall(r'\b(20\d{2})\b', question)
+        years = _YEAR_RE.findall(question)
         entities['years'] = years
         
         # Buscar números (posibles números de piloto)
-        numbers = re.findall(r'\b(\d{1,2})\b', question)
+        numbers = _NUMBER_RE.findall(question)
         entities['numbers'] = numbers
         
         logger.debug(f"Entidades extraídas: {entities}")
@@ -326,7 +213,28 @@ class NLPProcessor:
         """
         query_type = self.extract_query_type(question)
         entities = self.extract_entities(question)
+        return self.build_intent(question, query_type, entities)
+    
+    def build_intent(
+        self,
+        question: str,
+        query_type: str,
+        entities: Dict[str, List[str]]
+    ) -> Dict[str, Any]:
+        """
+        Construye la intención a partir del tipo de consulta y las entidades
+        
+        Permite ejecutar por separado (y medir) la clasificación y la
+        extracción de entidades.
         
+        Args:
+            question: Pregunta del usuario
+            query_type: Tipo de consulta detectado
+            entities: Entidades extraídas
+            
+        Returns:
+            Diccionario con tipo, entidades, filtros y acción
+        """
         # Determinar acción según el tipo de consulta
         action_map = {
             'pilot_info': 'get_pilot_details',
@@ -335,6 +243,9 @@ class NLPProcessor:
             'motor_info': 'get_team_engine',
             'circuit_info': 'get_circuit_location',
             'session_info': 'get_session_details',
+            'fastest_lap_info': 'get_fastest_lap',
+            'laps_led_info': 'get_laps_led',
+            'pace_info': 'get_average_pace',
             'general': 'general_search'
         }
         
@@ -0,0 +1,334 @@
+"""
+Grabación y reproducción del tráfico con OpenF1
+
+CaptureTransport envuelve el transporte httpx del cliente y añade cada
+intercambio (endpoint, parámetros, estado, cuerpo y tiempos) a un log JSON
+Lines de solo anexado. ReplayTransport sirve esas respuestas desde el log
+con los tiempos originales o escalados, de modo que una carga de la base de
+conocimiento o una ráfaga de preguntas se puede repetir sin red y de forma
+determinista.
+
+Formato del log (una línea JSON por registro; ``.gz`` para comprimirlo):
+    {"type": "session", "started_at": 1718000000.0, "format": 1}
+    {"type": "exchange", "t": 0.12, "endpoint": "sessions", "params": [["year", "2024"]],
+     "status": 200, "headers": {...}, "ttfb_ms": 85.1, "latency_ms": 132.4, "body": "[...]"}
+"""
+import asyncio
+import base64
+import gzip
+import json
+import logging
+import os
+import time
+import zlib
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CAPTURE_FORMAT = 1
+
+# Cabeceras de respuesta que se conservan en el log. El cuerpo se graba tal
+# como llega (comprimido si el servidor usa gzip), así que content-encoding
+# es necesaria para reproducirlo
+KEPT_HEADERS = ('content-type', 'content-encoding', 'retry-after')
+
+REPLAY_CHUNK_SIZE = 65536
+
+
+def _endpoint(request: httpx.Request) -> str:
+    """Último segmento de la ruta (el endpoint de OpenF1)"""
+    return request.url.path.rstrip('/').rsplit('/', 1)[-1]
+
+
+def _params(request: httpx.Request) -> List[List[str]]:
+    """Parámetros de consulta en orden canónico"""
+    return sorted([key, value] for key, value in request.url.params.multi_items())
+
+
+def exchange_key(endpoint: str, params: List[List[str]]) -> str:
+    """Clave de un intercambio (independiente del host)"""
+    return f"{endpoint}?{urlencode(sorted(tuple(pair) for pair in params))}"
+
+
+class CaptureLog:
+    """Fichero de log de solo anexado"""
+
+    def __init__(self, path: str):
+        """
+        Abre el log para anexar registros
+
+        Args:
+            path: Ruta del fichero (comprimido con gzip si termina en .gz)
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._compressed = path.endswith('.gz')
+        self._file = gzip.open(path, 'ab') if self._compressed else open(path, 'ab')
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self.records = 0
+        self.write({'type': 'session', 'started_at': self.started_at, 'format': CAPTURE_FORMAT})
+        logger.info(f"Grabando tráfico de OpenF1 en {path}")
+
+    def elapsed(self) -> float:
+        """Segundos desde el inicio de la sesión de grabación"""
+        return time.perf_counter() - self._origin
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Anexa un registro y lo vuelca a disco"""
+        if self._file is None:
+            return
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+        self._file.write(line.encode('utf-8'))
+        if self._compressed:
+            self._file.flush(zlib.Z_SYNC_FLUSH)
+        else:
+            self._file.flush()
+        if record.get('type') == 'exchange':
+            self.records += 1
+
+    def close(self) -> None:
+        """Cierra el fichero"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            logger.info(f"Grabación cerrada: {self.records} intercambios en {self.path}")
+
+
+class _CapturingStream(httpx.AsyncByteStream):
+    """Cuerpo de respuesta que se entrega tal cual y a la vez se graba"""
+
+    def __init__(self, inner: httpx.AsyncByteStream, on_done):
+        self._inner = inner
+        self._on_done = on_done
+        self._chunks: List[bytes] = []
+        self._finished = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._inner:
+                self._chunks.append(chunk)
+                yield chunk
+        except httpx.HTTPError as e:
+            self._finish(error=str(e))
+            raise
+        self._finish()
+
+    def _finish(self, error: Optional[str] = None, incomplete: bool = False) -> None:
+        if not self._finished:
+            self._finished = True
+            self._on_done(b''.join(self._chunks), error, incomplete)
+
+    async def aclose(self) -> None:
+        # Si el cliente no consumió todo el cuerpo se graba lo recibido
+        self._finish(incomplete=True)
+        await self._inner.aclose()
+
+
+class CaptureTransport(httpx.AsyncBaseTransport):
+    """Transporte que graba cada intercambio con OpenF1 en un CaptureLog"""
+
+    def __init__(self, path: str, inner: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Inicializa el transporte de grabación
+
+        Args:
+            path: Ruta del log
+            inner: Transporte real (por defecto, HTTP)
+        """
+        self.log = CaptureLog(path)
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        record: Dict[str, Any] = {
+            'type': 'exchange',
+            't': round(self.log.elapsed(), 6),
+            'method': request.method,
+            'endpoint': _endpoint(request),
+            'params': _params(request),
+        }
+        start = time.perf_counter()
+
+        try:
+            response = await self.inner.handle_async_request(request)
+        except httpx.HTTPError as e:
+            record.update({'error': f"{type(e).__name__}: {e}", 'latency_ms': _ms_since(start)})
+            self.log.write(record)
+            raise
+
+        record['status'] = response.status_code
+        record['headers'] = {
+            name: response.headers[name] for name in KEPT_HEADERS if name in response.headers
+        }
+        record['ttfb_ms'] = _ms_since(start)
+
+        def on_done(body: bytes, error: Optional[str], incomplete: bool) -> None:
+            record['latency_ms'] = _ms_since(start)
+            try:
+                record['body'] = body.decode('utf-8')
+            except UnicodeDecodeError:
+                record['body_b64'] = base64.b64encode(body).decode('ascii')
+            if error:
+                record['error'] = error
+            if incomplete:
+                record['incomplete'] = True
+            self.log.write(record)
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_CapturingStream(response.stream, on_done),
+            extensions=response.extensions,
+            request=request
+        )
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+        self.log.close()
+
+
+def _ms_since(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+def read_capture(path: str) -> List[Dict[str, Any]]:
+    """
+    Lee los intercambios de un log de grabación
+
+    Args:
+        path: Ruta del log
+
+    Returns:
+        Lista de registros 'exchange' en orden de grabación
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    exchanges = []
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Última línea cortada si la grabación se interrumpió
+                logger.warning(f"Línea {number} inválida en {path}, se ignora")
+                continue
+            if record.get('type') == 'exchange':
+                exchanges.append(record)
+    return exchanges
+
+
+class _ReplayStream(httpx.AsyncByteStream):
+    """Cuerpo reproducido en fragmentos repartiendo el tiempo de descarga"""
+
+    def __init__(self, body: bytes, transfer_seconds: float, fail: Optional[str]):
+        self._body = body
+        self._transfer = transfer_seconds
+        self._fail = fail
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        chunks = max(1, -(-len(self._body) // REPLAY_CHUNK_SIZE))
+        pause = self._transfer / chunks
+        for offset in range(0, len(self._body), REPLAY_CHUNK_SIZE):
+            if pause > 0:
+                await asyncio.sleep(pause)
+            yield self._body[offset:offset + REPLAY_CHUNK_SIZE]
+        if self._fail:
+            raise httpx.ReadError(self._fail)
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Transporte que responde desde un log de grabación
+
+    Las peticiones se emparejan por endpoint y parámetros (sin el host).
+    Peticiones repetidas reciben los intercambios grabados en orden (p. ej.
+    un 429 y luego un 200); agotados, se repite el último. Una petición no
+    grabada recibe un 404, como una consulta sin resultados en OpenF1.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        """
+        Carga el log
+
+        Args:
+            path: Ruta del log de grabación
+            speed: Factor de velocidad (1 = tiempos originales, 2 = el doble
+                de rápido, 0 = sin esperas)
+        """
+        self.path = path
+        self.speed = speed
+        self._exchanges: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._cursor: Dict[str, int] = defaultdict(int)
+        self.misses = 0
+
+        exchanges = read_capture(path)
+        for record in exchanges:
+            self._exchanges[exchange_key(record['endpoint'], record['params'])].append(record)
+        logger.info(f"Reproduciendo {len(exchanges)} intercambios de {path} (velocidad {speed}x)")
+
+    def _scaled(self, milliseconds: Optional[float]) -> float:
+        if not self.speed or not milliseconds:
+            return 0.0
+        return milliseconds / 1000.0 / self.speed
+
+    def _next(self, key: str) -> Optional[Dict[str, Any]]:
+        records = self._exchanges.get(key)
+        if not records:
+            return None
+        index = min(self._cursor[key], len(records) - 1)
+        self._cursor[key] += 1
+        return records[index]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = exchange_key(_endpoint(request), _params(request))
+        record = self._next(key)
+
+        if record is None:
+            self.misses += 1
+            logger.warning(f"Petición no grabada: {key}")
+            return httpx.Response(404, json={'detail': 'No results found.'}, request=request)
+
+        if 'status' not in record:
+            # Error de conexión grabado
+            await asyncio.sleep(self._scaled(record.get('latency_ms')))
+            raise httpx.ConnectError(record.get('error', 'Error de conexión grabado'), request=request)
+
+        ttfb = self._scaled(record.get('ttfb_ms'))
+        transfer = max(0.0, self._scaled(record.get('latency_ms')) - ttfb)
+        await asyncio.sleep(ttfb)
+
+        if 'body_b64' in record:
+            body = base64.b64decode(record['body_b64'])
+        else:
+            body = record.get('body', '').encode('utf-8')
+
+        return httpx.Response(
+            status_code=record['status'],
+            headers=record.get('headers', {}),
+            stream=_ReplayStream(body, transfer, record.get('error')),
+            request=request
+        )
+
+
+def transport_from_settings(settings) -> Tuple[Optional[httpx.AsyncBaseTransport], Optional[str]]:
+    """
+    Transporte de OpenF1 según la configuración de grabación/reproducción
+
+    Args:
+        settings: Configuración de la aplicación
+
+    Returns:
+        Tupla (transporte o None para HTTP normal, modo 'capture'/'replay'/None)
+    """
+    if settings.openf1_replay_path:
+        return ReplayTransport(settings.openf1_replay_path, settings.openf1_replay_speed), 'replay'
+    if settings.openf1_capture_path:
+        return CaptureTransport(settings.openf1_capture_path), 'capture'
+    return None, None
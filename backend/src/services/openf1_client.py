@@ -1,28 +1,177 @@
 """
 Cliente para la API de OpenF1
 """
+import asyncio
 import httpx
 import logging
-from typing import List, Dict, Optional, Any
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, List, Dict, Optional, Any
+
+from ..core.metrics import OPENF1_REQUESTS_TOTAL, OPENF1_REQUEST_SECONDS, add_stage_time
+from ..utils.json_stream import JSONArrayStreamParser, JSONStreamError
+from .resilience import CircuitBreaker, TokenBucket, compute_backoff, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
 
+RESULT_OK = "ok"
+RESULT_EMPTY = "empty"
+RESULT_ERROR = "error"
+RESULT_PARTIAL = "partial"  # Stream que el consumidor dejó de leer antes del final
+
+# Códigos HTTP que justifican un reintento
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class OpenF1Result(list):
+    """
+    Resultado tipado de una petición a OpenF1
+
+    Se comporta como la lista de elementos devuelta por la API, de modo que
+    el código existente sigue funcionando, pero además permite distinguir
+    una respuesta vacía de una petición fallida.
+    """
+
+    def __init__(
+        self,
+        data: Optional[List[Dict[str, Any]]] = None,
+        status: str = RESULT_OK,
+        status_code: Optional[int] = None,
+        error: Optional[str] = None,
+        stale: bool = False,
+        attempts: int = 0
+    ):
+        super().__init__(data or [])
+        if status == RESULT_OK and not data:
+            status = RESULT_EMPTY
+        self.status = status
+        self.status_code = status_code
+        self.error = error
+        self.stale = stale
+        self.attempts = attempts
+
+    @property
+    def ok(self) -> bool:
+        """True si la API respondió correctamente (aunque sin datos)"""
+        return self.status != RESULT_ERROR
+
+    @property
+    def empty(self) -> bool:
+        """True si la API respondió correctamente sin datos"""
+        return self.status == RESULT_EMPTY
+
+    @property
+    def failed(self) -> bool:
+        """True si la petición falló y no hay datos fiables"""
+        return self.status == RESULT_ERROR
+
+    def __repr__(self) -> str:
+        return (
+            f"OpenF1Result(status={self.status!r}, items={len(self)}, "
+            f"status_code={self.status_code}, stale={self.stale})"
+        )
+
+
+class OpenF1Stream:
+    """
+    Iterador asíncrono sobre las filas de un endpoint de OpenF1
+
+    Las filas se producen a medida que se parsean los bytes de la respuesta.
+    Al terminar la iteración, status/error indican si el stream se completó,
+    vino vacío, falló (posiblemente tras producir algunas filas) o el
+    consumidor dejó de leerlo antes del final (partial).
+    """
+
+    def __init__(self, client: "OpenF1Client", endpoint: str, params: Optional[Dict[str, Any]]):
+        self._client = client
+        self.endpoint = endpoint
+        self.params = params
+        self.status = RESULT_EMPTY
+        self.status_code: Optional[int] = None
+        self.error: Optional[str] = None
+        self.rows = 0
+        self.attempts = 0
+
+    @property
+    def ok(self) -> bool:
+        """True si el stream se completó correctamente (aunque sin filas)"""
+        return self.status != RESULT_ERROR
+
+    @property
+    def empty(self) -> bool:
+        """True si el stream se completó sin filas"""
+        return self.status == RESULT_EMPTY
+
+    @property
+    def partial(self) -> bool:
+        """True si el consumidor dejó de leer el stream tras recibir filas"""
+        return self.status == RESULT_PARTIAL
+
+    @property
+    def failed(self) -> bool:
+        """True si el stream falló"""
+        return self.status == RESULT_ERROR
+
+    def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        return self._client._iter_rows(self)
+
+    def __repr__(self) -> str:
+        return (
+            f"OpenF1Stream(endpoint={self.endpoint!r}, status={self.status!r}, "
+            f"rows={self.rows}, status_code={self.status_code})"
+        )
+
+
 class OpenF1Client:
     """Cliente asíncrono para interactuar con la API de OpenF1"""
     
-    def __init__(self, base_url: str, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        rate_limit: float = 3.0,
+        rate_burst: int = 3,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        circuit_threshold: int = 5,
+        circuit_reset: float = 30.0,
+        stale_cache_size: int = 256,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
         """
         Inicializa el cliente de OpenF1
         
         Args:
             base_url: URL base de la API de OpenF1
             api_key: API key opcional para autenticación
+            rate_limit: Peticiones por segundo permitidas (0 desactiva el límite)
+            rate_burst: Ráfaga máxima de peticiones
+            max_retries: Reintentos ante 429, 5xx o errores de conexión
+            backoff_base: Espera base del backoff exponencial (segundos)
+            backoff_max: Espera máxima entre reintentos (segundos)
+            circuit_threshold: Fallos consecutivos que abren el circuit breaker
+            circuit_reset: Segundos que el circuito permanece abierto
+            stale_cache_size: Respuestas exitosas guardadas para servir con el circuito abierto
+            transport: Transporte httpx alternativo (fixtures, grabación o reproducción)
         """
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
         self.client: Optional[httpx.AsyncClient] = None
         self.timeout = httpx.Timeout(30.0, connect=10.0)
+        self.transport = transport
+        
+        # Limitador compartido por todas las llamadas de este cliente
+        self.rate_limiter = TokenBucket(rate_limit, rate_burst)
+        self.circuit_breaker = CircuitBreaker(circuit_threshold, circuit_reset)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        
+        # Última respuesta exitosa por petición (nunca se guardan fallos)
+        self.stale_cache: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self.stale_cache_size = stale_cache_size
         
         if api_key:
             logger.info(f"OpenF1Client inicializado con autenticación")
@@ -30,9 +179,50 @@ class OpenF1Client:
             logger.warning(f"OpenF1Client inicializado SIN autenticación - puede fallar durante sesiones en vivo")
         logger.info(f"Base URL: {self.base_url}")
     
+    @classmethod
+    def from_settings(
+        cls,
+        settings,
+        base_url: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ) -> "OpenF1Client":
+        """
+        Crea un cliente con la configuración de la aplicación
+        
+        Si la configuración indica un log de grabación o de reproducción
+        (OPENF1_CAPTURE_PATH / OPENF1_REPLAY_PATH) se usa el transporte
+        correspondiente.
+        
+        Args:
+            settings: Configuración de la aplicación
+            base_url: URL base alternativa (por defecto, openf1_base_url)
+            transport: Transporte httpx explícito (tiene prioridad)
+            
+        Returns:
+            Instancia de OpenF1Client
+        """
+        if transport is None:
+            from .openf1_capture import transport_from_settings
+            transport, mode = transport_from_settings(settings)
+            if mode:
+                logger.info(f"OpenF1Client en modo {mode}")
+        
+        return cls(
+            base_url=base_url or settings.openf1_base_url,
+            api_key=settings.openf1_api_key or None,
+            rate_limit=settings.openf1_rate_limit,
+            rate_burst=settings.openf1_rate_burst,
+            max_retries=settings.openf1_max_retries,
+            backoff_base=settings.openf1_backoff_base,
+            backoff_max=settings.openf1_backoff_max,
+            circuit_threshold=settings.openf1_circuit_threshold,
+            circuit_reset=settings.openf1_circuit_reset,
+            transport=transport
+        )
+    
     async def __aenter__(self):
         """Context manager entry"""
-        self.client = httpx.AsyncClient(timeout=self.timeout)
+        await self._ensure_client()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -42,62 +232,357 @@ class OpenF1Client:
     async def _ensure_client(self):
         """Asegura que el cliente esté inicializado"""
         if self.client is None:
-            self.client = httpx.AsyncClient(timeout=self.timeout)
+            self.client = httpx.AsyncClient(timeout=self.timeout, transport=self.transport)
     
-    async def _make_request(
+    def _cache_key(self, endpoint: str, params: Optional[Dict[str, Any]]) -> str:
+        """Genera la clave de caché de una petición"""
+        items = sorted((params or {}).items())
+        return f"{endpoint}?" + "&".join(f"{k}={v}" for k, v in items)
+    
+    def _remember(self, key: str, data: List[Dict[str, Any]]) -> None:
+        """Guarda una respuesta exitosa para servirla si el servicio cae"""
+        self.stale_cache[key] = data
+        self.stale_cache.move_to_end(key)
+        while len(self.stale_cache) > self.stale_cache_size:
+            self.stale_cache.popitem(last=False)
+    
+    def _fallback(
+        self,
+        key: str,
+        error: str,
+        status_code: Optional[int] = None,
+        attempts: int = 0
+    ) -> OpenF1Result:
+        """Sirve la última respuesta exitosa conocida o un resultado fallido"""
+        cached = self.stale_cache.get(key)
+        if cached is not None:
+            logger.warning(f"Sirviendo datos en caché para {key}: {error}")
+            return OpenF1Result(
+                cached,
+                status=RESULT_OK,
+                status_code=status_code,
+                error=error,
+                stale=True,
+                attempts=attempts
+            )
+        return OpenF1Result(
+            status=RESULT_ERROR,
+            status_code=status_code,
+            error=error,
+            attempts=attempts
+        )
+    
+    def _parse_payload(self, endpoint: str, data: Any) -> List[Dict[str, Any]]:
+        """Convierte el cuerpo JSON de la respuesta en una lista de elementos"""
+        if isinstance(data, list):
+            logger.info(f"Obtenidos {len(data)} elementos desde {endpoint}")
+            return data
+        elif isinstance(data, dict):
+            return [data]
+        else:
+            logger.warning(f"Respuesta inesperada de tipo {type(data)}")
+            return []
+    
+    async def fetch(
         self, 
         endpoint: str, 
         params: Optional[Dict[str, Any]] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> OpenF1Result:
         """
-        Realiza una petición HTTP a la API
+        Realiza una petición HTTP a la API con limitación de tasa, reintentos
+        y circuit breaker
         
         Args:
             endpoint: Endpoint de la API (sin barra inicial)
             params: Parámetros de consulta opcionales
             
         Returns:
-            Lista de diccionarios con los datos de respuesta
+            OpenF1Result con los datos y el estado de la petición
         """
+        start = time.perf_counter()
+        try:
+            return await self._fetch(endpoint, params)
+        finally:
+            add_stage_time('openf1', time.perf_counter() - start)
+    
+    async def _fetch(
+        self, 
+        endpoint: str, 
+        params: Optional[Dict[str, Any]] = None
+    ) -> OpenF1Result:
+        """Implementación de fetch (sin la medición de la etapa)"""
         await self._ensure_client()
         
         url = f"{self.base_url}/{endpoint}"
+        key = self._cache_key(endpoint, params)
         
         # Preparar headers con API key si está disponible
         headers = {}
         if self.api_key:
             headers['Authorization'] = f'Bearer {self.api_key}'
         
+        if not self.circuit_breaker.allow_request():
+            OPENF1_REQUESTS_TOTAL.inc(endpoint=endpoint, status='circuit_open')
+            return self._fallback(key, "Circuit breaker abierto: OpenF1 no disponible")
+        
+        trial = self.circuit_breaker.state == CircuitBreaker.HALF_OPEN
         try:
-            logger.debug(f"Realizando petición GET a: {url} con params: {params}")
-            response = await self.client.get(url, params=params, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            
-            if isinstance(data, list):
-                logger.info(f"Obtenidos {len(data)} elementos desde {endpoint}")
-                return data
-            elif isinstance(data, dict):
-                return [data]
-            else:
-                logger.warning(f"Respuesta inesperada de tipo {type(data)}")
-                return []
+            return await self._fetch_attempts(endpoint, params, url, key, headers)
+        finally:
+            if trial:
+                self.circuit_breaker.release()
+    
+    async def _fetch_attempts(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        url: str,
+        key: str,
+        headers: Dict[str, str]
+    ) -> OpenF1Result:
+        """Intentos de fetch con reintentos, una vez admitida por el circuit breaker"""
+        error = ""
+        status_code = None
+        attempt = 0
+        
+        while True:
+            attempt += 1
+            retry_after = None
+            await self.rate_limiter.acquire()
+            
+            try:
+                logger.debug(f"Realizando petición GET a: {url} con params: {params}")
+                sent_at = time.perf_counter()
+                response = await self.client.get(url, params=params, headers=headers)
+                status_code = response.status_code
+                OPENF1_REQUEST_SECONDS.observe(time.perf_counter() - sent_at, endpoint=endpoint)
+                OPENF1_REQUESTS_TOTAL.inc(endpoint=endpoint, status=str(status_code))
                 
-        except httpx.HTTPStatusError as e:
-            logger.error(f"Error HTTP {e.response.status_code} en {url}: {e}")
-            return []
-        except httpx.RequestError as e:
-            logger.error(f"Error de conexión en {url}: {e}")
-            return []
-        except Exception as e:
-            logger.error(f"Error inesperado en petición a {url}: {e}")
-            return []
+                if status_code == 404:
+                    # OpenF1 responde 404 cuando la consulta no tiene resultados
+                    self.circuit_breaker.record_success()
+                    self._remember(key, [])
+                    return OpenF1Result(status=RESULT_EMPTY, status_code=404, attempts=attempt)
+                
+                if status_code in RETRYABLE_STATUS:
+                    error = f"Error HTTP {status_code}"
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if status_code == 429:
+                        # Frenar a todas las llamadas, no solo a esta
+                        self.rate_limiter.pause(retry_after if retry_after is not None else self.backoff_base)
+                else:
+                    response.raise_for_status()
+                    data = self._parse_payload(endpoint, response.json())
+                    self.circuit_breaker.record_success()
+                    self._remember(key, data)
+                    return OpenF1Result(data, status_code=status_code, attempts=attempt)
+                    
+            except httpx.HTTPStatusError as e:
+                # Errores 4xx no reintentables
+                logger.error(f"Error HTTP {e.response.status_code} en {url}: {e}")
+                return OpenF1Result(
+                    status=RESULT_ERROR,
+                    status_code=e.response.status_code,
+                    error=f"Error HTTP {e.response.status_code}",
+                    attempts=attempt
+                )
+            except httpx.RequestError as e:
+                OPENF1_REQUESTS_TOTAL.inc(endpoint=endpoint, status='connection_error')
+                error = f"Error de conexión: {e}"
+                status_code = None
+            except ValueError as e:
+                logger.error(f"Respuesta JSON inválida en {url}: {e}")
+                return OpenF1Result(
+                    status=RESULT_ERROR,
+                    status_code=status_code,
+                    error=f"Respuesta inválida: {e}",
+                    attempts=attempt
+                )
+            
+            if attempt > self.max_retries:
+                break
+            
+            delay = compute_backoff(attempt - 1, self.backoff_base, self.backoff_max)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            logger.warning(f"{error} en {url}, reintento {attempt}/{self.max_retries} en {delay:.2f}s")
+            await asyncio.sleep(delay)
+        
+        logger.error(f"{error} en {url} tras {attempt} intentos")
+        self.circuit_breaker.record_failure()
+        return self._fallback(key, error, status_code, attempt)
+    
+    def stream(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> OpenF1Stream:
+        """
+        Abre un endpoint en modo streaming
+        
+        Las filas se parsean incrementalmente desde los bytes de la respuesta,
+        con memoria constante respecto al tamaño del array. Pensado para
+        endpoints grandes como laps, position o car_data.
+        
+        Args:
+            endpoint: Endpoint de la API (sin barra inicial)
+            params: Parámetros de consulta opcionales
+            
+        Returns:
+            OpenF1Stream iterable con ``async for``
+        """
+        return OpenF1Stream(self, endpoint, params)
+    
+    async def _iter_rows(self, stream: OpenF1Stream) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generador asíncrono que alimenta un OpenF1Stream
+        
+        Se reintenta (con backoff y respetando Retry-After) solo mientras no
+        se haya producido ninguna fila; un corte a mitad de stream se reporta
+        como fallo.
+        
+        Args:
+            stream: Stream a alimentar con filas y estado
+        """
+        # Solo cuenta como etapa 'openf1' el tiempo dentro del generador
+        # (red y parseo), no el que el consumidor dedica a cada fila
+        rows = self._stream_rows(stream)
+        elapsed = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    row = await rows.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    elapsed += time.perf_counter() - start
+                yield row
+        finally:
+            add_stage_time('openf1', elapsed)
+            await rows.aclose()
+    
+    async def _stream_rows(self, stream: OpenF1Stream) -> AsyncIterator[Dict[str, Any]]:
+        """Implementación de _iter_rows (sin la medición de la etapa)"""
+        await self._ensure_client()
+        
+        url = f"{self.base_url}/{stream.endpoint}"
+        headers = {}
+        if self.api_key:
+            headers['Authorization'] = f'Bearer {self.api_key}'
+        
+        if not self.circuit_breaker.allow_request():
+            OPENF1_REQUESTS_TOTAL.inc(endpoint=stream.endpoint, status='circuit_open')
+            stream.status = RESULT_ERROR
+            stream.error = "Circuit breaker abierto: OpenF1 no disponible"
+            return
+        
+        trial = self.circuit_breaker.state == CircuitBreaker.HALF_OPEN
+        try:
+            while True:
+                stream.attempts += 1
+                stream.status_code = None
+                retry_after = None
+                await self.rate_limiter.acquire()
+
+                try:
+                    logger.debug(f"Abriendo stream GET a: {url} con params: {stream.params}")
+                    sent_at = time.perf_counter()
+                    async with self.client.stream('GET', url, params=stream.params, headers=headers) as response:
+                        stream.status_code = response.status_code
+                        OPENF1_REQUEST_SECONDS.observe(time.perf_counter() - sent_at, endpoint=stream.endpoint)
+                        OPENF1_REQUESTS_TOTAL.inc(endpoint=stream.endpoint, status=str(response.status_code))
+
+                        if response.status_code == 404:
+                            # Sin resultados para la consulta
+                            self.circuit_breaker.record_success()
+                            stream.status = RESULT_EMPTY
+                            return
+
+                        if response.status_code in RETRYABLE_STATUS:
+                            stream.error = f"Error HTTP {response.status_code}"
+                            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                            if response.status_code == 429:
+                                self.rate_limiter.pause(retry_after if retry_after is not None else self.backoff_base)
+                        elif response.is_error:
+                            logger.error(f"Error HTTP {response.status_code} en {url}")
+                            stream.status = RESULT_ERROR
+                            stream.error = f"Error HTTP {response.status_code}"
+                            return
+                        else:
+                            parser = JSONArrayStreamParser()
+                            async for chunk in response.aiter_bytes():
+                                for row in parser.feed(chunk):
+                                    if isinstance(row, dict):
+                                        stream.rows += 1
+                                        yield row
+                            for row in parser.close():
+                                if isinstance(row, dict):
+                                    stream.rows += 1
+                                    yield row
+
+                            self.circuit_breaker.record_success()
+                            stream.status = RESULT_OK if stream.rows else RESULT_EMPTY
+                            logger.info(f"Stream de {stream.endpoint} completado: {stream.rows} elementos")
+                            return
+
+                except JSONStreamError as e:
+                    logger.error(f"Respuesta JSON inválida en stream {url}: {e}")
+                    stream.status = RESULT_ERROR
+                    stream.error = f"Respuesta inválida: {e}"
+                    return
+                except httpx.RequestError as e:
+                    if stream.status_code is None:
+                        OPENF1_REQUESTS_TOTAL.inc(endpoint=stream.endpoint, status='connection_error')
+                    stream.error = f"Error de conexión: {e}"
+                    if stream.rows:
+                        # No se puede reintentar sin duplicar filas ya entregadas
+                        logger.error(f"Stream {url} interrumpido tras {stream.rows} elementos: {e}")
+                        self.circuit_breaker.record_failure()
+                        stream.status = RESULT_ERROR
+                        return
+
+                if stream.attempts > self.max_retries:
+                    break
+
+                delay = compute_backoff(stream.attempts - 1, self.backoff_base, self.backoff_max)
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+                logger.warning(f"{stream.error} en {url}, reintento {stream.attempts}/{self.max_retries} en {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+            logger.error(f"{stream.error} en {url} tras {stream.attempts} intentos")
+            self.circuit_breaker.record_failure()
+            stream.status = RESULT_ERROR
+        finally:
+            if stream.status == RESULT_EMPTY and stream.rows:
+                # El consumidor cerró el stream a mitad: no es un endpoint vacío
+                stream.status = RESULT_PARTIAL
+            if trial:
+                self.circuit_breaker.release()
+    
+    async def _make_request(
+        self, 
+        endpoint: str, 
+        params: Optional[Dict[str, Any]] = None
+    ) -> OpenF1Result:
+        """
+        Realiza una petición HTTP a la API
+        
+        Args:
+            endpoint: Endpoint de la API (sin barra inicial)
+            params: Parámetros de consulta opcionales
+            
+        Returns:
+            OpenF1Result (lista de diccionarios con los datos de respuesta)
+        """
+        return await self.fetch(endpoint, params)
     
     async def get_drivers(
         self, 
         session_key: Optional[int] = None,
         driver_number: Optional[int] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> OpenF1Result:
         """
         Obtiene información de pilotos
         
@@ -121,7 +606,7 @@ class OpenF1Client:
         year: Optional[int] = None,
         session_name: Optional[str] = None,
         session_key: Optional[int] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> OpenF1Result:
         """
         Obtiene información de sesiones
         
@@ -148,7 +633,7 @@ class OpenF1Client:
         year: Optional[int] = None,
         meeting_key: Optional[int] = None,
         country_name: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> OpenF1Result:
         """
         Obtiene información de eventos/circuitos (meetings)
         
@@ -173,7 +658,7 @@ class OpenF1Client:
     async def get_session_results(
         self, 
         session_key: int
-    ) -> List[Dict[str, Any]]:
+    ) -> OpenF1Result:
         """
         Obtiene resultados de una sesión específica
         
@@ -181,7 +666,7 @@ class OpenF1Client:
             session_key: Clave de la sesión
             
         Returns:
-            Lista de diccionarios con resultados (posiciones, tiempos, etc.)
+            OpenF1Result con resultados (posiciones, tiempos, etc.)
         """
         params = {'session_key': session_key}
         
@@ -189,17 +674,70 @@ class OpenF1Client:
         # Intentamos con 'position' que suele tener la información de resultados
         results = await self._make_request('position', params)
         
-        # Si no hay resultados, intentamos obtenerlos de 'stints' o 'laps'
-        if not results:
+        # Si no hay resultados, intentamos obtenerlos de 'stints' o 'laps'.
+        # Un fallo no es lo mismo que una respuesta vacía: no se reintenta con otro endpoint
+        if results.empty:
             logger.info(f"No se encontraron resultados en 'position', intentando 'laps'")
             results = await self._make_request('laps', params)
         
         return results
     
+    def stream_position(self, session_key: int) -> OpenF1Stream:
+        """
+        Recorre en streaming las posiciones de una sesión
+        
+        Args:
+            session_key: Clave de la sesión
+            
+        Returns:
+            OpenF1Stream con filas del endpoint position
+        """
+        return self.stream('position', {'session_key': session_key})
+    
+    def stream_laps(
+        self,
+        session_key: int,
+        driver_number: Optional[int] = None
+    ) -> OpenF1Stream:
+        """
+        Recorre en streaming las vueltas de una sesión
+        
+        Args:
+            session_key: Clave de la sesión
+            driver_number: Número de piloto opcional
+            
+        Returns:
+            OpenF1Stream con filas del endpoint laps
+        """
+        params = {'session_key': session_key}
+        if driver_number:
+            params['driver_number'] = driver_number
+        return self.stream('laps', params)
+    
+    def stream_car_data(
+        self,
+        session_key: int,
+        driver_number: Optional[int] = None
+    ) -> OpenF1Stream:
+        """
+        Recorre en streaming la telemetría de coche de una sesión
+        
+        Args:
+            session_key: Clave de la sesión
+            driver_number: Número de piloto opcional
+            
+        Returns:
+            OpenF1Stream con filas del endpoint car_data
+        """
+        params = {'session_key': session_key}
+        if driver_number:
+            params['driver_number'] = driver_number
+        return self.stream('car_data', params)
+    
     async def get_race_control(
         self,
         session_key: int
-    ) -> List[Dict[str, Any]]:
+    ) -> OpenF1Result:
         """
         Obtiene mensajes de control de carrera
         
@@ -0,0 +1,130 @@
+"""
+Profiling bajo demanda de preguntas individuales
+
+Ejecuta una pregunta bajo cProfile (todas las etapas en el hilo del event
+loop, sin caché) y resume dónde se fue el tiempo: duración por etapa,
+funciones con más tiempo acumulado y las funciones clave del pipeline.
+"""
+import asyncio
+import cProfile
+import hashlib
+import logging
+import os
+import pstats
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models.schemas import AnswerResponse
+from .query_service import QueryService
+
+logger = logging.getLogger(__name__)
+
+# Funciones del pipeline que se reportan siempre: (fichero, función)
+WATCHED_FUNCTIONS: Dict[str, Tuple[str, str]] = {
+    'fuzzy_match': ('entity_index.py', 'fuzzy_match'),
+    'extract_entities': ('nlp_processor.py', 'extract_entities'),
+    'find_nodes_by_type': ('semantic_network.py', 'find_nodes_by_type'),
+    'get_node_details': ('semantic_network.py', 'get_node_details'),
+    'query_by_relation': ('semantic_network.py', 'query_by_relation'),
+    'openf1_fetch': ('openf1_client.py', 'fetch'),
+    'openf1_stream': ('openf1_client.py', '_stream_rows'),
+}
+
+# cProfile instala un hook global: un solo profiling a la vez
+_profile_lock = asyncio.Lock()
+
+
+def _function_label(key: Tuple[str, int, str]) -> str:
+    filename, line, name = key
+    if filename == '~':
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def summarize_stats(stats: pstats.Stats, top: int = 15) -> Dict[str, Any]:
+    """
+    Resume unas estadísticas de cProfile
+
+    Args:
+        stats: Estadísticas del profiler
+        top: Número de funciones a listar por tiempo acumulado
+
+    Returns:
+        Diccionario con 'top_functions' y 'watched' (tiempos en ms)
+    """
+    entries = stats.stats  # type: ignore[attr-defined]
+
+    ranked = sorted(entries.items(), key=lambda item: item[1][3], reverse=True)
+    top_functions: List[Dict[str, Any]] = []
+    for key, (primitive_calls, total_calls, tottime, cumtime, _) in ranked[:top]:
+        top_functions.append({
+            'function': _function_label(key),
+            'calls': total_calls,
+            'tottime_ms': round(tottime * 1000, 3),
+            'cumtime_ms': round(cumtime * 1000, 3),
+        })
+
+    watched: Dict[str, Dict[str, Any]] = {}
+    for label, (filename, function) in WATCHED_FUNCTIONS.items():
+        calls = 0
+        cumtime = 0.0
+        for key, (_, total_calls, _, function_cumtime, _) in entries.items():
+            if key[2] == function and key[0].endswith(filename):
+                calls += total_calls
+                cumtime += function_cumtime
+        if calls:
+            watched[label] = {'calls': calls, 'cumtime_ms': round(cumtime * 1000, 3)}
+
+    return {'top_functions': top_functions, 'watched': watched}
+
+
+async def profile_question(
+    query_service: QueryService,
+    question: str,
+    top: int = 15,
+    output_dir: Optional[str] = None
+) -> AnswerResponse:
+    """
+    Responde una pregunta bajo cProfile y adjunta el informe a la respuesta
+
+    El informe se añade en ``metadata['profile']``. Las peticiones que el
+    event loop atienda a la vez también aparecen en el perfil.
+
+    Args:
+        query_service: Servicio de consultas
+        question: Pregunta a perfilar
+        top: Número de funciones a listar
+        output_dir: Si se indica, se guarda ahí el fichero .prof
+
+    Returns:
+        AnswerResponse con el informe de profiling en los metadatos
+    """
+    timings: Dict[str, float] = {}
+
+    async with _profile_lock:
+        profiler = cProfile.Profile()
+        started_at = time.perf_counter()
+        profiler.enable()
+        try:
+            response = await query_service.answer_uncached(question, timings)
+        finally:
+            profiler.disable()
+        total = time.perf_counter() - started_at
+
+    report: Dict[str, Any] = {
+        'total_ms': round(total * 1000, 3),
+        'stages_ms': {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()},
+    }
+    report.update(summarize_stats(pstats.Stats(profiler), top))
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        digest = hashlib.sha1(question.encode('utf-8')).hexdigest()[:10]
+        path = os.path.join(output_dir, f"ask-{time.strftime('%Y%m%d-%H%M%S')}-{digest}.prof")
+        profiler.dump_stats(path)
+        report['profile_file'] = path
+        logger.info(f"Perfil de la pregunta guardado en {path}")
+
+    metadata = dict(response.metadata or {})
+    metadata['profile'] = report
+    return response.model_copy(update={'metadata': metadata})
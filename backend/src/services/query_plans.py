@@ -0,0 +1,221 @@
+"""
+Planes de consulta sobre la red semántica
+
+Cada consulta de QueryService que recorre relaciones se declara como una
+cadena de saltos desde la entidad mencionada en la pregunta:
+
+    piloto -conduce_para-> equipo -usa_motor-> motor
+    circuito <-ocurre_en- sesion
+
+``-relacion->`` sigue las aristas salientes y ``<-relacion-`` las entrantes;
+cada salto indica el tipo del nodo al que llega. Los planes se compilan una
+vez al crear el QueryPlanner y, para todos los saltos de todos los planes,
+se construye en una sola pasada por las aristas un índice origen -> destinos
+(filtrado por relación, sentido y tipo). Ejecutar un plan es entonces una
+búsqueda en un diccionario por salto, sin recorrer las aristas del nodo ni
+construir sus relaciones. El índice se reconstruye si la red cambia
+(``SemanticNetwork.version``).
+
+Igual que las consultas que reemplazan, cada salto continúa desde el primer
+nodo alcanzado en el salto anterior.
+"""
+import logging
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from ..core.semantic_network import SemanticNetwork
+
+logger = logging.getLogger(__name__)
+
+OUTGOING = "outgoing"
+INCOMING = "incoming"
+
+# Plan -> (categoría de la entidad de partida, cadena de saltos). Los planes
+# que responden una acción de la intención llevan su nombre
+QUERY_PLANS: Dict[str, Tuple[str, str]] = {
+    'get_pilot_details': ('drivers', 'piloto -conduce_para-> equipo'),
+    'get_team_of_pilot': ('drivers', 'piloto -conduce_para-> equipo -usa_motor-> motor'),
+    'get_team_engine': ('teams', 'equipo -usa_motor-> motor'),
+    'get_circuit_location': ('circuits', 'circuito -esta_en-> pais'),
+    'race_sessions': ('circuits', 'circuito <-ocurre_en- sesion'),
+}
+
+_OUTGOING_RE = re.compile(r'^-(\w+)->$')
+_INCOMING_RE = re.compile(r'^<-(\w+)-$')
+
+
+class Hop(NamedTuple):
+    """Salto de un plan"""
+    relation: str
+    direction: str  # outgoing o incoming
+    node_type: str  # Tipo del nodo al que se llega
+
+
+class QueryPlan(NamedTuple):
+    """Plan compilado"""
+    name: str
+    entity: str  # Categoría de entidades de la que parte (drivers, teams, circuits)
+    start_type: str
+    hops: Tuple[Hop, ...]
+
+
+def compile_plan(name: str, entity: str, chain: str) -> QueryPlan:
+    """
+    Compila la cadena de saltos de un plan
+
+    Args:
+        name: Nombre del plan
+        entity: Categoría de la entidad de partida
+        chain: Cadena como ``piloto -conduce_para-> equipo``
+
+    Returns:
+        QueryPlan
+
+    Raises:
+        ValueError: Si la cadena está mal formada o repite un tipo de nodo
+    """
+    tokens = chain.split()
+    if len(tokens) < 3 or len(tokens) % 2 == 0:
+        raise ValueError(f"Plan '{name}': cadena incompleta '{chain}'")
+
+    hops = []
+    for arrow, node_type in zip(tokens[1::2], tokens[2::2]):
+        outgoing = _OUTGOING_RE.match(arrow)
+        incoming = _INCOMING_RE.match(arrow)
+        if outgoing:
+            hops.append(Hop(outgoing.group(1), OUTGOING, node_type))
+        elif incoming:
+            hops.append(Hop(incoming.group(1), INCOMING, node_type))
+        else:
+            raise ValueError(f"Plan '{name}': salto no válido '{arrow}'")
+    # Los resultados se devuelven por tipo de nodo
+    if len({tokens[0], *(hop.node_type for hop in hops)}) != len(hops) + 1:
+        raise ValueError(f"Plan '{name}': un tipo de nodo aparece dos veces en '{chain}'")
+    return QueryPlan(name, entity, tokens[0], tuple(hops))
+
+
+class QueryPlanner:
+    """Ejecuta planes compilados sobre un índice de adyacencia de la red"""
+
+    def __init__(self, network: SemanticNetwork, plans: Optional[Dict[str, Tuple[str, str]]] = None):
+        """
+        Compila los planes
+
+        Args:
+            network: Red semántica
+            plans: Plan -> (categoría de partida, cadena); por defecto QUERY_PLANS
+        """
+        self.network = network
+        self.plans: Dict[str, QueryPlan] = {
+            name: compile_plan(name, entity, chain)
+            for name, (entity, chain) in (plans or QUERY_PLANS).items()
+        }
+        self._hops = {hop for plan in self.plans.values() for hop in plan.hops}
+        # (versión de la red, salto -> origen -> destinos)
+        self._adjacency: Optional[Tuple[int, Dict[Hop, Dict[str, List[str]]]]] = None
+
+    def _index(self) -> Dict[Hop, Dict[str, List[str]]]:
+        """Índice de adyacencia de los saltos de los planes (se reconstruye si la red cambió)"""
+        cached = self._adjacency
+        if cached is not None and cached[0] == self.network.version:
+            return cached[1]
+
+        hops_by_relation: Dict[Tuple[str, str], List[Hop]] = defaultdict(list)
+        for hop in self._hops:
+            hops_by_relation[(hop.relation, hop.direction)].append(hop)
+
+        adjacency: Dict[Hop, Dict[str, List[str]]] = {hop: {} for hop in self._hops}
+        # El recorrido puede hacerse en un hilo del StageExecutor mientras el
+        # event loop modifica la red: se lee con el lock de lectura
+        with self.network.lock.read():
+            version = self.network.version
+            graph = self.network.graph
+            nodes = graph.nodes
+            # Mismo orden que query_by_relation: sucesores y predecesores por orden de inserción
+            for direction, view in ((OUTGOING, graph.succ), (INCOMING, graph.pred)):
+                if not any(key[1] == direction for key in hops_by_relation):
+                    continue
+                for node_id, neighbours in view.items():
+                    for other, edges in neighbours.items():
+                        for data in edges.values():
+                            for hop in hops_by_relation.get((data.get('relation'), direction), ()):
+                                if nodes[other].get('node_type') != hop.node_type:
+                                    continue
+                                targets = adjacency[hop].setdefault(node_id, [])
+                                if other not in targets:
+                                    targets.append(other)
+
+        self._adjacency = (version, adjacency)
+        logger.debug(f"Índice de planes reconstruido (versión {version}): {len(self._hops)} saltos")
+        return adjacency
+
+    def node(self, node_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Nodo con sus atributos, sin construir sus relaciones
+
+        Args:
+            node_id: ID del nodo
+
+        Returns:
+            Diccionario con id, type y attributes, o None si no existe
+        """
+        return self.network.get_nodes((node_id,)).get(node_id)
+
+    def run(self, name: str, start_id: str) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Ejecuta un plan desde un nodo
+
+        Args:
+            name: Nombre del plan
+            start_id: ID del nodo de partida
+
+        Returns:
+            Tipo de nodo -> nodos alcanzados en ese salto (el de partida
+            incluido; lista vacía si el recorrido se cortó antes), o None si
+            el nodo de partida no existe o no es del tipo del plan
+        """
+        return self.run_many(name, (start_id,)).get(start_id)
+
+    def run_many(self, name: str, start_ids: Iterable[str]) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """
+        Ejecuta un plan desde varios nodos a la vez
+
+        Primero se recorren los IDs de todos los puntos de partida y después
+        se leen de una vez (SemanticNetwork.get_nodes) todos los nodos
+        alcanzados; los compartidos (dos pilotos del mismo equipo) se leen
+        una sola vez.
+
+        Args:
+            name: Nombre del plan
+            start_ids: IDs de los nodos de partida
+
+        Returns:
+            ID de partida -> resultado como en run; se omiten los nodos de
+            partida que no existen o no son del tipo del plan
+        """
+        plan = self.plans[name]
+        adjacency = self._index()
+        nodes = self.network.get_nodes(start_ids, plan.start_type)
+
+        trails: Dict[str, List[List[str]]] = {}
+        reached_ids: List[str] = []
+        for start_id in nodes:
+            current: Optional[str] = start_id
+            trail = []
+            for hop in plan.hops:
+                reached = adjacency[hop].get(current, []) if current is not None else []
+                trail.append(reached)
+                reached_ids.extend(reached)
+                current = reached[0] if reached else None
+            trails[start_id] = trail
+        if reached_ids:
+            nodes.update(self.network.get_nodes([node_id for node_id in reached_ids if node_id not in nodes]))
+
+        results: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        for start_id, trail in trails.items():
+            result = {plan.start_type: [nodes[start_id]]}
+            for hop, reached in zip(plan.hops, trail):
+                result[hop.node_type] = [nodes[node_id] for node_id in reached if node_id in nodes]
+            results[start_id] = result
+        return results
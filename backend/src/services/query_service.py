@@ -1,11 +1,18 @@
 """
 Servicio de Consultas - Procesa preguntas y genera respuestas
 """
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+import time
+from datetime import date
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from ..core import metrics
 from ..models.schemas import AnswerResponse
+from .executor import STRATEGY_INLINE, StageExecutor
+from .hot_answers import HotAnswerCache, intent_fingerprint
 from .knowledge_base import KnowledgeBase
 from .nlp_processor import NLPProcessor
+from .query_plans import QueryPlanner
 
 logger = logging.getLogger(__name__)
 
@@ -13,90 +20,181 @@ logger = logging.getLogger(__name__)
 class QueryService:
     """Servicio para procesar preguntas y generar respuestas"""
     
-    def __init__(self, knowledge_base: KnowledgeBase, nlp_processor: NLPProcessor):
+    def __init__(
+        self,
+        knowledge_base: KnowledgeBase,
+        nlp_processor: NLPProcessor,
+        executor: Optional[StageExecutor] = None,
+        response_cache: Optional[HotAnswerCache] = None
+    ):
         """
         Inicializa el servicio de consultas
         
         Args:
             knowledge_base: Instancia de la base de conocimiento
             nlp_processor: Instancia del procesador NLP
+            executor: Estrategia de ejecución de las etapas síncronas (por defecto, inline)
+            response_cache: Caché de respuestas (por defecto, HotAnswerCache con sus tamaños por defecto)
         """
         self.knowledge_base = knowledge_base
         self.nlp_processor = nlp_processor
         self.network = knowledge_base.get_semantic_network()
+        self.planner = QueryPlanner(self.network)
         self.openf1_client = knowledge_base.client  # Cliente para consultas dinámicas
-        self.response_cache: Dict[str, AnswerResponse] = {}
+        self.executor = executor or StageExecutor(STRATEGY_INLINE)
+        # El modo profiling ejecuta todas las etapas en el hilo del event loop
+        self._inline_executor = (
+            self.executor if self.executor.strategy == STRATEGY_INLINE else StageExecutor(STRATEGY_INLINE)
+        )
+        # Nivel caliente por frecuencia de la intención delante de un LRU
+        self.response_cache = response_cache or HotAnswerCache()
+        
+        # Consultas que solo leen la red semántica (se pueden ejecutar fuera del event loop)
+        self._sync_queries = {
+            'get_pilot_details': self._query_pilot_info,
+            'get_team_of_pilot': self._query_team_info,
+            'get_team_engine': self._query_motor_info,
+            'get_circuit_location': self._query_circuit_info,
+            'get_session_details': self._query_session_info,
+            'general_search': self._query_general,
+        }
+        
+        # Consultas que llaman a OpenF1 (I/O asíncrono en el event loop)
+        self._async_queries = {
+            'get_race_winner': self._query_winner_info,
+            'get_fastest_lap': self._query_fastest_lap,
+            'get_laps_led': self._query_laps_led,
+            'get_average_pace': self._query_average_pace,
+        }
         logger.info("QueryService inicializado")
     
-    async def process_question(self, question: str) -> AnswerResponse:
+    async def process_question(
+        self,
+        question: str,
+        timings: Optional[Dict[str, float]] = None
+    ) -> AnswerResponse:
         """
         Procesa una pregunta y genera una respuesta
         
+        Las etapas síncronas (clasificación, entidades, consulta a la red y
+        formato) se ejecutan con la estrategia del StageExecutor.
+        
         Args:
             question: Pregunta del usuario
+            timings: Diccionario opcional donde se registra la duración de cada etapa
             
         Returns:
             AnswerResponse con la respuesta generada
         """
         logger.info(f"Procesando pregunta: {question}")
         
+        if timings is None:
+            timings = {}
+        
         # Verificar caché
-        if question in self.response_cache:
+        cached = self.response_cache.get(question)
+        if cached is not None:
             logger.debug("Respuesta encontrada en caché")
-            return self.response_cache[question]
+            metrics.ANSWER_CACHE_TOTAL.inc(result='hit')
+            return cached
+        metrics.ANSWER_CACHE_TOTAL.inc(result='miss')
+        
+        return await self._answer(question, timings)
+    
+    def cached_answer(self, question: str) -> Optional[AnswerResponse]:
+        """
+        Respuesta guardada en la caché para una pregunta, sin contarla en las métricas ni en el sketch
+        
+        Args:
+            question: Pregunta del usuario
+            
+        Returns:
+            AnswerResponse cacheada o None
+        """
+        return self.response_cache.peek(question)
+    
+    async def answer_uncached(self, question: str, timings: Dict[str, float]) -> AnswerResponse:
+        """
+        Responde una pregunta sin caché y con todas las etapas en el hilo actual
         
+        Lo usa el modo profiling: la respuesta no se lee ni se guarda en la
+        caché y no se publica en las métricas.
+        
+        Args:
+            question: Pregunta del usuario
+            timings: Diccionario donde se registra la duración de cada etapa
+            
+        Returns:
+            AnswerResponse con la respuesta generada
+        """
+        return await self._answer(question, timings, profiling=True)
+    
+    async def _answer(
+        self,
+        question: str,
+        timings: Dict[str, float],
+        profiling: bool = False
+    ) -> AnswerResponse:
+        """
+        Ejecuta el pipeline completo de una pregunta no cacheada
+        
+        Args:
+            question: Pregunta del usuario
+            timings: Diccionario donde se registra la duración de cada etapa
+            profiling: Ejecutar inline, sin caché y sin métricas
+            
+        Returns:
+            AnswerResponse con la respuesta generada
+        """
+        executor = self._inline_executor if profiling else self.executor
+        started_at = time.perf_counter()
+        query_type = 'unknown'
+        # Las llamadas a OpenF1 de esta pregunta suman su tiempo en la etapa 'openf1'
+        token = metrics.stage_timings.set(timings)
         try:
             # Extraer intención de la pregunta
-            intent = self.nlp_processor.extract_intent(question)
-            query_type = intent['type']
-            entities = intent['entities']
+            query_type = await executor.run_nlp(
+                'intent', self.nlp_processor, 'extract_query_type', question, timings=timings
+            )
+            entities = await executor.run_nlp(
+                'entities', self.nlp_processor, 'extract_entities', question, timings=timings
+            )
+            intent = self.nlp_processor.build_intent(question, query_type, entities)
+            fingerprint = intent_fingerprint(intent)
             filters = intent['filters']
             action = intent['action']
             
             # Ejecutar consulta según el tipo
-            results = {}
-            
-            if action == 'get_pilot_details':
-                results = self._query_pilot_info(entities, filters)
-            elif action == 'get_team_of_pilot':
-                results = self._query_team_info(entities, filters)
-            elif action == 'get_race_winner':
-                results = await self._query_winner_info(entities, filters)
-            elif action == 'get_team_engine':
-                results = self._query_motor_info(entities, filters)
-            elif action == 'get_circuit_location':
-                results = self._query_circuit_info(entities, filters)
-            elif action == 'get_session_details':
-                results = self._query_session_info(entities, filters)
+            if action in self._async_queries:
+                start = time.perf_counter()
+                results = await self._async_queries[action](entities, filters)
+                timings['query'] = time.perf_counter() - start - timings.get('openf1', 0.0)
             else:
-                results = self._query_general(entities, filters)
-            
-            # Calcular confianza
-            confidence = self._calculate_confidence(results, intent)
-            
-            # Formatear respuesta
-            answer = self._format_answer(results, query_type, entities, question)
-            
-            # Extraer entidades relacionadas
-            related_entities = results.get('related_entities', [])
+                handler = self._sync_queries.get(action, self._query_general)
+                results = await executor.run(
+                    'query', self._read_network, handler, entities, filters, timings=timings
+                )
             
-            # Crear respuesta
-            response = AnswerResponse(
-                answer=answer,
-                confidence=confidence,
-                related_entities=related_entities,
-                query_type=query_type,
-                metadata=results.get('metadata', {})
+            # Calcular confianza y formatear respuesta
+            response = await executor.run(
+                'format', self._build_response, results, intent, question, timings=timings
             )
             
-            # Guardar en caché
-            self.response_cache[question] = response
+            # Guardar en caché (nunca respuestas construidas sobre un fallo de OpenF1)
+            if results.get('upstream_error'):
+                logger.warning("Respuesta no cacheada: OpenF1 no respondió correctamente o los datos no están al día")
+                if not profiling:
+                    self.response_cache.record(fingerprint)
+            elif not profiling:
+                self.response_cache.put(question, response, fingerprint)
             
-            logger.info(f"Respuesta generada con confianza: {confidence}")
+            logger.info(f"Respuesta generada con confianza: {response.confidence}")
+            logger.debug(f"Tiempos por etapa: {timings}")
             return response
             
         except Exception as e:
             logger.error(f"Error procesando pregunta: {e}", exc_info=True)
+            query_type = 'error'
             
             # Respuesta de error
             return AnswerResponse(
@@ -106,6 +204,60 @@ class QueryService:
                 query_type="error",
                 metadata={"error": str(e)}
             )
+        
+        finally:
+            metrics.stage_timings.reset(token)
+            if not profiling:
+                self._record_timings(query_type, timings, time.perf_counter() - started_at)
+    
+    def _read_network(
+        self,
+        handler: Callable[[Dict, Dict], Dict[str, Any]],
+        entities: Dict,
+        filters: Dict
+    ) -> Dict[str, Any]:
+        """Ejecuta una consulta síncrona con la red bloqueada para lectura (puede correr en un hilo)"""
+        with self.network.lock.read():
+            return handler(entities, filters)
+    
+    @staticmethod
+    def _record_timings(query_type: str, timings: Dict[str, float], total: float) -> None:
+        """
+        Publica en las métricas la duración de cada etapa de una pregunta
+        
+        Args:
+            query_type: Tipo de consulta (etiqueta de las métricas)
+            timings: Duración por etapa
+            total: Duración total de la pregunta
+        """
+        for stage, seconds in timings.items():
+            metrics.QUESTION_STAGE_SECONDS.observe(seconds, stage=stage, query_type=query_type)
+        metrics.QUESTION_SECONDS.observe(total, query_type=query_type)
+    
+    def _build_response(self, results: Dict, intent: Dict, question: str) -> AnswerResponse:
+        """
+        Construye la respuesta final a partir de los resultados de la consulta
+        
+        Args:
+            results: Resultados de la consulta
+            intent: Intención extraída
+            question: Pregunta original
+            
+        Returns:
+            AnswerResponse
+        """
+        confidence = self._calculate_confidence(results, intent)
+        answer = self._format_answer(results, intent['type'], intent['entities'], question)
+        
+        # Los valores ya tienen el tipo del esquema (la confianza se acota en
+        # _calculate_confidence): se omite la validación de pydantic
+        return AnswerResponse.model_construct(
+            answer=answer,
+            confidence=confidence,
+            related_entities=results.get('related_entities', []),
+            query_type=intent['type'],
+            metadata=results.get('metadata', {})
+        )
     
     def _query_pilot_info(self, entities: Dict, filters: Dict) -> Dict[str, Any]:
         """
@@ -120,57 +272,61 @@ class QueryService:
         """
         logger.debug("Ejecutando consulta de información de piloto")
         
-        # Buscar piloto mencionado
-        driver_name = entities['drivers'][0] if entities['drivers'] else None
-        driver_number = filters.get('number')
-        
-        pilot_node = None
-        
-        # Buscar por nombre
-        if driver_name:
-            pilots = self.network.find_nodes_by_type('piloto', {'nombre': driver_name})
-            if pilots:
-                pilot_node = pilots[0]
-        
-        # Buscar por número
-        elif driver_number:
-            pilots = self.network.find_nodes_by_type('piloto', {'numero_piloto': driver_number})
-            if pilots:
-                pilot_node = pilots[0]
-        
-        if not pilot_node:
-            return {
-                'found': False,
-                'message': 'No se encontró información del piloto',
-                'related_entities': [],
-                'metadata': {}
-            }
-        
-        # Obtener equipo del piloto
-        team_nodes = self.network.query_by_relation(
-            pilot_node['id'],
-            'conduce_para',
-            direction='outgoing'
-        )
+        path = self._pilot_path('get_pilot_details', entities, filters)
+        if path is None:
+            return self._pilot_not_found()
+        return self._pilot_result(path)
+    
+    def _pilot_path(self, plan: str, entities: Dict, filters: Dict) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Ejecuta un plan que parte del piloto mencionado (o, si no, del dorsal)
         
-        team_name = team_nodes[0]['attributes']['nombre_equipo'] if team_nodes else 'Desconocido'
+        Args:
+            plan: Nombre del plan
+            entities: Entidades extraídas de la pregunta
+            filters: Filtros adicionales
+            
+        Returns:
+            Resultado de QueryPlanner.run o None si no hay piloto
+        """
+        pilot_id = self._entity_id(entities, 'drivers')
+        driver_number = filters.get('number')
+        if pilot_id is None and driver_number:
+            pilot_id = self._pilot_id_by_number(driver_number)
+        return self.planner.run(plan, pilot_id) if pilot_id else None
+    
+    @staticmethod
+    def _pilot_not_found() -> Dict[str, Any]:
+        return {
+            'found': False,
+            'message': 'No se encontró información del piloto',
+            'related_entities': [],
+            'metadata': {}
+        }
+    
+    @staticmethod
+    def _pilot_result(path: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Resultado de la consulta de piloto a partir del recorrido piloto -> equipo"""
+        pilot_node = path['piloto'][0]
+        team = path['equipo'][0] if path['equipo'] else None
+        team_name = team['attributes']['nombre_equipo'] if team else 'Desconocido'
         
         # Preparar entidades relacionadas
         related_entities = [
             {'type': 'piloto', 'name': pilot_node['attributes']['nombre'], 'id': pilot_node['id']},
         ]
         
-        if team_nodes:
+        if team:
             related_entities.append({
                 'type': 'equipo',
                 'name': team_name,
-                'id': team_nodes[0]['id']
+                'id': team['id']
             })
         
         return {
             'found': True,
             'pilot': pilot_node,
-            'team': team_nodes[0] if team_nodes else None,
+            'team': team,
             'related_entities': related_entities,
             'metadata': {
                 'pilot_name': pilot_node['attributes']['nombre'],
@@ -183,13 +339,13 @@ class QueryService:
         """Consulta información sobre el equipo de un piloto"""
         logger.debug("Ejecutando consulta de equipo")
         
-        # Primero obtener info del piloto
-        pilot_info = self._query_pilot_info(entities, filters)
+        # Piloto, equipo y motor en un solo recorrido
+        path = self._pilot_path('get_team_of_pilot', entities, filters)
+        if path is None:
+            return self._pilot_not_found()
         
-        if not pilot_info['found']:
-            return pilot_info
-        
-        team = pilot_info.get('team')
+        pilot_info = self._pilot_result(path)
+        team = pilot_info['team']
         if not team:
             return {
                 'found': False,
@@ -198,23 +354,18 @@ class QueryService:
                 'metadata': {}
             }
         
-        # Obtener motor del equipo
-        motor_nodes = self.network.query_by_relation(
-            team['id'],
-            'usa_motor',
-            direction='outgoing'
-        )
+        motor = path['motor'][0] if path['motor'] else None
         
         return {
             'found': True,
             'pilot': pilot_info['pilot'],
             'team': team,
-            'motor': motor_nodes[0] if motor_nodes else None,
+            'motor': motor,
             'related_entities': pilot_info['related_entities'],
             'metadata': {
                 'team_name': team['attributes']['nombre_equipo'],
                 'team_principal': team['attributes'].get('jefe_equipo', ''),
-                'motor': motor_nodes[0]['attributes']['fabricante'] if motor_nodes else 'Desconocido'
+                'motor': motor['attributes']['fabricante'] if motor else 'Desconocido'
             }
         }
     
@@ -222,9 +373,7 @@ class QueryService:
         """Consulta información sobre el motor de un equipo"""
         logger.debug("Ejecutando consulta de motor")
         
-        team_name = entities['teams'][0] if entities['teams'] else None
-        
-        if not team_name:
+        if not entities['teams']:
             return {
                 'found': False,
                 'message': 'No se especificó un equipo',
@@ -232,41 +381,19 @@ class QueryService:
                 'metadata': {}
             }
         
-        # Buscar equipo - primero intentar coincidencia exacta
-        teams = self.network.find_nodes_by_type('equipo', {'nombre_equipo': team_name})
-        
-        # Si no se encuentra, buscar de forma flexible (en el contenido del nombre)
-        if not teams:
-            all_teams = self.network.find_nodes_by_type('equipo')
-            team_name_lower = team_name.lower()
-            
-            for t in all_teams:
-                t_name = t['attributes'].get('nombre_equipo', '').lower()
-                # Buscar si el nombre del equipo contiene el término de búsqueda
-                # o si el término de búsqueda contiene el nombre del equipo
-                if team_name_lower in t_name or t_name in team_name_lower:
-                    teams = [t]
-                    logger.info(f"Equipo encontrado con búsqueda flexible: '{team_name}' -> '{t['attributes']['nombre_equipo']}'")
-                    break
-        
-        if not teams:
+        path = self._run_plan('get_team_engine', entities)
+        if path is None:
             return {
                 'found': False,
-                'message': f'No se encontró el equipo {team_name}',
+                'message': f"No se encontró el equipo {entities['teams'][0]['name']}",
                 'related_entities': [],
                 'metadata': {}
             }
         
-        team = teams[0]
-        
-        # Obtener motor
-        motor_nodes = self.network.query_by_relation(
-            team['id'],
-            'usa_motor',
-            direction='outgoing'
-        )
+        team = path['equipo'][0]
+        team_name = team['attributes']['nombre_equipo']
         
-        if not motor_nodes:
+        if not path['motor']:
             return {
                 'found': False,
                 'message': f'No se encontró información del motor de {team_name}',
@@ -274,7 +401,7 @@ class QueryService:
                 'metadata': {}
             }
         
-        motor = motor_nodes[0]
+        motor = path['motor'][0]
         
         related_entities = [
             {'type': 'equipo', 'name': team['attributes']['nombre_equipo'], 'id': team['id']},
@@ -297,9 +424,7 @@ class QueryService:
         """Consulta información sobre un circuito"""
         logger.debug("Ejecutando consulta de circuito")
         
-        circuit_name = entities['circuits'][0] if entities['circuits'] else None
-        
-        if not circuit_name:
+        if not entities['circuits']:
             return {
                 'found': False,
                 'message': 'No se especificó un circuito',
@@ -307,47 +432,34 @@ class QueryService:
                 'metadata': {}
             }
         
-        # Buscar circuito
-        circuits = self.network.find_nodes_by_type('circuito', {'nombre_oficial': circuit_name})
-        
-        if not circuits:
-            # Intentar buscar por nombre corto
-            circuits = self.network.find_nodes_by_type('circuito', {'circuit_short_name': circuit_name})
-        
-        if not circuits:
+        path = self._run_plan('get_circuit_location', entities)
+        if path is None:
             return {
                 'found': False,
-                'message': f'No se encontró el circuito {circuit_name}',
+                'message': f"No se encontró el circuito {entities['circuits'][0]['name']}",
                 'related_entities': [],
                 'metadata': {}
             }
         
-        circuit = circuits[0]
-        
-        # Obtener país
-        country_nodes = self.network.query_by_relation(
-            circuit['id'],
-            'esta_en',
-            direction='outgoing'
-        )
-        
-        country_name = country_nodes[0]['attributes']['nombre'] if country_nodes else 'Desconocido'
+        circuit = path['circuito'][0]
+        country = path['pais'][0] if path['pais'] else None
+        country_name = country['attributes']['nombre'] if country else 'Desconocido'
         
         related_entities = [
             {'type': 'circuito', 'name': circuit['attributes']['nombre_oficial'], 'id': circuit['id']},
         ]
         
-        if country_nodes:
+        if country:
             related_entities.append({
                 'type': 'pais',
                 'name': country_name,
-                'id': country_nodes[0]['id']
+                'id': country['id']
             })
         
         return {
             'found': True,
             'circuit': circuit,
-            'country': country_nodes[0] if country_nodes else None,
+            'country': country,
             'related_entities': related_entities,
             'metadata': {
                 'circuit_name': circuit['attributes']['nombre_oficial'],
@@ -360,10 +472,11 @@ class QueryService:
         """Consulta información sobre el ganador de una carrera"""
         logger.debug("Ejecutando consulta de ganador")
         
-        circuit_name = entities['circuits'][0] if entities['circuits'] else None
+        circuit_id = self._entity_id(entities, 'circuits')
+        circuit = self.planner.node(circuit_id) if circuit_id else None
         year = filters.get('year', 2024)
         
-        if not circuit_name:
+        if circuit is None:
             return {
                 'found': False,
                 'message': 'No se especificó un circuito o carrera',
@@ -371,41 +484,23 @@ class QueryService:
                 'metadata': {}
             }
         
+        circuit_name = circuit['attributes'].get('circuit_short_name', circuit['id'])
+        
         try:
-            # Obtener todas las meetings del año para encontrar el circuito
-            meetings = await self.openf1_client.get_meetings(year=year)
-            
-            # Buscar la meeting que corresponde al circuito
-            target_meeting = None
-            circuit_search = circuit_name.lower()
-            
-            # Mapeo de nombres comunes a términos de búsqueda
-            search_terms = [circuit_search]
-            if 'mexico' in circuit_search or 'méxico' in circuit_search:
-                search_terms.extend(['mexico', 'méxico', 'mexico city'])
-            elif 'brasil' in circuit_search:
-                search_terms.extend(['brazil', 'sao paulo', 'são paulo', 'interlagos'])
-            elif 'monaco' in circuit_search or 'mónaco' in circuit_search:
-                search_terms.extend(['monaco', 'monte carlo'])
-            
-            for meeting in meetings:
-                location = meeting.get('location', '').lower()
-                country = meeting.get('country_name', '').lower()
-                circuit_short = meeting.get('circuit_short_name', '').lower()
-                meeting_name = meeting.get('meeting_name', '').lower()
-                
-                # Buscar coincidencia con cualquiera de los términos de búsqueda
-                for term in search_terms:
-                    if (term in location or 
-                        term in country or 
-                        term in circuit_short or
-                        term in meeting_name):
-                        target_meeting = meeting
-                        logger.info(f"Meeting encontrada: '{meeting.get('meeting_name')}' para búsqueda '{circuit_name}'")
-                        break
-                
-                if target_meeting:
-                    break
+            # Meetings y sesiones del año: no dependen una de otra, se piden a la vez
+            meetings, sessions = await asyncio.gather(
+                self.openf1_client.get_meetings(year=year),
+                self.openf1_client.get_sessions(year=year)
+            )
+            if meetings.failed:
+                return self._upstream_failure(meetings, circuit_name, year)
+            
+            # Meeting del circuito: misma circuit_key que el nodo
+            circuit_key = circuit['attributes'].get('circuit_key')
+            target_meeting = next(
+                (meeting for meeting in meetings if meeting.get('circuit_key') == circuit_key),
+                None
+            )
             
             if not target_meeting:
                 return {
@@ -415,8 +510,8 @@ class QueryService:
                     'metadata': {}
                 }
             
-            # Obtener sesiones de esa meeting
-            sessions = await self.openf1_client.get_sessions(year=year)
+            if sessions.failed:
+                return self._upstream_failure(sessions, circuit_name, year)
             
             # Buscar la sesión de Race
             race_session = None
@@ -438,9 +533,12 @@ class QueryService:
             
             # Obtener resultados de la carrera
             session_key = race_session.get('session_key')
-            results = await self.openf1_client.get_session_results(session_key)
+            winner_data, results = await self._find_race_winner(session_key)
+            
+            if results.failed:
+                return self._upstream_failure(results, circuit_name, year)
             
-            if not results:
+            if not results.rows:
                 return {
                     'found': False,
                     'message': f'No hay resultados disponibles para el GP de {circuit_name} {year}',
@@ -448,14 +546,6 @@ class QueryService:
                     'metadata': {}
                 }
             
-            # Encontrar el ganador (posición 1)
-            winner_data = None
-            for result in results:
-                position = result.get('position')
-                if position == 1:
-                    winner_data = result
-                    break
-            
             if not winner_data:
                 return {
                     'found': False,
@@ -468,12 +558,9 @@ class QueryService:
             driver_number = winner_data.get('driver_number')
             
             # Buscar el piloto en la red semántica
-            pilots = self.network.find_nodes_by_type('piloto', {'numero_piloto': driver_number})
-            
-            winner_pilot = None
-            if pilots:
-                winner_pilot = pilots[0]
-            else:
+            winner_id = self._pilot_id_by_number(driver_number)
+            winner_pilot = self.planner.node(winner_id) if winner_id else None
+            if winner_pilot is None:
                 # Si no está en la red, obtener de la API
                 drivers = await self.openf1_client.get_drivers(driver_number=driver_number)
                 if drivers:
@@ -499,15 +586,20 @@ class QueryService:
                 {'type': 'piloto', 'name': winner_pilot['attributes']['nombre'], 'id': winner_pilot['id']}
             ]
             
+            # Datos servidos desde la caché del cliente mientras OpenF1 está caído
+            stale = meetings.stale or sessions.stale
+            
             return {
                 'found': True,
                 'winner': winner_pilot,
                 'race_info': race_session,
                 'related_entities': related_entities,
+                'upstream_error': stale,
                 'metadata': {
                     'winner_name': winner_pilot['attributes']['nombre'],
                     'circuit': circuit_name,
-                    'year': year
+                    'year': year,
+                    'stale_data': stale
                 }
             }
             
@@ -520,26 +612,334 @@ class QueryService:
                 'metadata': {}
             }
     
+    async def _find_race_winner(self, session_key: int) -> Tuple[Optional[Dict[str, Any]], Any]:
+        """
+        Determina el ganador de una carrera reduciendo los datos en streaming
+        
+        Recorre el endpoint position guardando solo la última posición de cada
+        piloto (memoria proporcional al número de pilotos, no de filas). Si no
+        hay datos de posición, usa las vueltas: gana quien completó más vueltas
+        y empezó antes la última.
+        
+        Args:
+            session_key: Clave de la sesión de carrera
+            
+        Returns:
+            Tupla (fila del ganador o None, OpenF1Stream recorrido)
+        """
+        latest_positions: Dict[int, Tuple[str, int]] = {}
+        
+        stream = self.openf1_client.stream_position(session_key)
+        async for row in stream:
+            driver_number = row.get('driver_number')
+            position = row.get('position')
+            if driver_number is None or position is None:
+                continue
+            date = row.get('date') or ''
+            previous = latest_positions.get(driver_number)
+            if previous is None or date >= previous[0]:
+                latest_positions[driver_number] = (date, position)
+        
+        if stream.failed:
+            return None, stream
+        
+        if latest_positions:
+            for driver_number, (date, position) in latest_positions.items():
+                if position == 1:
+                    return {'driver_number': driver_number, 'position': 1, 'date': date}, stream
+            return None, stream
+        
+        logger.info("No se encontraron resultados en 'position', intentando 'laps'")
+        last_laps: Dict[int, Tuple[int, str]] = {}
+        
+        stream = self.openf1_client.stream_laps(session_key)
+        async for row in stream:
+            driver_number = row.get('driver_number')
+            lap_number = row.get('lap_number')
+            if driver_number is None or lap_number is None:
+                continue
+            date_start = row.get('date_start') or ''
+            previous = last_laps.get(driver_number)
+            if previous is None or lap_number > previous[0]:
+                last_laps[driver_number] = (lap_number, date_start)
+        
+        if stream.failed or not last_laps:
+            return None, stream
+        
+        driver_number, (lap_number, _) = min(
+            last_laps.items(),
+            key=lambda item: (-item[1][0], item[1][1])
+        )
+        return {'driver_number': driver_number, 'position': 1, 'lap_number': lap_number}, stream
+    
+    def _upstream_failure(self, result, circuit_name: str, year: int) -> Dict[str, Any]:
+        """
+        Construye el resultado de una consulta cuando OpenF1 falla
+        
+        Args:
+            result: OpenF1Result u OpenF1Stream fallido
+            circuit_name: Circuito consultado
+            year: Año consultado
+            
+        Returns:
+            Diccionario con resultados marcados como no cacheables
+        """
+        return {
+            'found': False,
+            'message': (
+                f'No se pudo consultar OpenF1 para el GP de {circuit_name} {year}. '
+                'El servicio no está disponible en este momento, intenta de nuevo más tarde.'
+            ),
+            'upstream_error': True,
+            'related_entities': [],
+            'metadata': {
+                'upstream_status': result.status_code,
+                'upstream_error': result.error
+            }
+        }
+    
     def _query_session_info(self, entities: Dict, filters: Dict) -> Dict[str, Any]:
         """Consulta información sobre sesiones"""
         logger.debug("Ejecutando consulta de sesión")
         
         year = filters.get('year')
-        circuit_name = entities['circuits'][0] if entities['circuits'] else None
-        
-        # Buscar sesiones
-        sessions = self.network.find_nodes_by_type('sesion')
         
-        # Filtrar por año si se especifica
+        # Sesiones (filtradas por año con el índice de atributos); solo se
+        # leen los nodos que se devuelven
+        session_ids = self.network.nodes_by_type.get('sesion', [])
         if year:
-            sessions = [s for s in sessions if s['attributes'].get('year') == year]
+            in_year = self.network.attribute_index('sesion', 'year').get(year, set())
+            session_ids = [s for s in session_ids if s in in_year]
+        sessions = [self.planner.node(s) for s in session_ids[:10]]  # Limitar a 10
         
         return {
-            'found': len(sessions) > 0,
-            'sessions': sessions[:10],  # Limitar a 10
-            'count': len(sessions),
+            'found': len(session_ids) > 0,
+            'sessions': sessions,
+            'count': len(session_ids),
             'related_entities': [],
-            'metadata': {'year': year, 'total_sessions': len(sessions)}
+            'metadata': {'year': year, 'total_sessions': len(session_ids)}
+        }
+    
+    def _find_race_session(self, circuit_id: Optional[str], year: Optional[int]) -> Optional[Dict[str, Any]]:
+        """
+        Busca en la red semántica la sesión de carrera de un circuito
+        
+        Args:
+            circuit_id: ID del nodo del circuito (None para la última carrera disputada)
+            year: Año opcional
+            
+        Returns:
+            Nodo de la sesión o None
+        """
+        if circuit_id:
+            # Sesiones enlazadas al circuito (ocurre_en) en lugar de recorrer todas
+            path = self.planner.run('race_sessions', circuit_id)
+            sessions = path['sesion'] if path else []
+        else:
+            sessions = self.network.find_nodes_by_type('sesion', {'tipo': 'R'})
+        
+        races = [
+            s for s in sessions
+            if s['attributes'].get('tipo') == 'R' and s['attributes'].get('session_name') == 'Race'
+        ]
+        if year:
+            races = [s for s in races if s['attributes'].get('year') == year]
+        
+        if circuit_id:
+            return races[0] if races else None
+        
+        today = date.today().isoformat()
+        played = [s for s in races if (s['attributes'].get('fecha') or '') <= today]
+        return max(played, key=lambda s: s['attributes'].get('fecha') or '', default=None)
+    
+    async def _load_race_telemetry(self, entities: Dict, filters: Dict) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Carga la telemetría de la carrera mencionada en la pregunta
+        
+        Args:
+            entities: Entidades extraídas de la pregunta
+            filters: Filtros adicionales
+            
+        Returns:
+            Tupla (SessionTelemetry o None, nodo de sesión o resultado de error)
+        """
+        circuit = entities['circuits'][0] if entities['circuits'] else None
+        year = filters.get('year')
+        
+        session = self._find_race_session(circuit['id'] if circuit else None, year)
+        if not session:
+            place = f" de {circuit['name']}" if circuit else ''
+            return None, {
+                'found': False,
+                'message': f'No se encontró la carrera{place}{f" en {year}" if year else ""}',
+                'related_entities': [],
+                'metadata': {}
+            }
+        
+        session_key = session['attributes']['session_key']
+        telemetry = await self.knowledge_base.telemetry.ensure_session(session_key)
+        
+        if telemetry is None:
+            return None, {
+                'found': False,
+                'message': 'No se pudo obtener la telemetría de la carrera. Intenta de nuevo más tarde.',
+                'upstream_error': True,
+                'related_entities': [],
+                'metadata': {'session_key': session_key}
+            }
+        
+        return telemetry, session
+    
+    @staticmethod
+    def _entity_id(entities: Dict, category: str) -> Optional[str]:
+        """ID del nodo de la primera entidad de una categoría (ya resuelta por el NLP)"""
+        return entities[category][0]['id'] if entities[category] else None
+    
+    def _run_plan(self, plan: str, entities: Dict) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Ejecuta un plan desde la primera entidad mencionada de su categoría
+        
+        Args:
+            plan: Nombre del plan (QUERY_PLANS)
+            entities: Entidades extraídas de la pregunta
+            
+        Returns:
+            Resultado de QueryPlanner.run o None si no se mencionó la entidad
+        """
+        node_id = self._entity_id(entities, self.planner.plans[plan].entity)
+        return self.planner.run(plan, node_id) if node_id else None
+    
+    def _pilot_id_by_number(self, driver_number: int) -> Optional[str]:
+        """ID del piloto con ese dorsal (índice de atributos de la red)"""
+        node_ids = self.network.attribute_index('piloto', 'numero_piloto').get(driver_number)
+        return min(node_ids) if node_ids else None
+    
+    def _driver_entity(self, driver_number: int) -> Dict[str, Any]:
+        """Entidad relacionada de un piloto a partir de su número"""
+        driver_id = f"driver_{driver_number}"
+        node = self.planner.node(driver_id)
+        name = node['attributes'].get('nombre', f'#{driver_number}') if node else f'#{driver_number}'
+        return {'type': 'piloto', 'name': name, 'id': driver_id}
+    
+    def _session_entity(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        """Entidad relacionada de una sesión"""
+        attributes = session['attributes']
+        return {
+            'type': 'sesion',
+            'name': f"{attributes.get('session_name', '')} {attributes.get('location', '')} {attributes.get('year', '')}".strip(),
+            'id': session['id']
+        }
+    
+    def _mentioned_driver_numbers(self, entities: Dict) -> List[int]:
+        """Números de los pilotos mencionados en la pregunta"""
+        numbers = []
+        nodes = self.network.graph.nodes
+        for driver in entities['drivers']:
+            if driver['id'] in nodes:
+                numbers.append(nodes[driver['id']]['numero_piloto'])
+        return numbers
+    
+    async def _query_fastest_lap(self, entities: Dict, filters: Dict) -> Dict[str, Any]:
+        """Consulta la vuelta más rápida de una carrera"""
+        logger.debug("Ejecutando consulta de vuelta rápida")
+        
+        telemetry, session = await self._load_race_telemetry(entities, filters)
+        if telemetry is None:
+            return session
+        
+        fastest = telemetry.fastest_lap()
+        if not fastest:
+            return {
+                'found': False,
+                'message': 'No hay tiempos de vuelta disponibles para esa carrera',
+                'related_entities': [self._session_entity(session)],
+                'metadata': {}
+            }
+        
+        driver = self._driver_entity(fastest['driver_number'])
+        
+        return {
+            'found': True,
+            'session': session,
+            'driver': driver,
+            'lap': fastest,
+            'related_entities': [driver, self._session_entity(session)],
+            'metadata': {
+                'driver_name': driver['name'],
+                'lap_number': fastest['lap_number'],
+                'lap_duration': fastest['lap_duration'],
+                'session_key': telemetry.session_key
+            }
+        }
+    
+    async def _query_laps_led(self, entities: Dict, filters: Dict) -> Dict[str, Any]:
+        """Consulta cuántas vueltas lideró un piloto (o quién lideró más)"""
+        logger.debug("Ejecutando consulta de vueltas lideradas")
+        
+        telemetry, session = await self._load_race_telemetry(entities, filters)
+        if telemetry is None:
+            return session
+        
+        laps_led = telemetry.laps_led()
+        if not laps_led:
+            return {
+                'found': False,
+                'message': 'No hay datos de posiciones para esa carrera',
+                'related_entities': [self._session_entity(session)],
+                'metadata': {}
+            }
+        
+        numbers = self._mentioned_driver_numbers(entities)
+        driver_number = numbers[0] if numbers else max(laps_led, key=laps_led.get)
+        laps = laps_led.get(driver_number, 0)
+        driver = self._driver_entity(driver_number)
+        
+        return {
+            'found': True,
+            'session': session,
+            'driver': driver,
+            'laps_led': laps,
+            'related_entities': [driver, self._session_entity(session)],
+            'metadata': {
+                'driver_name': driver['name'],
+                'laps_led': laps,
+                'total_laps': telemetry.total_laps,
+                'session_key': telemetry.session_key
+            }
+        }
+    
+    async def _query_average_pace(self, entities: Dict, filters: Dict) -> Dict[str, Any]:
+        """Consulta el ritmo medio de un piloto (o el mejor ritmo) en una carrera"""
+        logger.debug("Ejecutando consulta de ritmo medio")
+        
+        telemetry, session = await self._load_race_telemetry(entities, filters)
+        if telemetry is None:
+            return session
+        
+        pace = telemetry.average_pace()
+        numbers = [n for n in self._mentioned_driver_numbers(entities) if n in pace]
+        if not pace or (entities['drivers'] and not numbers):
+            return {
+                'found': False,
+                'message': 'No hay tiempos de vuelta disponibles para ese piloto en esa carrera',
+                'related_entities': [self._session_entity(session)],
+                'metadata': {}
+            }
+        
+        driver_number = numbers[0] if numbers else min(pace, key=pace.get)
+        driver = self._driver_entity(driver_number)
+        
+        return {
+            'found': True,
+            'session': session,
+            'driver': driver,
+            'pace': pace[driver_number],
+            'related_entities': [driver, self._session_entity(session)],
+            'metadata': {
+                'driver_name': driver['name'],
+                'average_lap_duration': pace[driver_number],
+                'session_key': telemetry.session_key
+            }
         }
     
     def _query_general(self, entities: Dict, filters: Dict) -> Dict[str, Any]:
@@ -551,39 +951,26 @@ class QueryService:
         pilot_info = None
         team_info = None
         
-        # Si hay pilotos, intentar obtener su información completa
-        if entities['drivers']:
-            for driver_name in entities['drivers']:
-                pilots = self.network.find_nodes_by_type('piloto', {'nombre': driver_name})
-                if pilots:
-                    pilot_node = pilots[0]
-                    all_entities.append(pilot_node)
-                    
-                    # Obtener equipo del piloto
-                    team_nodes = self.network.query_by_relation(
-                        pilot_node['id'],
-                        'conduce_para',
-                        direction='outgoing'
-                    )
-                    
-                    if team_nodes:
-                        team_info = team_nodes[0]
-                        all_entities.append(team_info)
-                    
-                    pilot_info = {
-                        'pilot': pilot_node,
-                        'team': team_nodes[0] if team_nodes else None
-                    }
-        
-        if entities['teams']:
-            for team_name in entities['teams']:
-                teams = self.network.find_nodes_by_type('equipo', {'nombre_equipo': team_name})
-                all_entities.extend(teams)
+        # Todos los pilotos mencionados (con su equipo) en un solo recorrido
+        paths = self.planner.run_many('get_pilot_details', [driver['id'] for driver in entities['drivers']])
+        for path in paths.values():
+            pilot_node = path['piloto'][0]
+            team_node = path['equipo'][0] if path['equipo'] else None
+            all_entities.append(pilot_node)
+            
+            if team_node:
+                team_info = team_node
+                all_entities.append(team_info)
+            
+            pilot_info = {
+                'pilot': pilot_node,
+                'team': team_node
+            }
         
-        if entities['circuits']:
-            for circuit_name in entities['circuits']:
-                circuits = self.network.find_nodes_by_type('circuito', {'nombre_oficial': circuit_name})
-                all_entities.extend(circuits)
+        # Equipos y circuitos en una sola lectura
+        others = entities['teams'] + entities['circuits']
+        if others:
+            all_entities.extend(self.network.get_nodes([entity['id'] for entity in others]).values())
         
         # Preparar entidades relacionadas
         related_entities = []
@@ -644,6 +1031,12 @@ class QueryService:
         
         return round(confidence, 2)
     
+    @staticmethod
+    def _format_lap_time(seconds: float) -> str:
+        """Formatea una duración de vuelta como m:ss.mmm"""
+        minutes, rest = divmod(seconds, 60)
+        return f"{int(minutes)}:{rest:06.3f}"
+    
     def _format_answer(
         self, 
         results: Dict, 
@@ -708,6 +1101,16 @@ class QueryService:
             else:
                 return circuit['attributes']['nombre_oficial']
         
+        elif query_type == 'fastest_lap_info':
+            lap = results['lap']
+            return f"{results['driver']['name']} - {self._format_lap_time(lap['lap_duration'])} (vuelta {lap['lap_number']})"
+        
+        elif query_type == 'laps_led_info':
+            return f"{results['driver']['name']} lideró {results['laps_led']} vueltas"
+        
+        elif query_type == 'pace_info':
+            return f"{results['driver']['name']} - ritmo medio {self._format_lap_time(results['pace'])}"
+        
         elif query_type == 'session_info':
             count = results.get('count', 0)
             year = results.get('metadata', {}).get('year', '')
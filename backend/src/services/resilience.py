@@ -0,0 +1,196 @@
+"""
+Utilidades de resiliencia para llamadas a servicios externos
+
+Incluye un limitador de tasa tipo token bucket, un circuit breaker y el
+cálculo de esperas con backoff exponencial y jitter.
+"""
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Limitador de tasa token bucket compartido entre corrutinas"""
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Inicializa el limitador
+
+        Args:
+            rate: Tokens repuestos por segundo (peticiones por segundo sostenidas)
+            capacity: Máximo de tokens acumulables (ráfaga permitida)
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Repone tokens según el tiempo transcurrido"""
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    async def acquire(self) -> float:
+        """
+        Espera hasta obtener un token
+
+        Returns:
+            Segundos esperados
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        # El lock serializa a los que esperan para respetar el orden de llegada
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+
+                if now < self.blocked_until:
+                    delay = self.blocked_until - now
+                else:
+                    self._refill(now)
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return waited
+                    delay = (1 - self.tokens) / self.rate
+
+                await asyncio.sleep(delay)
+                waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """
+        Bloquea el limitador durante un tiempo (p. ej. tras un 429 con Retry-After)
+
+        Args:
+            seconds: Segundos durante los que no se emiten tokens
+        """
+        until = time.monotonic() + max(0.0, seconds)
+        if until > self.blocked_until:
+            self.blocked_until = until
+            self.tokens = 0.0
+
+
+class CircuitBreaker:
+    """Circuit breaker sencillo: closed -> open -> half_open -> closed"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Inicializa el circuit breaker
+
+        Args:
+            failure_threshold: Fallos consecutivos que abren el circuito
+            reset_timeout: Segundos que el circuito permanece abierto antes de probar de nuevo
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+    def allow_request(self) -> bool:
+        """
+        Indica si se puede intentar una petición al servicio
+
+        En half_open solo se deja pasar una petición de prueba a la vez; el
+        resto falla rápido hasta que la prueba termina. Quien obtiene True
+        estando el circuito en half_open es la prueba y debe llamar a
+        release() al terminar.
+        """
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            logger.info("Circuit breaker en estado half_open, probando el servicio")
+        if self.trial_in_flight:
+            return False
+        self.trial_in_flight = True
+        return True
+
+    def release(self) -> None:
+        """
+        Libera la petición de prueba de half_open si terminó sin registrar
+        éxito ni fallo (error no reintentable, cancelación...), para que
+        otra petición pueda probar el servicio
+        """
+        if self.state == self.HALF_OPEN:
+            self.trial_in_flight = False
+
+    def record_success(self) -> None:
+        """Registra una petición exitosa"""
+        if self.state != self.CLOSED:
+            logger.info("Circuit breaker cerrado, el servicio se ha recuperado")
+        self.failures = 0
+        self.state = self.CLOSED
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Registra una petición fallida"""
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit breaker abierto tras {self.failures} fallos consecutivos")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+def compute_backoff(attempt: int, base: float, cap: float) -> float:
+    """
+    Calcula la espera antes de un reintento (backoff exponencial con full jitter)
+
+    Args:
+        attempt: Número de reintento (0 para el primero)
+        base: Espera base en segundos
+        cap: Espera máxima en segundos
+
+    Returns:
+        Segundos a esperar
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Interpreta la cabecera Retry-After (segundos o fecha HTTP)
+
+    Args:
+        value: Valor de la cabecera
+
+    Returns:
+        Segundos a esperar o None si no se puede interpretar
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,176 @@
+"""
+Snapshots de la base de conocimiento
+
+Un snapshot es la red exportada en un fichero (pickle). src.api.serve
+guarda uno tras cargar desde OpenF1 y lo usa si en el siguiente arranque
+OpenF1 falla. También permite arrancar procesos sin llamar a OpenF1
+(KB_SNAPSHOT_PATH), pero cada proceso que lo carga deserializa su propia
+copia de la red: para varios workers con una sola copia en memoria, usar
+src.api.serve (carga en el proceso padre y fork).
+
+Uso:
+    python -m src.services.snapshot --year 2024 --output data/kb.snapshot
+"""
+import argparse
+import asyncio
+import logging
+import mmap
+import os
+import pickle
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+from ..core.semantic_network import SemanticNetwork
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+
+# Tipos de nodo que solo existen si OpenF1 respondió (motores y tipos de
+# evento se añaden siempre): sin ellos la carga no es válida
+REQUIRED_NODE_TYPES = ('circuito', 'sesion', 'piloto')
+
+
+def check_network(network: SemanticNetwork) -> Dict[str, Any]:
+    """
+    Comprueba que una red cargada desde OpenF1 tiene datos
+
+    Args:
+        network: Red semántica cargada
+
+    Returns:
+        Estadísticas de la red
+
+    Raises:
+        ValueError: Si la red no tiene circuitos, sesiones o pilotos (OpenF1
+            falló o no devolvió datos)
+    """
+    stats = network.get_stats()
+    missing = [t for t in REQUIRED_NODE_TYPES if not stats['nodes_by_type'].get(t)]
+    if missing:
+        raise ValueError(f"La base de conocimiento no tiene nodos de tipo {', '.join(missing)}")
+    return stats
+
+
+def save_snapshot(
+    network: SemanticNetwork,
+    path: str,
+    metadata: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Guarda la red semántica en un fichero de snapshot
+
+    El fichero se escribe en un temporal y se renombra, de modo que un
+    worker nunca lee un snapshot a medio escribir.
+
+    Args:
+        network: Red semántica a guardar
+        path: Ruta del fichero
+        metadata: Metadatos adicionales (año, fecha de carga...)
+    """
+    payload = {
+        'format': SNAPSHOT_FORMAT,
+        'created_at': time.time(),
+        'metadata': metadata or {},
+        'network': network.export_data()
+    }
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix='.kb-snapshot-', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    logger.info(f"Snapshot guardado en {path} ({os.path.getsize(path)} bytes)")
+
+
+def load_snapshot(path: str) -> Dict[str, Any]:
+    """
+    Carga un snapshot leyendo el fichero a través de mmap
+
+    El mmap evita copiar el fichero a un buffer propio antes de
+    deserializarlo, pero la red deserializada ocupa memoria en cada proceso
+    que la carga.
+
+    Args:
+        path: Ruta del fichero
+
+    Returns:
+        Diccionario con 'metadata' y 'network'
+
+    Raises:
+        ValueError: Si el formato del snapshot no es compatible
+    """
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            payload = pickle.loads(mapped)
+
+    if payload.get('format') != SNAPSHOT_FORMAT:
+        raise ValueError(f"Formato de snapshot no soportado: {payload.get('format')}")
+
+    return payload
+
+
+async def build_snapshot(year: int, output: str) -> Dict[str, Any]:
+    """
+    Construye la base de conocimiento desde OpenF1 y la publica como snapshot
+
+    Args:
+        year: Año a cargar
+        output: Ruta del snapshot
+
+    Returns:
+        Estadísticas de la red publicada
+
+    Raises:
+        ValueError: Si la red no tiene circuitos, sesiones o pilotos (OpenF1
+            falló o no devolvió datos); en ese caso no se publica nada
+    """
+    from ..core.config import get_settings
+    from .knowledge_base import KnowledgeBase
+    from .openf1_client import OpenF1Client
+
+    settings = get_settings()
+    client = OpenF1Client.from_settings(settings)
+
+    try:
+        knowledge_base = KnowledgeBase(client)
+        await knowledge_base.load_data(year=year)
+        stats = check_network(knowledge_base.get_semantic_network())
+        knowledge_base.save_snapshot(output)
+        return stats
+    finally:
+        await client.close()
+
+
+def main() -> int:
+    """Punto de entrada del proceso cargador"""
+    parser = argparse.ArgumentParser(description="Construye un snapshot de la base de conocimiento")
+    parser.add_argument('--year', type=int, default=2024, help="Año a cargar")
+    parser.add_argument('--output', required=True, help="Ruta del fichero de snapshot")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    try:
+        asyncio.run(build_snapshot(args.year, args.output))
+    except ValueError as e:
+        logger.error(f"Snapshot no publicado: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+Estado de arranque del servicio (liveness y readiness) y calentamiento
+
+El arranque se ejecuta en segundo plano por fases (base de conocimiento,
+índices, NLP y calentamiento). El proceso está vivo desde el principio y
+solo se marca como listo cuando todas las fases han terminado, de modo que
+un balanceador no le envía tráfico mientras paga los costes en frío.
+"""
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..core import metrics
+
+logger = logging.getLogger(__name__)
+
+PHASE_STARTING = "starting"
+PHASE_KNOWLEDGE_BASE = "knowledge_base"
+PHASE_INDEXES = "indexes"
+PHASE_NLP = "nlp"
+PHASE_WARMUP = "warmup"
+PHASE_READY = "ready"
+PHASE_FAILED = "failed"
+
+# Preguntas frecuentes que se responden antes de marcar el servicio como listo.
+# Solo preguntas que se responden con la red: en modo multi-worker cada
+# worker calienta al arrancar, y una pregunta que llama a OpenF1 (ganador,
+# telemetría) multiplicaría por N las peticiones en cada despliegue
+DEFAULT_WARMUP_QUESTIONS = [
+    "¿Quién es Max Verstappen?",
+    "¿Quién es Lewis Hamilton?",
+    "¿Quién es Fernando Alonso?",
+    "¿Quién es Charles Leclerc?",
+    "¿En qué equipo corre Hamilton?",
+    "¿En qué equipo corre Carlos Sainz?",
+    "¿Qué motor usa McLaren?",
+    "¿Qué motor usa Red Bull?",
+    "¿Dónde está el circuito de Monza?",
+    "¿Dónde está el circuito de Silverstone?",
+    "¿Cuándo es el Gran Premio de Mónaco?",
+]
+
+
+class StartupState:
+    """Fase actual del arranque y duración de cada fase"""
+
+    def __init__(self):
+        self.phase = PHASE_STARTING
+        self.error: Optional[str] = None
+        self.started_at = time.time()
+        self.ready_at: Optional[float] = None
+        self.durations: Dict[str, float] = {}
+        self.warmup: Dict[str, Any] = {}
+
+    @property
+    def ready(self) -> bool:
+        """El servicio puede recibir tráfico"""
+        return self.phase == PHASE_READY
+
+    @property
+    def failed(self) -> bool:
+        """El arranque falló (el proceso no llegará a estar listo)"""
+        return self.phase == PHASE_FAILED
+
+    @contextmanager
+    def run_phase(self, phase: str) -> Iterator[None]:
+        """
+        Marca una fase como la actual y registra su duración
+
+        Args:
+            phase: Nombre de la fase
+        """
+        self.phase = phase
+        start = time.perf_counter()
+        logger.info(f"Arranque: fase '{phase}'")
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.durations[phase] = round(duration, 3)
+            metrics.STARTUP_PHASE_SECONDS.set(duration, phase=phase)
+
+    def mark_ready(self) -> None:
+        """Marca el arranque como completado"""
+        self.phase = PHASE_READY
+        self.ready_at = time.time()
+        metrics.READY.set(1)
+        logger.info(f"Servicio listo en {self.ready_at - self.started_at:.2f}s: {self.durations}")
+
+    def mark_failed(self, error: str) -> None:
+        """
+        Marca el arranque como fallido
+
+        Args:
+            error: Descripción del error
+        """
+        self.phase = PHASE_FAILED
+        self.error = error
+        metrics.READY.set(0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Estado serializable para /live y /ready"""
+        return {
+            'ready': self.ready,
+            'phase': self.phase,
+            'error': self.error,
+            'uptime_s': round(time.time() - self.started_at, 3),
+            'startup_s': round(self.ready_at - self.started_at, 3) if self.ready_at else None,
+            'phases': dict(self.durations),
+            'warmup': dict(self.warmup),
+        }
+
+
+def load_warmup_corpus(path: str = "") -> List[str]:
+    """
+    Preguntas del calentamiento
+
+    Args:
+        path: Fichero de texto con una pregunta por línea (las líneas vacías
+            y las que empiezan por # se ignoran). Vacío = corpus por defecto
+
+    Returns:
+        Lista de preguntas
+    """
+    if not path:
+        return list(DEFAULT_WARMUP_QUESTIONS)
+    with open(path, encoding='utf-8') as f:
+        lines = (line.strip() for line in f)
+        return [line for line in lines if line and not line.startswith('#')]
+
+
+async def run_warmup(query_service, questions: List[str], timeout: float = 60.0) -> Dict[str, Any]:
+    """
+    Responde las preguntas del calentamiento con el QueryService
+
+    Recorre el camino completo de cada pregunta (NLP, consulta, formato y,
+    en su caso, OpenF1) y deja las respuestas en la caché. Es de mejor
+    esfuerzo: los errores y el tiempo límite no impiden el arranque.
+
+    Args:
+        query_service: Servicio de consultas
+        questions: Preguntas a responder
+        timeout: Tiempo máximo total en segundos (0 = sin límite)
+
+    Returns:
+        Estadísticas: preguntas respondidas, cacheadas, fallidas y duración
+    """
+    stats: Dict[str, Any] = {'questions': len(questions), 'answered': 0, 'cached': 0, 'errors': 0, 'timed_out': False}
+    start = time.perf_counter()
+
+    async def answer_all() -> None:
+        for question in questions:
+            try:
+                response = await query_service.process_question(question)
+            except Exception as e:
+                stats['errors'] += 1
+                logger.warning(f"Calentamiento: error en '{question}': {e}")
+                continue
+            stats['answered'] += 1
+            if query_service.cached_answer(question) is response:
+                stats['cached'] += 1
+
+    try:
+        await asyncio.wait_for(answer_all(), timeout=timeout or None)
+    except asyncio.TimeoutError:
+        stats['timed_out'] = True
+        logger.warning(f"Calentamiento interrumpido tras {timeout}s")
+
+    stats['seconds'] = round(time.perf_counter() - start, 3)
+    logger.info(f"Calentamiento completado: {stats}")
+    return stats
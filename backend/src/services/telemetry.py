@@ -0,0 +1,406 @@
+"""
+Telemetría de sesiones - Almacén columnar de vueltas, posiciones y stints
+"""
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from ..core.semantic_network import SemanticNetwork
+from .openf1_client import OpenF1Client
+
+if TYPE_CHECKING:
+    from .telemetry_archive import TelemetryArchive
+
+logger = logging.getLogger(__name__)
+
+
+def _timestamp(value: Optional[str]) -> str:
+    """Prepara una fecha ISO de OpenF1 (UTC) para numpy.datetime64"""
+    if not value:
+        return 'NaT'
+    if value.endswith('Z'):
+        return value[:-1]
+    # Quitar el offset horario (+00:00) que numpy no acepta
+    tz_index = value.find('+', 10)
+    return value[:tz_index] if tz_index != -1 else value
+
+
+def _number(value: Any, default: float) -> float:
+    """Convierte un valor numérico opcional"""
+    return default if value is None else value
+
+
+# Esquema de cada tabla: columna -> (campo de OpenF1, dtype, conversor)
+TABLE_SCHEMAS: Dict[str, Dict[str, Tuple[str, Any, Callable[[Any], Any]]]] = {
+    'laps': {
+        'driver_number': ('driver_number', np.int16, lambda v: _number(v, -1)),
+        'lap_number': ('lap_number', np.int16, lambda v: _number(v, -1)),
+        'lap_duration': ('lap_duration', np.float64, lambda v: _number(v, np.nan)),
+        'date_start': ('date_start', 'datetime64[ms]', _timestamp),
+        'is_pit_out_lap': ('is_pit_out_lap', np.bool_, bool),
+    },
+    'position': {
+        'driver_number': ('driver_number', np.int16, lambda v: _number(v, -1)),
+        'position': ('position', np.int8, lambda v: _number(v, -1)),
+        'date': ('date', 'datetime64[ms]', _timestamp),
+    },
+    'stints': {
+        'driver_number': ('driver_number', np.int16, lambda v: _number(v, -1)),
+        'stint_number': ('stint_number', np.int8, lambda v: _number(v, -1)),
+        'lap_start': ('lap_start', np.int16, lambda v: _number(v, -1)),
+        'lap_end': ('lap_end', np.int16, lambda v: _number(v, -1)),
+        'compound': ('compound', 'U12', lambda v: v or ''),
+    },
+}
+
+
+class TelemetryTable:
+    """Tabla columnar: un array de NumPy por columna, todas con la misma longitud"""
+
+    def __init__(
+        self,
+        name: str,
+        columns: Mapping[str, np.ndarray],
+        length: Optional[int] = None
+    ):
+        """
+        Inicializa la tabla
+
+        Args:
+            name: Nombre de la tabla (laps, position, stints)
+            columns: Mapeo columna -> array (en memoria o mapeado desde disco)
+            length: Número de filas, si se conoce sin abrir las columnas
+        """
+        self.name = name
+        self.columns = columns
+        self.length = length
+
+    def __len__(self) -> int:
+        if self.length is not None:
+            return self.length
+        for column in self.columns.values():
+            return len(column)
+        return 0
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    @classmethod
+    def empty(cls, name: str) -> "TelemetryTable":
+        """Crea una tabla vacía con el esquema correspondiente"""
+        schema = TABLE_SCHEMAS[name]
+        return cls(name, {
+            column: np.array([], dtype=dtype)
+            for column, (_, dtype, _) in schema.items()
+        })
+
+
+class TableBuilder:
+    """Acumula filas de OpenF1 y las convierte en columnas"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.schema = TABLE_SCHEMAS[name]
+        self.values: Dict[str, List[Any]] = {column: [] for column in self.schema}
+
+    def append(self, row: Dict[str, Any]) -> None:
+        """Agrega una fila de la API"""
+        for column, (field, _, convert) in self.schema.items():
+            self.values[column].append(convert(row.get(field)))
+
+    def build(self) -> TelemetryTable:
+        """Construye la tabla columnar"""
+        return TelemetryTable(self.name, {
+            column: np.array(self.values[column], dtype=dtype)
+            for column, (_, dtype, _) in self.schema.items()
+        })
+
+
+class SessionTelemetry:
+    """Telemetría de una sesión con agregaciones vectorizadas"""
+
+    def __init__(self, session_key: int, tables: Dict[str, TelemetryTable]):
+        """
+        Inicializa la telemetría de una sesión
+
+        Args:
+            session_key: Clave de la sesión
+            tables: Tablas laps, position y stints
+        """
+        self.session_key = session_key
+        self.laps = self._table(tables, 'laps')
+        self.positions = self._table(tables, 'position')
+        self.stints = self._table(tables, 'stints')
+
+    @staticmethod
+    def _table(tables: Dict[str, TelemetryTable], name: str) -> TelemetryTable:
+        """Obtiene una tabla o una tabla vacía si no existe"""
+        table = tables.get(name)
+        return table if table is not None else TelemetryTable.empty(name)
+
+    @property
+    def node_id(self) -> str:
+        """ID del nodo de sesión en la red semántica"""
+        return f"session_{self.session_key}"
+
+    @property
+    def total_laps(self) -> int:
+        """Número de vueltas de la sesión (máximo lap_number registrado)"""
+        if not len(self.laps):
+            return 0
+        return int(self.laps['lap_number'].max())
+
+    def fastest_lap(self) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene la vuelta más rápida de la sesión
+
+        Returns:
+            Diccionario con driver_number, lap_number y lap_duration, o None
+        """
+        durations = self.laps['lap_duration']
+        if not len(durations) or np.isnan(durations).all():
+            return None
+
+        index = int(np.nanargmin(durations))
+        return {
+            'driver_number': int(self.laps['driver_number'][index]),
+            'lap_number': int(self.laps['lap_number'][index]),
+            'lap_duration': float(durations[index])
+        }
+
+    def laps_led(self) -> Dict[int, int]:
+        """
+        Cuenta las vueltas lideradas por cada piloto
+
+        El líder de cada vuelta es quien ocupaba la posición 1 cuando el
+        primer coche empezó esa vuelta.
+
+        Returns:
+            Diccionario driver_number -> vueltas lideradas
+        """
+        lap_numbers = self.laps['lap_number']
+        lap_starts = self.laps['date_start']
+        valid = (lap_numbers > 0) & ~np.isnat(lap_starts)
+        if not valid.any():
+            return {}
+
+        # Inicio de cada vuelta: el primer date_start registrado para ese número
+        order = np.lexsort((lap_starts[valid], lap_numbers[valid]))
+        sorted_laps = lap_numbers[valid][order]
+        sorted_starts = lap_starts[valid][order]
+        first = np.concatenate(([True], sorted_laps[1:] != sorted_laps[:-1]))
+        starts = sorted_starts[first]
+
+        # Cambios de líder ordenados en el tiempo
+        leading = (self.positions['position'] == 1) & ~np.isnat(self.positions['date'])
+        if not leading.any():
+            return {}
+        leader_dates = self.positions['date'][leading]
+        leader_drivers = self.positions['driver_number'][leading]
+        time_order = np.argsort(leader_dates, kind='stable')
+        leader_dates = leader_dates[time_order]
+        leader_drivers = leader_drivers[time_order]
+
+        index = np.searchsorted(leader_dates, starts, side='right') - 1
+        leaders = leader_drivers[index[index >= 0]]
+
+        drivers, counts = np.unique(leaders, return_counts=True)
+        return {int(d): int(c) for d, c in zip(drivers, counts)}
+
+    def average_pace(self, include_pit_out: bool = False) -> Dict[int, float]:
+        """
+        Calcula el ritmo medio (duración media de vuelta) de cada piloto
+
+        Args:
+            include_pit_out: Incluir las vueltas de salida de boxes
+
+        Returns:
+            Diccionario driver_number -> segundos por vuelta
+        """
+        durations = self.laps['lap_duration']
+        drivers = self.laps['driver_number']
+        valid = ~np.isnan(durations) & (drivers >= 0)
+        if not include_pit_out:
+            valid &= ~self.laps['is_pit_out_lap']
+        if not valid.any():
+            return {}
+
+        drivers = drivers[valid].astype(np.intp)
+        totals = np.bincount(drivers, weights=durations[valid])
+        counts = np.bincount(drivers)
+        present = np.nonzero(counts)[0]
+        return {int(d): float(totals[d] / counts[d]) for d in present}
+
+    def driver_stints(self, driver_number: int) -> List[Dict[str, Any]]:
+        """
+        Obtiene los stints de un piloto
+
+        Args:
+            driver_number: Número del piloto
+
+        Returns:
+            Lista de stints ordenados
+        """
+        mask = self.stints['driver_number'] == driver_number
+        order = np.argsort(self.stints['stint_number'][mask])
+        return [
+            {
+                'stint_number': int(self.stints['stint_number'][mask][i]),
+                'lap_start': int(self.stints['lap_start'][mask][i]),
+                'lap_end': int(self.stints['lap_end'][mask][i]),
+                'compound': str(self.stints['compound'][mask][i])
+            }
+            for i in order
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        """Resumen de tamaño de la telemetría"""
+        return {
+            'session_key': self.session_key,
+            'laps': len(self.laps),
+            'positions': len(self.positions),
+            'stints': len(self.stints),
+            'total_laps': self.total_laps
+        }
+
+
+class TelemetryStore:
+    """
+    Almacén de telemetría por sesión
+
+    Descarga laps, position y stints de OpenF1 una sola vez por sesión,
+    los guarda en columnas de NumPy y enlaza los resultados agregados con
+    los nodos session_<key> de la red semántica. Con un TelemetryArchive,
+    las sesiones se persisten en disco y se abren con mmap.
+
+    Sobre una base de conocimiento de solo lectura (snapshot compartido por
+    varios workers) no se enlaza nada: cada worker acabaría con una red
+    distinta según las preguntas de telemetría que le hubieran llegado.
+    """
+
+    TABLES = ('laps', 'position', 'stints')
+
+    def __init__(
+        self,
+        openf1_client: OpenF1Client,
+        network: SemanticNetwork,
+        archive: Optional["TelemetryArchive"] = None,
+        link_network: bool = True
+    ):
+        """
+        Inicializa el almacén
+
+        Args:
+            openf1_client: Cliente para la API de OpenF1
+            network: Red semántica a enlazar
+            archive: Archivo en disco opcional (las sesiones se abren con mmap)
+            link_network: Enlazar los agregados con la red (False en solo lectura)
+        """
+        self.client = openf1_client
+        self.network = network
+        self.archive = archive
+        self.link_network = link_network
+        self.sessions: Dict[int, SessionTelemetry] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+        logger.info("TelemetryStore inicializado")
+
+    def get(self, session_key: int) -> Optional[SessionTelemetry]:
+        """Retorna la telemetría ya cargada de una sesión"""
+        return self.sessions.get(session_key)
+
+    async def ensure_session(self, session_key: int) -> Optional[SessionTelemetry]:
+        """
+        Obtiene la telemetría de una sesión, descargándola si hace falta
+
+        Peticiones concurrentes sobre la misma sesión comparten una única
+        descarga; con archivo, también entre procesos. Si OpenF1 falla, no
+        se guarda nada.
+
+        Args:
+            session_key: Clave de la sesión
+
+        Returns:
+            SessionTelemetry o None si no se pudo cargar
+        """
+        telemetry = self.sessions.get(session_key)
+        if telemetry is not None:
+            return telemetry
+
+        lock = self._locks.setdefault(session_key, asyncio.Lock())
+        async with lock:
+            telemetry = self.sessions.get(session_key)
+            if telemetry is not None:
+                return telemetry
+
+            if self.archive is None:
+                telemetry = await self._ingest(session_key)
+            else:
+                # Entre procesos: un solo worker descarga la sesión y los
+                # demás la abren del archivo cuando termina
+                async with self.archive.session_lock(session_key):
+                    telemetry = self.archive.load(session_key)
+                    if telemetry is None:
+                        telemetry = await self._ingest(session_key)
+                        if telemetry is not None:
+                            # Sustituir los arrays en memoria por la versión mapeada
+                            self.archive.save(telemetry)
+                            telemetry = self.archive.load(session_key) or telemetry
+
+            if telemetry is not None:
+                self.sessions[session_key] = telemetry
+                if self.link_network:
+                    # En un hilo: el lock de escritura no debe bloquear el event loop
+                    await asyncio.to_thread(self._link, telemetry)
+            return telemetry
+
+    async def _ingest(self, session_key: int) -> Optional[SessionTelemetry]:
+        """Descarga las tablas de una sesión en streaming y las convierte en columnas"""
+        logger.info(f"Cargando telemetría de la sesión {session_key}...")
+
+        async def load_table(name: str) -> Optional[TelemetryTable]:
+            builder = TableBuilder(name)
+            stream = self.client.stream(name, {'session_key': session_key})
+            async for row in stream:
+                builder.append(row)
+            if stream.failed:
+                logger.error(f"No se pudo cargar {name} de la sesión {session_key}: {stream.error}")
+                return None
+            return builder.build()
+
+        tables = await asyncio.gather(*(load_table(name) for name in self.TABLES))
+        if any(table is None for table in tables):
+            return None
+
+        telemetry = SessionTelemetry(session_key, dict(zip(self.TABLES, tables)))
+        logger.info(f"Telemetría cargada: {telemetry.summary()}")
+        return telemetry
+
+    def _link(self, telemetry: SessionTelemetry) -> None:
+        """Enlaza los agregados de la telemetría con el nodo de la sesión (un solo cambio de versión)"""
+        session_id = telemetry.node_id
+        if self.network.get_node_details(session_id) is None:
+            return
+
+        edges = []
+        fastest = telemetry.fastest_lap()
+        if fastest:
+            edges.append((
+                session_id,
+                f"driver_{fastest['driver_number']}",
+                'vuelta_rapida',
+                {
+                    'lap_number': fastest['lap_number'],
+                    'lap_duration': fastest['lap_duration']
+                }
+            ))
+        for driver_number, laps in telemetry.laps_led().items():
+            edges.append((session_id, f"driver_{driver_number}", 'lidera_vueltas', {'vueltas': laps}))
+
+        with self.network.batch():
+            self.network.update_node(session_id, {
+                'telemetria_disponible': True,
+                'vueltas_totales': telemetry.total_laps
+            })
+            self.network.add_edges_bulk(edges)
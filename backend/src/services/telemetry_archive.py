@@ -0,0 +1,206 @@
+"""
+Archivo en disco de telemetría por sesión, abierto con memory-mapping
+"""
+import asyncio
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import AsyncIterator, Dict, Iterator, Mapping, Optional
+
+import numpy as np
+
+from .telemetry import TABLE_SCHEMAS, SessionTelemetry, TelemetryTable
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+ARCHIVE_FORMAT = 1
+LOCK_POLL_INTERVAL = 0.1  # Segundos entre intentos de tomar el bloqueo de una sesión
+
+
+class MappedColumns(Mapping):
+    """
+    Columnas de una tabla archivada que se abren con mmap al primer acceso
+
+    Solo se mapean los ficheros .npy de las columnas que se consultan, y el
+    sistema operativo solo carga en memoria las páginas que se leen.
+    """
+
+    def __init__(self, directory: str, columns: list):
+        self._directory = directory
+        self._names = list(columns)
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        array = self._arrays.get(column)
+        if array is None:
+            if column not in self._names:
+                raise KeyError(column)
+            array = np.load(os.path.join(self._directory, f"{column}.npy"), mmap_mode='r')
+            self._arrays[column] = array
+        return array
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+class TelemetryArchive:
+    """
+    Persiste la telemetría de cada sesión como un fichero .npy por columna
+
+    Estructura en disco::
+
+        <root>/session_<key>/manifest.json
+        <root>/session_<key>/<tabla>/<columna>.npy
+
+    Los arrays se abren con ``mmap_mode='r'``, de modo que varios procesos
+    (workers de uvicorn) que lean la misma sesión comparten la caché de
+    páginas del sistema operativo en lugar de tener cada uno su copia.
+    """
+
+    def __init__(self, root_dir: str):
+        """
+        Inicializa el archivo
+
+        Args:
+            root_dir: Directorio raíz del archivo
+        """
+        self.root_dir = root_dir
+        os.makedirs(root_dir, exist_ok=True)
+        logger.info(f"TelemetryArchive en {root_dir}")
+
+    def session_dir(self, session_key: int) -> str:
+        """Directorio de una sesión"""
+        return os.path.join(self.root_dir, f"session_{session_key}")
+
+    def contains(self, session_key: int) -> bool:
+        """Indica si la sesión está archivada (el manifest se escribe al final)"""
+        return os.path.exists(os.path.join(self.session_dir(session_key), MANIFEST_FILE))
+
+    @contextlib.asynccontextmanager
+    async def session_lock(self, session_key: int) -> AsyncIterator[None]:
+        """
+        Bloqueo exclusivo de una sesión entre procesos (flock sobre un fichero)
+
+        Lo toma el worker que va a descargar la sesión; los demás esperan sin
+        bloquear su event loop y, al entrar, la encuentran ya archivada. El
+        sistema operativo libera el bloqueo si el proceso muere.
+
+        Args:
+            session_key: Clave de la sesión
+        """
+        path = os.path.join(self.root_dir, f"session_{session_key}.lock")
+        fd = os.open(path, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    await asyncio.sleep(LOCK_POLL_INTERVAL)
+            yield
+        finally:
+            # Cerrar el descriptor libera el bloqueo
+            os.close(fd)
+
+    def save(self, telemetry: SessionTelemetry) -> bool:
+        """
+        Archiva la telemetría de una sesión
+
+        Se escribe en un directorio temporal que se renombra al terminar, así
+        otro proceso nunca ve una sesión a medio escribir.
+
+        Args:
+            telemetry: Telemetría a guardar
+
+        Returns:
+            True si se guardó, False si otro proceso ya la había archivado
+        """
+        final_dir = self.session_dir(telemetry.session_key)
+        if self.contains(telemetry.session_key):
+            return False
+
+        tmp_dir = tempfile.mkdtemp(prefix=f"session_{telemetry.session_key}.", dir=self.root_dir)
+        try:
+            manifest = {'format': ARCHIVE_FORMAT, 'session_key': telemetry.session_key, 'tables': {}}
+            for name, table in self._tables(telemetry).items():
+                table_dir = os.path.join(tmp_dir, name)
+                os.makedirs(table_dir)
+                for column, array in table.columns.items():
+                    np.save(os.path.join(table_dir, f"{column}.npy"), np.ascontiguousarray(array))
+                manifest['tables'][name] = {
+                    'rows': len(table),
+                    'columns': {column: str(array.dtype) for column, array in table.columns.items()}
+                }
+
+            with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+                json.dump(manifest, f)
+
+            os.rename(tmp_dir, final_dir)
+            logger.info(f"Telemetría de la sesión {telemetry.session_key} archivada en {final_dir}")
+            return True
+
+        except OSError as e:
+            if self.contains(telemetry.session_key):
+                # Otro worker ganó la carrera
+                logger.debug(f"Sesión {telemetry.session_key} ya archivada por otro proceso")
+                return False
+            logger.error(f"Error archivando la sesión {telemetry.session_key}: {e}")
+            return False
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def load(self, session_key: int) -> Optional[SessionTelemetry]:
+        """
+        Abre la telemetría archivada de una sesión (sin leer los datos)
+
+        Args:
+            session_key: Clave de la sesión
+
+        Returns:
+            SessionTelemetry respaldada por mmap o None si no está archivada
+        """
+        directory = self.session_dir(session_key)
+        try:
+            with open(os.path.join(directory, MANIFEST_FILE)) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.error(f"Manifest inválido para la sesión {session_key}: {e}")
+            return None
+
+        if manifest.get('format') != ARCHIVE_FORMAT:
+            logger.warning(f"Formato de archivo no soportado para la sesión {session_key}")
+            return None
+
+        tables = {}
+        for name, info in manifest['tables'].items():
+            if name not in TABLE_SCHEMAS:
+                continue
+            tables[name] = TelemetryTable(
+                name,
+                MappedColumns(os.path.join(directory, name), info['columns'].keys()),
+                length=info['rows']
+            )
+
+        return SessionTelemetry(session_key, tables)
+
+    def session_keys(self) -> list:
+        """Claves de las sesiones archivadas"""
+        keys = []
+        for entry in os.listdir(self.root_dir):
+            if entry.startswith('session_') and entry[8:].isdigit() and self.contains(int(entry[8:])):
+                keys.append(int(entry[8:]))
+        return sorted(keys)
+
+    @staticmethod
+    def _tables(telemetry: SessionTelemetry) -> Dict[str, TelemetryTable]:
+        return {'laps': telemetry.laps, 'position': telemetry.positions, 'stints': telemetry.stints}
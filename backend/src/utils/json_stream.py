@@ -0,0 +1,185 @@
+"""
+Parser JSON incremental para respuestas que son arrays grandes
+
+Permite procesar los elementos de un array JSON a medida que llegan los
+bytes de la respuesta, sin construir el árbol completo en memoria.
+"""
+import codecs
+import json
+import re
+from typing import Any, List
+
+# Caracteres que cambian el estado del parser fuera y dentro de strings
+_STRUCTURAL = re.compile(r'["\[\]{},]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class JSONStreamError(ValueError):
+    """Error de formato en el stream JSON"""
+
+
+class JSONArrayStreamParser:
+    """
+    Parser incremental de un array JSON de nivel superior
+
+    Cada llamada a feed() recibe un fragmento de bytes y devuelve los
+    elementos del array que quedaron completos. Si el documento no es un
+    array (por ejemplo, un objeto de error), se devuelve como único
+    elemento al cerrar el parser.
+    """
+
+    def __init__(self, encoding: str = "utf-8"):
+        """
+        Inicializa el parser
+
+        Args:
+            encoding: Codificación de los bytes recibidos
+        """
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._buffer = ""
+        self._pos = 0           # Posición de escaneo dentro del buffer
+        self._start = None      # Inicio del elemento actual
+        self._depth = 0         # Profundidad dentro del elemento actual
+        self._in_string = False
+        self._started = False   # Se encontró el '[' inicial
+        self._finished = False  # Se encontró el ']' final
+        self._scalar_document = False
+        self.items_parsed = 0
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """
+        Procesa un fragmento de bytes
+
+        Args:
+            chunk: Bytes recibidos
+
+        Returns:
+            Lista de elementos completados con este fragmento
+        """
+        text = self._decoder.decode(chunk)
+        if not text:
+            return []
+        self._buffer += text
+        return self._scan()
+
+    def close(self) -> List[Any]:
+        """
+        Finaliza el parseo
+
+        Returns:
+            Elementos pendientes (solo si el documento no era un array)
+
+        Raises:
+            JSONStreamError: Si el documento quedó incompleto
+        """
+        self._buffer += self._decoder.decode(b"", final=True)
+
+        if self._scalar_document:
+            try:
+                value = json.loads(self._buffer)
+            except ValueError as e:
+                raise JSONStreamError(f"Documento JSON inválido: {e}") from e
+            self._buffer = ""
+            self.items_parsed += 1
+            return [value]
+
+        items = self._scan()
+        if self._started and not self._finished:
+            raise JSONStreamError("Array JSON incompleto")
+        if not self._started and self._buffer.strip():
+            raise JSONStreamError("Documento JSON incompleto")
+        return items
+
+    def _scan(self) -> List[Any]:
+        """Avanza sobre el buffer extrayendo elementos completos"""
+        items: List[Any] = []
+        buffer = self._buffer
+
+        if not self._started:
+            stripped = buffer.lstrip()
+            if not stripped:
+                return items
+            if stripped[0] != "[":
+                # No es un array: se parsea completo al cerrar
+                self._scalar_document = True
+                return items
+            self._started = True
+            self._pos = len(buffer) - len(stripped) + 1
+
+        pos = self._pos
+        length = len(buffer)
+
+        while pos < length and not self._finished:
+            if self._in_string:
+                match = _STRING_SPECIAL.search(buffer, pos)
+                if match is None:
+                    pos = length
+                    break
+                if match.group() == "\\":
+                    if match.end() >= length:
+                        # El carácter escapado aún no ha llegado
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                self._in_string = False
+                pos = match.end()
+                continue
+
+            if self._start is None:
+                # Entre elementos: saltar espacios y comas
+                while pos < length and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if pos >= length:
+                    break
+                if buffer[pos] == "]":
+                    self._finished = True
+                    pos += 1
+                    break
+                self._start = pos
+
+            match = _STRUCTURAL.search(buffer, pos)
+            if match is None:
+                pos = length
+                break
+
+            char = match.group()
+            pos = match.end()
+
+            if char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+            elif char in "]}":
+                if self._depth == 0:
+                    # Fin del array tras un escalar
+                    items.append(self._decode(buffer[self._start:match.start()]))
+                    self._start = None
+                    self._finished = True
+                    break
+                self._depth -= 1
+                if self._depth == 0:
+                    items.append(self._decode(buffer[self._start:pos]))
+                    self._start = None
+            elif char == "," and self._depth == 0:
+                items.append(self._decode(buffer[self._start:match.start()]))
+                self._start = None
+
+        # Descartar lo ya consumido para que el buffer no crezca
+        if self._start is not None:
+            offset = self._start
+            self._start = 0
+        else:
+            offset = pos
+        self._buffer = buffer[offset:]
+        self._pos = pos - offset
+        return items
+
+    def _decode(self, raw: str) -> Any:
+        """Decodifica un elemento completo"""
+        try:
+            value = json.loads(raw)
+        except ValueError as e:
+            raise JSONStreamError(f"Elemento JSON inválido: {e}") from e
+        self.items_parsed += 1
+        return value